@@ -1,358 +1,141 @@
-import pandas as pd
-import numpy as np
+import argparse
 import os
-import re
+import sys
 
-# =============================================================================
-# 1. CONFIGURAÇÕES
-# =============================================================================
-
-PROJECOES_FILE = "projecoes_2024.xlsx"
-VARIAVEIS_FILE = "Variáveis Projeção.xlsx"
-PROJECOES_SHEET = "2) POP_GRUPO QUINQUENAL"
-VARIAVEIS_SHEET = "Planilha1"
-OUTPUT_DIR = r"C:\Users\lorenna.santos\OneDrive - Subsecretaria de Tecnologia da Informação\Documentos\Projeções 2070"
-ANOS = [str(ano) for ano in range(2000, 2071)]
-
-# =============================================================================
-# 2. CARREGAMENTO DE DADOS
-# =============================================================================
-
-def load_excel(file_path, sheet_name, skiprows=None):
-    """Carrega uma planilha Excel e converte nomes de colunas para string."""
-    try:
-        df = pd.read_excel(
-            file_path, 
-            sheet_name=sheet_name, 
-            skiprows=skiprows, 
-            engine='openpyxl'
-        )
-        df.columns = [str(col).strip().replace('.', '').replace('CÓD', 'COD') for col in df.columns]
-        return df
-    except FileNotFoundError:
-        raise FileNotFoundError(f"Erro: Arquivo '{file_path}' não encontrado.")
-    except ValueError as e:
-        if "Worksheet named" in str(e):
-            raise ValueError(f"Erro: Planilha '{sheet_name}' não encontrada.")
-        raise
-
-print(f"Carregando {PROJECOES_FILE}, aba '{PROJECOES_SHEET}'...")
-df_projecoes = load_excel(PROJECOES_FILE, PROJECOES_SHEET, skiprows=5)
-df_projecoes.columns = [c.replace('GRUPO ETÁRIO', 'GRUPO_ETARIO').replace('GRUPO ETARIO', 'GRUPO_ETARIO') for c in df_projecoes.columns]
-
-print(f"Carregando {VARIAVEIS_FILE}, aba '{VARIAVEIS_SHEET}'...")
-df_variaveis = load_excel(VARIAVEIS_FILE, VARIAVEIS_SHEET, skiprows=None)
-df_variaveis['VAR'] = df_variaveis['VAR'].astype(str).str.strip()
+import configuracao
+from localidades import LOCALIDADES
 
 # =============================================================================
-# 3. FILTRO, CÁLCULO E MESCLAGEM
+# 1. LINHA DE COMANDO
 # =============================================================================
+# Os padrões vêm de configuracao.py; as etapas do processamento ficam em
+# pipeline.py, importado só na hora de executar, para que --help e --validar
+# respondam sem carregar pandas.
+#
+#   python Projeções_GO_2060.py --saida "Projeções 2070"
+#   python Projeções_GO_2060.py --ufs GO,DF --anos 2000-2070 --modo largo
+#   python Projeções_GO_2060.py --todas-ufs --validar
 
-print("Filtrando projeções para SIGLA = 'GO'...")
-df_go = df_projecoes[df_projecoes['SIGLA'] == 'GO'].copy()
-
-print("Extraindo e calculando grupos etários agregados...")
-
-# Investigação dos grupos etários
-df_go_ambos = df_go[df_go['SEXO'] == 'Ambos'].copy()
-
-print("\n" + "="*80)
-print("DEBUG: Grupos Etários Disponíveis")
-print("="*80)
-
-print(f"\nLinhas com SEXO='Ambos': {len(df_go_ambos)}")
-print("Grupos etários únicos em df_go_ambos:")
-grupos_unicos = sorted(df_go_ambos['GRUPO_ETARIO'].unique())
-for grupo in grupos_unicos:
-    count = len(df_go_ambos[df_go_ambos['GRUPO_ETARIO'] == grupo])
-    print(f"  '{grupo}' - {count} linhas")
-
-# Padronizar grupos etários
-df_go['GRUPO_ETARIO_PADRAO'] = (
-    df_go['GRUPO_ETARIO'].astype(str).str.strip()
-    .str.replace('00-04', '0-4', regex=False)
-    .str.replace('05-09', '5-9', regex=False)
-    .str.replace('10-14', '10-14', regex=False)
-)
-
-# Definir mapeamento de agregados
-AGREGADOS = {
-    '0-14': ['0-4', '5-9', '10-14'],
-    '15-29': ['15-19', '20-24', '25-29'],
-    '30-64': ['30-34', '35-39', '40-44', '45-49', '50-54', '55-59', '60-64'],
-    '65 ou mais': ['65-69', '70-74', '75-79', '80-84', '85-89', '90 ou mais']
-}
-
-new_rows = []
-
-# =============================================================================
-# CRIAR AGREGADOS: 980-983, 979, 939-944
-# =============================================================================
-
-print("\nCriando agregados...")
-
-# CÓDIGOS 980-983: Agregados por faixa etária (Ambos)
-for grupo_agregado, grupos_quinquenais in AGREGADOS.items():
-    df_go_ambos = df_go[df_go['SEXO'] == 'Ambos'].copy()
-    df_sum = df_go_ambos[df_go_ambos['GRUPO_ETARIO_PADRAO'].isin(grupos_quinquenais)]
-    
-    if not df_sum.empty:
-        soma_anual = df_sum[ANOS].sum()
-        new_row = {
-            'GRUPO_ETARIO': grupo_agregado,
-            'SEXO': 'Ambos',
-            'SIGLA': 'GO',
-            **soma_anual.to_dict()
-        }
-        new_rows.append(new_row)
-        print(f"  ✓ Agregado '{grupo_agregado}' (Ambos) criado")
-
-# CÓDIGO 979: Mulheres 90 ou mais
-df_979 = df_go[(df_go['SEXO'] == 'Mulheres') & (df_go['GRUPO_ETARIO'].str.strip() == '90 ou mais')].copy()
-if not df_979.empty:
-    for _, row in df_979.iterrows():
-        new_rows.append(row.to_dict())
-    print(f"  ✓ Código 979 (Mulheres 90+) criado")
-
-# CÓDIGO 939: Total Geral (soma de todos SEXO = Ambos)
-df_ambos = df_go[df_go['SEXO'] == 'Ambos'].copy()
-if not df_ambos.empty:
-    soma_total = df_ambos[ANOS].sum()
-    new_row = {
-        'GRUPO_ETARIO': 'Total',
-        'SEXO': 'Ambos',
-        'SIGLA': 'GO',
-        **soma_total.to_dict()
-    }
-    new_rows.append(new_row)
-    print(f"  ✓ Código 939 (Total Geral) criado")
-
-# CÓDIGO 940: Total Homens (soma de todas as faixas etárias, SEXO = Homens)
-df_homens = df_go[df_go['SEXO'] == 'Homens'].copy()
-if not df_homens.empty:
-    soma_homens = df_homens[ANOS].sum()
-    new_row = {
-        'GRUPO_ETARIO': 'Total',
-        'SEXO': 'Homens',
-        'SIGLA': 'GO',
-        **soma_homens.to_dict()
-    }
-    new_rows.append(new_row)
-    print(f"  ✓ Código 940 (Total Homens) criado")
-
-# CÓDIGO 941: Total Mulheres (soma de todas as faixas etárias, SEXO = Mulheres)
-df_mulheres_all = df_go[df_go['SEXO'] == 'Mulheres'].copy()
-if not df_mulheres_all.empty:
-    soma_mulheres = df_mulheres_all[ANOS].sum()
-    new_row = {
-        'GRUPO_ETARIO': 'Total',
-        'SEXO': 'Mulheres',
-        'SIGLA': 'GO',
-        **soma_mulheres.to_dict()
-    }
-    new_rows.append(new_row)
-    print(f"  ✓ Código 941 (Total Mulheres) criado")
-
-# CÓDIGOS 942-944: Faixas etárias específicas (Homens)
-faixas_homens = [
-    ('942', '0-4'),
-    ('943', '5-9'),
-    ('944', '10-14')
-]
-
-for codigo, faixa in faixas_homens:
-    df_faixa = df_go[(df_go['SEXO'] == 'Homens') & (df_go['GRUPO_ETARIO_PADRAO'] == faixa)].copy()
-    if not df_faixa.empty:
-        # Se houver múltiplas linhas, somar
-        if len(df_faixa) > 1:
-            soma_faixa = df_faixa[ANOS].sum()
-        else:
-            soma_faixa = df_faixa.iloc[0][ANOS]
-        
-        new_row = {
-            'GRUPO_ETARIO': faixa,
-            'SEXO': 'Homens',
-            'SIGLA': 'GO',
-            **soma_faixa.to_dict()
-        }
-        new_rows.append(new_row)
-        print(f"  ✓ Código {codigo} ({faixa} Homens) criado")
-
-# Concatenar os agregados ao DataFrame principal
-print(f"\nConcatenando agregados...")
-print(f"  df_go original: {len(df_go)} linhas")
-
-df_agregados = pd.DataFrame(new_rows, columns=df_go.columns)
-print(f"  Agregados a adicionar: {len(df_agregados)} linhas")
-
-df_go = pd.concat([df_go, df_agregados], ignore_index=True)
-print(f"  df_go após concatenação: {len(df_go)} linhas")
 
-# Remover coluna auxiliar de padronização
-if 'GRUPO_ETARIO_PADRAO' in df_go.columns:
-    df_go = df_go.drop('GRUPO_ETARIO_PADRAO', axis=1)
-
-# =============================================================================
-# C. CRIAÇÃO DAS CHAVES DE MESCLAGEM
-# =============================================================================
-
-# 1. Padronização de GRUPO ETÁRIO em df_go
-df_go['GRUPO_PADRONIZADO'] = (
-    df_go['GRUPO_ETARIO'].astype(str).str.strip().str.lower()
-    .str.replace(' ', '')
-    .str.replace('00-', '0-', regex=False)
-    .str.replace(r'(\d+)-(\d+)', r'\1-\2', regex=True) 
-)
-df_go['GRUPO_PADRONIZADO'] = df_go['GRUPO_PADRONIZADO'].str.replace('90oumais', '90+', regex=False)
-df_go['GRUPO_PADRONIZADO'] = df_go['GRUPO_PADRONIZADO'].str.replace('65oumais', '65+', regex=False)
-
-# 2. Padronização de SEXO em df_go
-df_go['SEXO_PADRONIZADO'] = df_go['SEXO'].replace({
-    'Ambos': 'total',
-    'Homens': 'masculina',
-    'Mulheres': 'feminina'
-})
-
-# 3. Criação da MergeKey em df_go
-df_go['MergeKey'] = df_go['GRUPO_PADRONIZADO'] + '|' + df_go['SEXO_PADRONIZADO']
-
-# 4. Criação da MergeKey em df_variaveis
-def extract_group_sex_variaveis(var_str):
-    """Extrai grupo e sexo de VAR e padroniza para a chave de mesclagem."""
-    
-    if 'Feminina' in var_str:
-        sexo = 'feminina'
-    elif 'Masculina' in var_str:
-        sexo = 'masculina'
-    else:
-        sexo = 'total'
-
-    var_lower = var_str.lower()
-    
-    if '0 a 4 anos' in var_lower or '0-4' in var_lower or '0 a 4' in var_lower:
-        grupo = '0-4'
-    elif '5 a 9 anos' in var_lower or '5-9' in var_lower or '5 a 9' in var_lower:
-        grupo = '5-9'
-    elif '10 a 14 anos' in var_lower or '10-14' in var_lower or '10 a 14' in var_lower:
-        grupo = '10-14'
-    elif '0 a 14 anos' in var_lower:
-        grupo = '0-14'
-    elif '15 a 29 anos' in var_lower:
-        grupo = '15-29'
-    elif '30 a 64 anos' in var_lower:
-        grupo = '30-64'
-    elif '65 anos ou mais' in var_lower:
-        grupo = '65+'
-    elif '90 anos ou mais' in var_lower or '90+' in var_lower:
-        grupo = '90+'
-    elif 'total' in var_lower:
-        # Diferenciar entre diferentes tipos de total
-        if 'mulheres' in var_lower and 'feminina' in var_lower:
-            grupo = 'total'  # Para Mulheres - Total
-            sexo = 'feminina'
-        elif ('homens' in var_lower or 'masculina' in var_lower) and 'total' in var_lower:
-            grupo = 'total'  # Para Homens - Total
-            sexo = 'masculina'
-        else:
-            grupo = 'total'
-    else:
-        # Quinquenais
-        match_idade = re.search(r'(\d{1,2})\s?a\s?(\d{1,2})\sanos', var_lower)
-        if match_idade:
-            grupo = f"{match_idade.group(1)}-{match_idade.group(2)}"
-        else:
-            grupo = 'desconhecido'
-        
-    return grupo, sexo
-
-df_variaveis[['GRUPO_VAR', 'SEXO_VAR']] = df_variaveis['VAR'].apply(
-    lambda x: pd.Series(extract_group_sex_variaveis(x))
-)
-
-df_variaveis['MergeKey'] = df_variaveis['GRUPO_VAR'] + '|' + df_variaveis['SEXO_VAR']
-
-# =============================================================================
-# DEBUG: Verificar MergeKeys
-# =============================================================================
-
-print("\n" + "="*80)
-print("DEBUG: Verificação de MergeKeys")
-print("="*80)
-
-print("\nMergeKeys em df_variaveis para códigos 939-944 e 979-983:")
-df_especiais = df_variaveis[df_variaveis['VAR_COD'].isin([939, 940, 941, 942, 943, 944, 979, 980, 981, 982, 983])]
-print(df_especiais[['VAR_COD', 'GRUPO_VAR', 'SEXO_VAR', 'MergeKey']].to_string())
-
-print("\n\nComparação - df_go vs df_variaveis:")
-merge_keys_go = df_go['MergeKey'].unique()
-print("MergeKey (df_variaveis)    | Status em df_go")
-print("="*50)
-for cod in [939, 940, 941, 942, 943, 944, 979, 980, 981, 982, 983]:
-    linha = df_variaveis[df_variaveis['VAR_COD'] == cod]
-    if len(linha) > 0:
-        key = linha.iloc[0]['MergeKey']
-        existe = key in merge_keys_go
-        status = "✓" if existe else "✗"
-        print(f"Código {cod}: {key:<25} {status}")
-
-# =============================================================================
-# D. MESCLAGEM FINAL
-# =============================================================================
-
-df_final = pd.merge(
-    df_go,
-    df_variaveis[['VAR_COD', 'MergeKey']],
-    on='MergeKey',
-    how='left'
-)
-
-# E. LIMPEZA E VERIFICAÇÃO FINAL
-print("\n" + "="*80)
-print("--- Resultado do Mapeamento Final ---")
-print("="*80)
-
-df_final = df_final.dropna(subset=['VAR_COD'])
-df_final['VAR_COD'] = df_final['VAR_COD'].astype(int)
-print(f"\nTotal de linhas Mapeadas: {len(df_final)}")
-
-# Verificação final dos códigos especiais
-codigos_especiais = [939, 940, 941, 942, 943, 944, 979, 980, 981, 982, 983]
-print("\nVerificação dos códigos especiais:")
-for cod in codigos_especiais:
-    if cod in df_final['VAR_COD'].values:
-        count = len(df_final[df_final['VAR_COD'] == cod])
-        print(f"✓ Código {cod} foi mapeado com sucesso. ({count} linhas)")
-    else:
-        print(f"✗ Aviso: O código {cod} AINDA está faltando no resultado final.")
-
-# =============================================================================
-# 4. GERAÇÃO DOS ARQUIVOS CSV (AJUSTADO CONFORME SOLICITADO)
-# =============================================================================
-
-if not os.path.exists(OUTPUT_DIR):
-    os.makedirs(OUTPUT_DIR)
-
-print(f"\nGerando {len(ANOS)} arquivos CSV no diretório: {OUTPUT_DIR}...")
-
-for ano in ANOS:
-    if ano in df_final.columns:
-        # 1. Seleciona VAR_COD e a coluna do ano (que contém o valor da população)
-        df_output = df_final[['VAR_COD', ano]].copy()
-        
-        # 2. Adiciona as colunas solicitadas LOC_NOME e LOC_COD
-        df_output.insert(0, 'LOC_NOME', 'Estado de Goiás') 
-        df_output.insert(1, 'LOC_COD', 1000)
-        
-        # 3. Renomeia a coluna do ano (e.g., '2000') para o formato solicitado (e.g., 'd_2000')
-        col_d_ano = f"d_{ano}"
-        df_output.rename(columns={ano: col_d_ano}, inplace=True)
-        df_output[col_d_ano] = df_output[col_d_ano].apply(
-            lambda x: f"{x:,.0f}".replace(",", "TEMP_SEP").replace(".", ",").replace("TEMP_SEP", ".")
-        )
-        
-        file_name = f"GO_{ano}.csv"
-        file_path = os.path.join(OUTPUT_DIR, file_name)
-        
-        df_output.to_csv(file_path, index=False, sep=';', encoding='latin-1')
-    
-print("\nProcesso concluído com sucesso!")
\ No newline at end of file
+def intervalo_anos(texto):
+    """Converte '2000-2070' (ou '2030') na lista de anos como texto."""
+    partes = texto.split('-')
+    try:
+        inicio, fim = int(partes[0]), int(partes[-1])
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Erro: Intervalo de anos inválido: '{texto}'.")
+    if len(partes) > 2 or inicio > fim:
+        raise argparse.ArgumentTypeError(f"Erro: Intervalo de anos inválido: '{texto}'.")
+    return [str(ano) for ano in range(inicio, fim + 1)]
+
+
+def lista_siglas(texto):
+    """Converte 'GO,DF' em ['GO', 'DF']."""
+    return [sigla.strip().upper() for sigla in texto.split(',') if sigla.strip()]
+
+
+def criar_parser():
+    """Argumentos da linha de comando; os omitidos mantêm o valor de configuracao.py."""
+    parser = argparse.ArgumentParser(
+        description="Gera os CSVs (e a carga opcional na tb_dados) das projeções populacionais."
+    )
+    parser.add_argument('--projecoes', dest='PROJECOES_FILE', help="Planilha de projeções (.xlsx)")
+    parser.add_argument('--aba-projecoes', dest='PROJECOES_SHEET', help="Aba da planilha de projeções")
+    parser.add_argument('--variaveis', dest='VARIAVEIS_FILE', help="Planilha de variáveis (.xlsx)")
+    parser.add_argument('--aba-variaveis', dest='VARIAVEIS_SHEET', help="Aba da planilha de variáveis")
+    parser.add_argument('--anos', dest='ANOS', type=intervalo_anos, help="Intervalo de anos, ex.: 2000-2070")
+    ufs = parser.add_mutually_exclusive_group()
+    ufs.add_argument('--ufs', dest='SIGLAS', type=lista_siglas, default=argparse.SUPPRESS,
+                     help="Siglas separadas por vírgula, ex.: GO,DF")
+    ufs.add_argument('--todas-ufs', dest='SIGLAS', action='store_const', const=None,
+                     default=argparse.SUPPRESS, help="Processa todas as siglas da planilha")
+    parser.add_argument('--saida', dest='OUTPUT_DIR', help="Diretório dos arquivos CSV")
+    parser.add_argument('--modo', dest='MODO_EXPORTACAO', choices=['anual', 'largo'], help="Formato de exportação")
+    parser.add_argument('--motor', dest='MOTOR_LEITURA', choices=['stream', 'openpyxl'],
+                        help="Motor de leitura da planilha de projeções")
+    parser.add_argument('--forcar-releitura', dest='FORCAR_RELEITURA', action='store_const', const=True,
+                        help="Ignora o cache e relê as planilhas")
+    parser.add_argument('--processos', dest='MAX_PROCESSOS', type=int, help="Processos em paralelo no modo lote")
+    parser.add_argument('--memoria-maxima', dest='MEMORIA_MAXIMA_MB', type=int,
+                        help="Processa as localidades em lotes dentro deste teto de memória (MB)")
+    parser.add_argument('--validacao', dest='VALIDACAO', choices=['aviso', 'erro', 'desligada'],
+                        help="Regras de consistência: só avisar, interromper antes de gravar, ou não conferir")
+    parser.add_argument('--periodicidade', dest='PERIODICIDADE', choices=['anual', 'trimestral', 'mensal'],
+                        help="Exporta as séries anuais ou interpoladas por trimestre/mês")
+    parser.add_argument('--interpolacao', dest='METODO_INTERPOLACAO', choices=['linear', 'geometrico'],
+                        help="Método da interpolação trimestral/mensal")
+    parser.add_argument('--indicadores', dest='INDICADORES', action='store_const', const=True,
+                        help="Exporta também os indicadores demográficos (CODIGOS_INDICADORES)")
+    parser.add_argument('--comparar', dest='COMPARAR_COM', choices=['csv', 'bd'],
+                        help="Só compara o resultado com os CSVs de --saida ou com a tb_dados, sem gravar")
+    parser.add_argument('--cubo', dest='CUBO_DIR',
+                        help="Grava o cubo das projeções (arrays .npy abertos com mmap) neste diretório")
+    parser.add_argument('--verbose', dest='NIVEL_LOG', action='store_const', const='debug',
+                        help="Imprime os diagnósticos de grupos etários e MergeKeys")
+    parser.add_argument('--metricas', dest='ARQUIVO_METRICAS',
+                        help="Acrescenta as métricas por etapa a este arquivo JSON lines (ex.: metricas_execucoes.jsonl)")
+    parser.add_argument('--resumo-metricas', dest='RESUMO_METRICAS', action='store_const', const=True,
+                        help="Imprime a tabela de tempo/memória por etapa no final")
+    parser.add_argument('--medir-memoria', dest='MEDIR_MEMORIA', action='store_const', const=True,
+                        help="Mede o pico de memória de cada etapa (tracemalloc, mais lento)")
+    parser.add_argument('--validar', action='store_true',
+                        help="Só confere arquivos, anos e siglas, sem processar")
+    return parser
+
+
+def validar(config):
+    """Confere a configuração sem ler as planilhas. Devolve a lista de problemas.
+
+    Siglas sem LOC_COD só geram aviso, já que o modo lote as ignora.
+    """
+    problemas = []
+    for chave in ('PROJECOES_FILE', 'VARIAVEIS_FILE'):
+        if not os.path.isfile(config[chave]):
+            problemas.append(f"Arquivo '{config[chave]}' não encontrado.")
+    if not config['ANOS']:
+        problemas.append("Nenhum ano configurado.")
+    if config['PERIODICIDADE'] != 'anual':
+        if len(config['ANOS']) < 2:
+            problemas.append("A interpolação trimestral/mensal precisa de pelo menos dois anos.")
+        if config['CONEXAO_BD'] is not None:
+            problemas.append("A carga na tb_dados só aceita PERIODICIDADE 'anual'.")
+    if config['INDICADORES'] and all(codigo is None for codigo in config['CODIGOS_INDICADORES'].values()):
+        problemas.append("--indicadores precisa dos VAR_COD alocados no BDE em CODIGOS_INDICADORES (configuracao.py).")
+    if config['COMPARAR_COM'] == 'bd' and config['CONEXAO_BD'] is None:
+        problemas.append("A comparação com a tb_dados precisa de CONEXAO_BD.")
+    for sigla in config['SIGLAS'] or []:
+        if sigla not in LOCALIDADES:
+            problemas.append(f"SIGLA '{sigla}' não existe em localidades.py.")
+        elif LOCALIDADES[sigla][1] is None:
+            print(f"✗ Aviso: SIGLA '{sigla}' sem LOC_COD cadastrado em localidades.py. As linhas da UF serão "
+                  f"ignoradas (municípios usam o CÓD. da planilha).")
+    return problemas
+
+
+def main(argv=None):
+    argumentos = vars(criar_parser().parse_args(argv))
+    somente_validar = argumentos.pop('validar')
+    config = configuracao.configuracao_padrao(
+        # SIGLAS só aparece se --ufs/--todas-ufs foi usado; None (todas as UFs) é um valor válido.
+        **{chave: valor for chave, valor in argumentos.items() if valor is not None or chave == 'SIGLAS'}
+    )
+
+    problemas = validar(config)
+    for problema in problemas:
+        print(f"✗ Erro: {problema}")
+    if somente_validar:
+        if not problemas:
+            print(f"✓ Configuração válida: {len(config['ANOS'])} anos, "
+                  f"UFs: {', '.join(config['SIGLAS']) if config['SIGLAS'] else 'todas'}")
+        return 1 if problemas else 0
+    if problemas:
+        return 1
+
+    from pipeline import run
+    run(config)
+    print("\nProcesso concluído com sucesso!")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
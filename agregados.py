@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+from cubo_populacao import construir_cubo
+
+# =============================================================================
+# REGISTRO DE AGREGADOS
+# =============================================================================
+
+# Grandes grupos etários (SEXO = Ambos) formados pela soma das faixas quinquenais.
+AGREGADOS = {
+    '0-14': ['0-4', '5-9', '10-14'],
+    '15-29': ['15-19', '20-24', '25-29'],
+    '30-64': ['30-34', '35-39', '40-44', '45-49', '50-54', '55-59', '60-64'],
+    '65 ou mais': ['65-69', '70-74', '75-79', '80-84', '85-89', '90 ou mais']
+}
+
+# Cada entrada gera uma linha agregada:
+# (VAR_COD de destino, GRUPO_ETARIO da linha, SEXO, faixas quinquenais somadas; None = todas)
+# O VAR_COD é atribuído depois pela MergeKey; aqui ele serve para identificar a entrada.
+REGISTRO_AGREGADOS = [
+    *[(codigo, grupo, 'Ambos', faixas) for codigo, (grupo, faixas) in zip([980, 981, 982, 983], AGREGADOS.items())],
+    (979, '90 ou mais', 'Mulheres', ['90 ou mais']),
+    (939, 'Total', 'Ambos', None),
+    (940, 'Total', 'Homens', None),
+    (941, 'Total', 'Mulheres', None),
+    (942, '0-4', 'Homens', ['0-4']),
+    (943, '5-9', 'Homens', ['5-9']),
+    (944, '10-14', 'Homens', ['10-14']),
+]
+
+
+def pertencimento_registro(cubo, registro=REGISTRO_AGREGADOS):
+    """Matriz 0/1 (entrada do registro, sexo, faixa) com as células do cubo que cada entrada soma."""
+    pertence = np.zeros((len(registro), len(cubo['sexos']), len(cubo['faixas'])), dtype=bool)
+    for i, (_, _, sexo, faixas) in enumerate(registro):
+        if sexo not in cubo['sexos']:
+            continue
+        s = cubo['sexos'].index(sexo)
+        if faixas is None:
+            pertence[i, s, :] = True
+        else:
+            pertence[i, s, [f for f, faixa in enumerate(cubo['faixas']) if faixa in faixas]] = True
+    return pertence
+
+
+def agregados_cubo(cubo, registro=REGISTRO_AGREGADOS):
+    """Valores (localidade, entrada, ano) de todas as entradas do registro, de uma vez.
+
+    Devolve também a máscara (localidade, entrada) das entradas que tinham alguma
+    linha de origem na planilha.
+    """
+    pertence = pertencimento_registro(cubo, registro)
+    valores = np.asarray(cubo['valores'])
+    tipo = np.int64 if np.issubdtype(valores.dtype, np.integer) else np.float64
+    somas = np.einsum('rsf,lsfa->lra', pertence.astype(tipo), valores.astype(tipo, copy=False))
+    presentes = np.einsum('rsf,lsf->lr', pertence.astype(np.int64), cubo['presentes'].astype(np.int64)) > 0
+    return somas, presentes
+
+
+def calcular_agregados_registro(df, anos, sigla, registro=REGISTRO_AGREGADOS,
+                                coluna_grupo='GRUPO_ETARIO_PADRAO'):
+    """Calcula todas as linhas do registro de uma localidade a partir do seu cubo.
+
+    As linhas são somadas uma vez em (SEXO, faixa, ano); cada agregado é então a soma
+    das faixas marcadas em pertencimento_registro, por índice inteiro. Entradas sem
+    nenhuma linha de origem são omitidas. Devolve o DataFrame dos agregados e a lista
+    dos VAR_COD gerados.
+    """
+    cubo = construir_cubo(df, anos, coluna_grupo=coluna_grupo)
+    somas, presentes = agregados_cubo(cubo, registro)
+    if not len(cubo['siglas']):
+        somas, presentes = np.zeros((len(registro), len(cubo['anos']))), np.zeros(len(registro), dtype=bool)
+    else:
+        somas, presentes = somas[0], presentes[0]
+
+    df_agregados = pd.DataFrame(somas[presentes], columns=cubo['anos'])
+    registro_presente = [entrada for entrada, ok in zip(registro, presentes) if ok]
+    df_agregados.insert(0, 'GRUPO_ETARIO', [grupo for _, grupo, _, _ in registro_presente])
+    df_agregados.insert(1, 'SEXO', [sexo for _, _, sexo, _ in registro_presente])
+    df_agregados.insert(2, 'SIGLA', sigla)
+    return df_agregados, [codigo for codigo, _, _, _ in registro_presente]
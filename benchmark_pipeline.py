@@ -0,0 +1,356 @@
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import time
+import zipfile
+from xml.sax.saxutils import escape
+
+import numpy as np
+
+from catalogo_variaveis import extract_group_sex_variaveis
+from configuracao import configuracao_padrao
+from localidades import LOCALIDADES
+from metricas import gravar_metricas, iniciar_memoria, medir, registro_execucao, tabela_metricas
+import pipeline
+
+# =============================================================================
+# BENCHMARK DO PIPELINE COM PLANILHAS SINTÉTICAS
+# =============================================================================
+# Gera planilhas de projeções no layout da aba "2) POP_GRUPO QUINQUENAL" (5 linhas
+# de título, cabeçalho GRUPO ETÁRIO;CÓD.;SEXO;SIGLA;LOCAL;2000...2070, 19 grupos x
+# 3 sexos por localidade) e o catálogo de variáveis correspondente, em qualquer
+# escala: de 1 UF até os 5.570 municípios. Leitura, tipos compactos, catálogo,
+# agregados, mesclagem e exportação são medidos separadamente (tempo, linhas/s e memória) e
+# cada execução vira uma linha em RESULTADOS_BENCHMARK, para comparar com a base.
+#
+#   python benchmark_pipeline.py --escalas 1,27,5570
+#   python benchmark_pipeline.py --escalas 27 --base bench_base.jsonl
+
+DIRETORIO_BENCHMARK = ".benchmark"
+RESULTADOS_BENCHMARK = "benchmark_resultados.jsonl"
+ESCALAS = {'uf': 1, 'brasil': 27, 'municipios': 5570}
+
+GRUPOS_ETARIOS = [
+    '00-04', '05-09', '10-14', '15-19', '20-24', '25-29', '30-34', '35-39', '40-44', '45-49',
+    '50-54', '55-59', '60-64', '65-69', '70-74', '75-79', '80-84', '85-89', '90 ou mais',
+]
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/sharedStrings.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+    '</Types>'
+)
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/></Relationships>'
+)
+_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" '
+    'Target="sharedStrings.xml"/></Relationships>'
+)
+
+
+# =============================================================================
+# GERAÇÃO DAS PLANILHAS SINTÉTICAS
+# =============================================================================
+
+def _letra_coluna(indice):
+    """Letra da coluna a partir do índice (0 = 'A')."""
+    letras = ''
+    indice += 1
+    while indice:
+        indice, resto = divmod(indice - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+def _escrever_xlsx(caminho, aba, linhas):
+    """Grava um .xlsx mínimo com uma aba, em streaming.
+
+    `linhas` é um iterável de listas de células (str vira shared string, números
+    são gravados como número, None fica vazio).
+    """
+    strings = {}
+    letras = []
+
+    tmp_path = caminho + '.tmp'
+    with zipfile.ZipFile(tmp_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as zf:
+        with zf.open('xl/worksheets/sheet1.xml', 'w') as f:
+            f.write(b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                    b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                    b'<sheetData>')
+            for numero, linha in enumerate(linhas, start=1):
+                while len(letras) < len(linha):
+                    letras.append(_letra_coluna(len(letras)))
+                celulas = []
+                for letra, valor in zip(letras, linha):
+                    if valor is None:
+                        continue
+                    if isinstance(valor, str):
+                        indice = strings.setdefault(valor, len(strings))
+                        celulas.append(f'<c r="{letra}{numero}" t="s"><v>{indice}</v></c>')
+                    else:
+                        celulas.append(f'<c r="{letra}{numero}"><v>{valor}</v></c>')
+                f.write(f'<row r="{numero}">{"".join(celulas)}</row>'.encode('utf-8'))
+            f.write(b'</sheetData></worksheet>')
+
+        zf.writestr('[Content_Types].xml', _CONTENT_TYPES)
+        zf.writestr('_rels/.rels', _RELS)
+        zf.writestr('xl/_rels/workbook.xml.rels', _WORKBOOK_RELS)
+        zf.writestr('xl/workbook.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets><sheet name="{escape(aba, {chr(34): "&quot;"})}" sheetId="1" r:id="rId1"/></sheets>'
+            '</workbook>'
+        ))
+        zf.writestr('xl/sharedStrings.xml', (
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            f'<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            f'count="{len(strings)}" uniqueCount="{len(strings)}">'
+            + ''.join(f'<si><t xml:space="preserve">{escape(texto)}</t></si>' for texto in strings)
+            + '</sst>'
+        ))
+    os.replace(tmp_path, caminho)
+
+
+def localidades_sinteticas(n_localidades):
+    """(CÓD., SIGLA, LOCAL) das localidades: as UFs reais até 27; acima disso, municípios
+    distribuídos entre as UFs, com códigos de 7 dígitos e a SIGLA da UF (como na planilha
+    municipal real).
+    """
+    ufs = list(LOCALIDADES.items())
+    if n_localidades <= len(ufs):
+        return [(codigo, sigla, nome) for codigo, (sigla, (nome, _)) in enumerate(ufs[:n_localidades], start=11)]
+    por_uf = -(-n_localidades // len(ufs))
+    return [
+        ((11 + i // por_uf) * 100000 + i % por_uf + 1, ufs[i // por_uf][0], f"Município {i + 1:05d}")
+        for i in range(n_localidades)
+    ]
+
+
+def gerar_planilha_projecoes(caminho, n_localidades, anos, semente=0):
+    """Gera a aba de projeções no layout real com `n_localidades` localidades."""
+    rng = np.random.default_rng(semente)
+    aba = "2) POP_GRUPO QUINQUENAL"
+
+    def linhas():
+        yield ["PROJEÇÕES DA POPULAÇÃO (SINTÉTICA)"]
+        yield [f"{n_localidades} localidades"]
+        yield []
+        yield ["Fonte: benchmark_pipeline.py"]
+        yield []
+        yield ['GRUPO ETÁRIO', 'CÓD.', 'SEXO', 'SIGLA', 'LOCAL', *[int(ano) for ano in anos]]
+        for codigo, sigla, local in localidades_sinteticas(n_localidades):
+            homens = rng.integers(100, 500000, size=(len(GRUPOS_ETARIOS), len(anos)))
+            mulheres = rng.integers(100, 500000, size=(len(GRUPOS_ETARIOS), len(anos)))
+            for grupo, h, m in zip(GRUPOS_ETARIOS, homens.tolist(), mulheres.tolist()):
+                for sexo, valores in (('Homens', h), ('Mulheres', m), ('Ambos', [a + b for a, b in zip(h, m)])):
+                    yield [grupo, codigo, sexo, sigla, local, *valores]
+
+    _escrever_xlsx(caminho, aba, linhas())
+
+
+def texto_quinquenal(sexo, inicio, fim):
+    """VAR de uma faixa quinquenal que as regras de catalogo_variaveis.py resolvem para ela.
+
+    "de 40 a 44 anos" contém "0 a 4" e cairia na regra de 0-4; nesses casos a faixa
+    é escrita sem espaços ("de 40a44 anos"), forma que só a regra quinquenal aceita.
+    """
+    rotulo = {'': 'total', 'Masculina ': 'masculina', 'Feminina ': 'feminina'}[sexo]
+    esperado = (f"{inicio}-{fim}", rotulo)
+    for texto in (f"População {sexo}de {inicio} a {fim} anos", f"População {sexo}de {inicio}a{fim} anos"):
+        if extract_group_sex_variaveis(texto) == esperado:
+            return texto
+    raise ValueError(f"Erro: Nenhum texto de VAR resolve para {esperado}.")
+
+
+def gerar_catalogo_variaveis(caminho):
+    """Gera a planilha de variáveis com os códigos especiais e os grupos quinquenais.
+
+    Os textos seguem as regras de catalogo_variaveis.py (texto_quinquenal), e a
+    unicidade das MergeKeys é conferida antes da gravação.
+    """
+    variaveis = [
+        (939, 'População Total'), (940, 'População Masculina Total'), (941, 'População Feminina Total'),
+        (942, 'População Masculina de 0 a 4 anos'), (943, 'População Masculina de 5 a 9 anos'),
+        (944, 'População Masculina de 10 a 14 anos'), (979, 'População Feminina de 90 anos ou mais'),
+        (980, 'População de 0 a 14 anos'), (981, 'População de 15 a 29 anos'),
+        (982, 'População de 30 a 64 anos'), (983, 'População de 65 anos ou mais'),
+    ]
+    codigo = 1001
+    for grupo in GRUPOS_ETARIOS[3:-1]:
+        inicio, fim = grupo.split('-')
+        for sexo in ('', 'Masculina ', 'Feminina '):
+            variaveis.append((codigo, texto_quinquenal(sexo, int(inicio), int(fim))))
+            codigo += 1
+
+    chaves = ['|'.join(extract_group_sex_variaveis(texto)) for _, texto in variaveis]
+    if len(set(chaves)) != len(chaves):
+        raise ValueError("Erro: O catálogo sintético tem MergeKeys repetidas.")
+    _escrever_xlsx(caminho, 'Planilha1', [['VAR_COD', 'VAR'], *[list(v) for v in variaveis]])
+
+
+def preparar_arquivos(diretorio, n_localidades, anos, semente=0):
+    """Gera (ou reaproveita) a planilha de projeções e regrava o catálogo da escala pedida."""
+    os.makedirs(diretorio, exist_ok=True)
+    projecoes = os.path.join(diretorio, f"projecoes_{n_localidades}_{anos[0]}_{anos[-1]}_{semente}.xlsx")
+    variaveis = os.path.join(diretorio, "variaveis.xlsx")
+    if not os.path.exists(projecoes):
+        inicio = time.perf_counter()
+        gerar_planilha_projecoes(projecoes, n_localidades, anos, semente)
+        print(f"  ✓ {projecoes} gerada em {time.perf_counter() - inicio:.1f} s "
+              f"({os.path.getsize(projecoes) / 1024 / 1024:.1f} MiB)")
+    # O catálogo é pequeno e sempre regravado, para não reaproveitar um de versão anterior.
+    gerar_catalogo_variaveis(variaveis)
+    return projecoes, variaveis
+
+
+# =============================================================================
+# EXECUÇÃO DAS ETAPAS
+# =============================================================================
+
+def executar_benchmark(n_localidades, anos, diretorio=DIRETORIO_BENCHMARK, motor='stream',
+                       modo='anual', medir_memoria=False, semente=0):
+    """Roda leitura, catálogo, agregados, mesclagem e exportação e devolve as métricas.
+
+    As mensagens do pipeline são descartadas durante as medições. A leitura ignora o
+    cache (FORCAR_RELEITURA) para medir sempre o parse da planilha.
+    """
+    projecoes, variaveis = preparar_arquivos(diretorio, n_localidades, anos, semente)
+    saida = os.path.join(diretorio, f"saida_{n_localidades}")
+    shutil.rmtree(saida, ignore_errors=True)
+    config = configuracao_padrao(
+        PROJECOES_FILE=projecoes, VARIAVEIS_FILE=variaveis, VARIAVEIS_SHEET='Planilha1',
+        OUTPUT_DIR=saida, ANOS=anos, SIGLAS=None, CACHE_DIR=os.path.join(diretorio, 'cache'),
+        FORCAR_RELEITURA=True, MOTOR_LEITURA=motor, MODO_EXPORTACAO=modo,
+        EXPORTACAO_INCREMENTAL=False, ARQUIVO_METRICAS=None,
+    )
+    if medir_memoria:
+        iniciar_memoria()
+    os.makedirs(saida, exist_ok=True)
+
+    metricas = []
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        with medir(metricas, 'leitura') as etapa:
+            df_projecoes = pipeline.carregar_projecoes(config)
+            etapa['linhas_saida'] = len(df_projecoes)
+
+        with medir(metricas, 'tipos', len(df_projecoes)) as etapa:
+            df_projecoes = pipeline.identificar_localidades(pipeline.compactar_tipos(df_projecoes, anos))
+            etapa['linhas_saida'] = len(df_projecoes)
+
+        with medir(metricas, 'catalogo') as etapa:
+            df_variaveis = pipeline.preparar_variaveis(pipeline.carregar_variaveis(config), config)
+            indice = pipeline.indexar_variaveis(df_variaveis, config)
+            etapa['linhas_saida'] = len(indice)
+
+        # Todas as localidades são exportadas, inclusive UFs sem LOC_COD cadastrado.
+        localidades = [
+            (chave, df.copy()) for chave, df in df_projecoes.groupby('LOCALIDADE', sort=False, observed=True)
+        ]
+
+        with medir(metricas, 'agregados', len(df_projecoes)) as etapa:
+            localidades = [(sigla, pipeline.calcular_agregados(df, sigla, anos)) for sigla, df in localidades]
+            etapa['linhas_saida'] = sum(len(df) for _, df in localidades)
+
+        with medir(metricas, 'mesclagem', etapa['linhas_saida']) as etapa:
+            finais = [
+                (sigla, pipeline.mesclar_variaveis(pipeline.criar_chaves_projecoes(df), indice))
+                for sigla, df in localidades
+            ]
+            etapa['linhas_saida'] = sum(len(df) for _, df in finais)
+
+        exportar = pipeline.exportar_csv_largo if modo == 'largo' else pipeline.exportar_csv
+        with medir(metricas, 'exportacao', etapa['linhas_saida']) as etapa:
+            for codigo, (sigla, df_final) in enumerate(finais, start=1):
+                exportar(df_final, sigla, f"Localidade {sigla}", codigo, config)
+            etapa['linhas_saida'] = etapa['linhas_entrada']
+            etapa['bytes'] = sum(entrada.stat().st_size for entrada in os.scandir(saida) if entrada.is_file())
+
+    for registro in metricas:
+        linhas = registro['linhas_entrada'] or registro['linhas_saida'] or 0
+        registro['linhas_por_s'] = linhas / max(registro['segundos'], 1e-9)
+    return metricas
+
+
+def comparar_com_base(resultado, base):
+    """Texto com a razão tempo atual / tempo da base para cada etapa."""
+    tempos_base = {registro['etapa']: registro['segundos'] for registro in base['etapas']}
+    linhas = [f"Comparação com a base de {base['inicio']} ({base['localidades']} localidades):"]
+    for registro in resultado['etapas']:
+        anterior = tempos_base.get(registro['etapa'])
+        if anterior:
+            razao = registro['segundos'] / anterior
+            linhas.append(f"  {registro['etapa']:<12} {anterior:>9.3f} s -> {registro['segundos']:>9.3f} s "
+                          f"({razao:.2f}x{' ✗ mais lento' if razao > 1.10 else ''})")
+    return '\n'.join(linhas)
+
+
+def ler_base(arquivo, **parametros):
+    """Última execução do arquivo de base com os mesmos parâmetros (escala, anos, motor, modo), ou None."""
+    base = None
+    with open(arquivo, encoding='utf-8') as f:
+        for linha in f:
+            registro = json.loads(linha)
+            if all(registro.get(chave) == valor for chave, valor in parametros.items()):
+                base = registro
+    return base
+
+
+def escala(texto):
+    """Converte '1,27,5570' ou 'uf,brasil,municipios' na lista de escalas."""
+    return [ESCALAS[parte] if parte in ESCALAS else int(parte) for parte in texto.split(',')]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark do pipeline com planilhas sintéticas.")
+    parser.add_argument('--escalas', type=escala, default=[1, 27],
+                        help="Localidades por planilha, ex.: 1,27,5570 ou uf,brasil,municipios")
+    parser.add_argument('--anos', default="2000-2070", help="Intervalo de anos, ex.: 2000-2070")
+    parser.add_argument('--motor', choices=['stream', 'openpyxl'], default='stream')
+    parser.add_argument('--modo', choices=['anual', 'largo'], default='anual')
+    parser.add_argument('--medir-memoria', action='store_true', help="Pico alocado por etapa (tracemalloc)")
+    parser.add_argument('--diretorio', default=DIRETORIO_BENCHMARK, help="Planilhas geradas e saídas")
+    parser.add_argument('--resultados', default=RESULTADOS_BENCHMARK, help="Arquivo JSON lines dos resultados")
+    parser.add_argument('--base', help="Arquivo JSON lines de uma execução anterior para comparação")
+    argumentos = parser.parse_args()
+
+    inicio_ano, fim_ano = (int(ano) for ano in argumentos.anos.split('-'))
+    anos = [str(ano) for ano in range(inicio_ano, fim_ano + 1)]
+
+    for n_localidades in argumentos.escalas:
+        print(f"\n=== {n_localidades} localidades, {len(anos)} anos ({argumentos.motor}, {argumentos.modo}) ===")
+        parametros = dict(localidades=n_localidades, anos=len(anos), motor=argumentos.motor, modo=argumentos.modo)
+        base = ler_base(argumentos.base, **parametros) if argumentos.base else None
+
+        inicio = time.perf_counter()
+        metricas = executar_benchmark(n_localidades, anos, argumentos.diretorio, argumentos.motor,
+                                      argumentos.modo, argumentos.medir_memoria)
+        resultado = registro_execucao(metricas, time.perf_counter() - inicio, **parametros)
+        gravar_metricas(argumentos.resultados, resultado)
+
+        print(tabela_metricas(metricas))
+        for registro in metricas:
+            print(f"  {registro['etapa']:<12} {registro['linhas_por_s']:>14,.0f} linhas/s")
+        if argumentos.base:
+            print(comparar_com_base(resultado, base) if base else "  (sem execução na base com estes parâmetros)")
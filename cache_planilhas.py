@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+# =============================================================================
+# CACHE COLUNAR DE PLANILHAS
+# =============================================================================
+# Cada entrada é um arquivo .npz (uma matriz NumPy por coluna) identificado por
+# caminho, aba, skiprows e hash do conteúdo da planilha. O hash fica guardado em
+# hashes.json junto com o tamanho e o mtime do arquivo: só é recalculado quando um
+# dos dois muda, e um arquivo apenas "tocado" continua acertando o cache.
+#
+# Nenhuma coluna é gravada como objeto Python (lido com allow_pickle=False): texto
+# vira unicode de largura fixa e colunas mistas viram códigos + categorias em JSON.
+
+CACHE_DIR = ".cache_planilhas"
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Incrementar quando a limpeza feita pelos carregadores mudar, invalidando o cache.
+CACHE_VERSAO = 3  # 2: a leitura em streaming inclui CÓD. e LOCAL; 3: sem pickle
+ARQUIVO_HASHES = "hashes.json"
+
+
+def _hash_arquivo(file_path, tamanho_bloco=1024 * 1024):
+    """Calcula o SHA-256 do conteúdo do arquivo."""
+    h = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b''):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def hash_planilha(file_path, cache_dir=CACHE_DIR):
+    """SHA-256 da planilha, recalculado só se o tamanho ou o mtime mudaram desde o último.
+
+    Os hashes ficam em cache_dir/hashes.json ({caminho: [tamanho, mtime, sha256]}).
+    """
+    arquivo = os.path.abspath(file_path)
+    info = os.stat(arquivo)
+    indice_path = os.path.join(cache_dir, ARQUIVO_HASHES)
+    try:
+        with open(indice_path, encoding='utf-8') as f:
+            hashes = json.load(f)
+    except (OSError, ValueError):
+        hashes = {}
+
+    tamanho, mtime, sha256 = hashes.get(arquivo, (None, None, None))
+    if (tamanho, mtime) == (info.st_size, info.st_mtime_ns) and sha256:
+        return sha256
+
+    sha256 = _hash_arquivo(arquivo)
+    hashes = {caminho: valor for caminho, valor in hashes.items() if os.path.exists(caminho)}
+    hashes[arquivo] = [info.st_size, info.st_mtime_ns, sha256]
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = f"{indice_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(hashes, f, indent=0, sort_keys=True)
+    os.replace(tmp_path, indice_path)
+    return sha256
+
+
+def chave_cache(file_path, sheet_name, skiprows=None, carregador=None, opcoes=None, cache_dir=CACHE_DIR):
+    """Monta a chave da entrada de cache a partir da planilha e de seus metadados."""
+    partes = {
+        'versao': CACHE_VERSAO,
+        'carregador': getattr(carregador, '__name__', None),
+        'arquivo': os.path.abspath(file_path),
+        'aba': sheet_name,
+        'skiprows': skiprows,
+        'opcoes': opcoes or {},
+        'sha256': hash_planilha(file_path, cache_dir),
+    }
+    return hashlib.sha256(json.dumps(partes, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _valor_json(valor):
+    """Escalar NumPy -> Python, para as categorias das colunas mistas irem em JSON."""
+    return valor.item() if isinstance(valor, np.generic) else valor
+
+
+def _salvar_npz(df, destino):
+    """Grava o DataFrame em formato colunar (.npz), preservando nulos das colunas de texto.
+
+    Levanta TypeError se alguma coluna mista tiver valores que não cabem em JSON.
+    """
+    arrays = {}
+    colunas = []
+    for i, col in enumerate(df.columns):
+        serie = df[col]
+        coluna = {'nome': str(col)}
+        if serie.dtype.kind in 'biufcmM':
+            arrays[f'c{i}'] = serie.to_numpy()
+            coluna['tipo'] = 'num'
+        else:
+            valores = serie.to_numpy(dtype=object)
+            nulos = pd.isna(valores)
+            if all(isinstance(v, str) for v in valores[~nulos]):
+                arrays[f'c{i}'] = np.where(nulos, '', valores).astype(str)
+                arrays[f'n{i}'] = nulos
+                coluna['tipo'] = 'str'
+            else:
+                # Códigos (-1 = nulo) + categorias em JSON, que preserva str, int, float e bool.
+                codigos, categorias = pd.factorize(valores)
+                arrays[f'c{i}'] = codigos.astype(np.int32)
+                coluna['tipo'] = 'cat'
+                coluna['categorias'] = json.dumps([_valor_json(v) for v in categorias], ensure_ascii=False)
+        colunas.append(coluna)
+
+    arrays['__meta__'] = np.array(json.dumps(colunas))
+    tmp_path = destino + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp_path, destino)
+
+
+def _ler_npz(origem):
+    """Reconstrói o DataFrame gravado por _salvar_npz."""
+    with np.load(origem, allow_pickle=False) as dados:
+        colunas = json.loads(str(dados['__meta__']))
+        valores = {}
+        for i, col in enumerate(colunas):
+            arr = dados[f'c{i}']
+            if col['tipo'] == 'str':
+                arr = arr.astype(object)
+                arr[dados[f'n{i}']] = np.nan
+            elif col['tipo'] == 'cat':
+                # O código -1 (nulo) cai na última posição, reservada para NaN.
+                lista = json.loads(col['categorias'])
+                categorias = np.empty(len(lista) + 1, dtype=object)
+                categorias[:-1] = lista
+                categorias[-1] = np.nan
+                arr = categorias[arr]
+            valores[col['nome']] = arr
+    return pd.DataFrame(valores)
+
+
+def _aplicar_limite(cache_dir, max_bytes, preservar=None):
+    """Remove as entradas menos usadas até o cache caber em max_bytes.
+
+    O último uso é o maior entre o acesso (atime, atualizado pelo sistema na leitura)
+    e a gravação (mtime); um acerto no cache não regrava nada. Com relatime o atime
+    avança no máximo uma vez por dia, o que basta para a ordem de descarte.
+    """
+    entradas = []
+    for nome in os.listdir(cache_dir):
+        if nome.endswith('.npz'):
+            caminho = os.path.join(cache_dir, nome)
+            info = os.stat(caminho)
+            entradas.append((max(info.st_atime, info.st_mtime), info.st_size, caminho))
+
+    total = sum(tamanho for _, tamanho, _ in entradas)
+    for _, tamanho, caminho in sorted(entradas):
+        if total <= max_bytes:
+            break
+        if caminho == preservar:
+            continue
+        os.remove(caminho)
+        total -= tamanho
+
+
+def carregar_com_cache(carregador, file_path, sheet_name, skiprows=None,
+                       cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES, forcar=False, **opcoes):
+    """Carrega a planilha pelo cache colunar, usando o carregador apenas quando necessário.
+
+    `carregador(file_path, sheet_name, skiprows, **opcoes)` deve devolver o DataFrame já
+    limpo; as `opcoes` também fazem parte da chave do cache.
+    Com `forcar=True` a planilha é relida e a entrada do cache é regravada.
+    """
+    if not os.path.exists(file_path):
+        # Deixa o carregador emitir a mensagem de erro padrão.
+        return carregador(file_path, sheet_name, skiprows, **opcoes)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    chave = chave_cache(file_path, sheet_name, skiprows, carregador, opcoes, cache_dir)
+    caminho = os.path.join(cache_dir, f"{chave}.npz")
+
+    if not forcar and os.path.exists(caminho):
+        try:
+            df = _ler_npz(caminho)
+            print(f"  (cache) '{sheet_name}' lida de {caminho}")
+            return df
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            # Entrada corrompida: descarta e relê a planilha.
+            os.remove(caminho)
+
+    df = carregador(file_path, sheet_name, skiprows, **opcoes)
+    try:
+        _salvar_npz(df, caminho)
+    except TypeError as e:
+        print(f"  ✗ Aviso: '{sheet_name}' não foi guardada no cache ({e}).")
+        return df
+    _aplicar_limite(cache_dir, max_bytes, preservar=caminho)
+    return df
@@ -0,0 +1,219 @@
+import re
+import time
+
+from formatacao_br import formatar_inteiros_br, formatar_linhas_br
+
+# =============================================================================
+# CARGA DIRETA NA tb_dados (QUALQUER CONEXÃO DB-API 2.0)
+# =============================================================================
+# Grava as linhas de df_final no formato da tb_dados (LOC_NOME, LOC_COD, VAR_COD,
+# d_YYYY...) com INSERTs de várias linhas por comando. O número de parâmetros por
+# comando fica limitado a MAX_PARAMETROS e cada lote é uma transação; na recarga de
+# uma UF (apagar_loc_cod), o DELETE e todos os lotes formam uma única transação.
+
+TABELA_DESTINO = "tb_dados"
+TIPO_COLUNA_ANO = "VARCHAR(100)"
+TAMANHO_LOTE = 5000  # Linhas por transação
+MAX_PARAMETROS = 999  # Limite de parâmetros por comando (o do SQLite antigo é 999)
+
+_RE_IDENTIFICADOR = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def validar_identificador(nome):
+    """Garante que nomes de tabela/coluna interpolados no SQL são identificadores simples."""
+    if not _RE_IDENTIFICADOR.match(nome):
+        raise ValueError(f"Erro: Identificador SQL inválido: '{nome}'.")
+    return nome
+
+
+def _marcadores(paramstyle, quantidade, inicio=0):
+    """Marcadores de parâmetro no estilo do driver (qmark, format, pyformat, numeric, named)."""
+    if paramstyle == 'qmark':
+        return ['?'] * quantidade
+    if paramstyle in ('format', 'pyformat'):
+        return ['%s'] * quantidade
+    if paramstyle == 'numeric':
+        return [f':{inicio + i + 1}' for i in range(quantidade)]
+    if paramstyle == 'named':
+        return [f':p{inicio + i}' for i in range(quantidade)]
+    raise ValueError(f"Erro: paramstyle '{paramstyle}' não suportado.")
+
+
+def _comando_insert(tabela, colunas, n_linhas, paramstyle):
+    """Monta um INSERT com n_linhas grupos de VALUES."""
+    grupos = []
+    for i in range(n_linhas):
+        marcadores = _marcadores(paramstyle, len(colunas), inicio=i * len(colunas))
+        grupos.append(f"({', '.join(marcadores)})")
+    return f"INSERT INTO {tabela} ({', '.join(colunas)}) VALUES {', '.join(grupos)}"
+
+
+def _parametros(linhas, paramstyle):
+    """Achata as linhas de um comando na sequência (ou dicionário) de parâmetros."""
+    valores = [valor for linha in linhas for valor in linha]
+    if paramstyle == 'named':
+        return {f'p{i}': valor for i, valor in enumerate(valores)}
+    return valores
+
+
+def linhas_tb_dados(df_final, anos, loc_nome, loc_cod, formatar=True, casas=None):
+    """Converte df_final em tuplas (LOC_NOME, LOC_COD, VAR_COD, d_ano...).
+
+    Com `formatar=True` os valores seguem o padrão dos CSVs (texto pt-BR, ex.: 1.500),
+    já que as colunas d_YYYY da tb_dados são VARCHAR. `casas` dá as casas decimais de
+    cada linha (None = todas inteiras).
+    """
+    matriz = df_final[anos].to_numpy(dtype=float)
+    if not formatar:
+        valores = matriz.tolist()
+    elif casas is None:
+        valores = formatar_inteiros_br(matriz).tolist()
+    else:
+        valores = formatar_linhas_br(matriz, casas).tolist()
+    var_cods = df_final['VAR_COD'].astype(int).tolist()
+    return [(loc_nome, loc_cod, var_cod, *linha) for var_cod, linha in zip(var_cods, valores)]
+
+
+def carregar_tb_dados(conexao, linhas, anos, tabela=TABELA_DESTINO, paramstyle='qmark',
+                      tamanho_lote=TAMANHO_LOTE, max_parametros=MAX_PARAMETROS,
+                      apagar_loc_cod=None):
+    """Insere as linhas na tabela em lotes, com uma transação por lote.
+
+    `apagar_loc_cod` remove antes as linhas existentes desse LOC_COD, permitindo
+    recarregar uma UF; nesse caso o DELETE e todos os lotes são uma única transação e
+    qualquer falha mantém as linhas antigas. Devolve linhas, segundos e linhas/s.
+    """
+    tabela = validar_identificador(tabela)
+    colunas = ['LOC_NOME', 'LOC_COD', 'VAR_COD', *[validar_identificador(f"d_{ano}") for ano in anos]]
+    linhas_por_comando = max(1, max_parametros // len(colunas))
+
+    inicio = time.perf_counter()
+    cursor = conexao.cursor()
+    comandos = {}
+    recarga = apagar_loc_cod is not None
+    try:
+        if recarga:
+            marcador = _marcadores(paramstyle, 1)[0]
+            cursor.execute(
+                f"DELETE FROM {tabela} WHERE LOC_COD = {marcador}",
+                _parametros([(apagar_loc_cod,)], paramstyle)
+            )
+
+        for inicio_lote in range(0, len(linhas), tamanho_lote):
+            lote = linhas[inicio_lote:inicio_lote + tamanho_lote]
+            completos = len(lote) - len(lote) % linhas_por_comando
+
+            if completos:
+                if linhas_por_comando not in comandos:
+                    comandos[linhas_por_comando] = _comando_insert(tabela, colunas, linhas_por_comando, paramstyle)
+                cursor.executemany(comandos[linhas_por_comando], [
+                    _parametros(lote[i:i + linhas_por_comando], paramstyle)
+                    for i in range(0, completos, linhas_por_comando)
+                ])
+            if completos < len(lote):
+                resto = lote[completos:]
+                cursor.execute(_comando_insert(tabela, colunas, len(resto), paramstyle), _parametros(resto, paramstyle))
+
+            if not recarga:
+                conexao.commit()
+        conexao.commit()
+    except Exception:
+        conexao.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    segundos = max(time.perf_counter() - inicio, 1e-9)
+    return {'linhas': len(linhas), 'segundos': segundos, 'linhas_por_s': len(linhas) / segundos}
+
+
+def ler_tb_dados(conexao, loc_cod, anos, tabela=TABELA_DESTINO, paramstyle='qmark'):
+    """Linhas já gravadas do LOC_COD: lista de tuplas (VAR_COD, d_ano...) como estão na tabela.
+
+    Anos sem coluna na tabela vêm como None.
+    """
+    tabela = validar_identificador(tabela)
+    existentes = {coluna.lower() for coluna in colunas_existentes(conexao, tabela)}
+    presentes = [ano for ano in anos if f"d_{ano}".lower() in existentes]
+    colunas = ['VAR_COD', *[validar_identificador(f"d_{ano}") for ano in presentes]]
+    cursor = conexao.cursor()
+    try:
+        cursor.execute(
+            f"SELECT {', '.join(colunas)} FROM {tabela} WHERE LOC_COD = {_marcadores(paramstyle, 1)[0]}",
+            _parametros([(loc_cod,)], paramstyle)
+        )
+        registros = cursor.fetchall()
+    finally:
+        cursor.close()
+    posicao = {ano: i + 1 for i, ano in enumerate(presentes)}
+    return [(registro[0], *[registro[posicao[ano]] if ano in posicao else None for ano in anos])
+            for registro in registros]
+
+
+# =============================================================================
+# PREPARAÇÃO DO ESQUEMA: COLUNAS d_YYYY
+# =============================================================================
+# Substitui a edição manual do "ALTER TABLE tb_dados_Inclusão anos_BDE.txt": compara
+# ANOS com as colunas da tabela e gera um único ALTER TABLE só com as que faltam.
+
+def colunas_existentes(conexao, tabela=TABELA_DESTINO):
+    """Nomes das colunas da tabela, lidos de cursor.description (portável entre drivers)."""
+    tabela = validar_identificador(tabela)
+    cursor = conexao.cursor()
+    try:
+        cursor.execute(f"SELECT * FROM {tabela} WHERE 1 = 0")
+        return [descricao[0] for descricao in cursor.description]
+    finally:
+        cursor.close()
+
+
+def colunas_anos_faltantes(anos, existentes):
+    """Colunas d_YYYY de `anos` que não existem (comparação sem diferenciar maiúsculas)."""
+    existentes = {coluna.lower() for coluna in existentes}
+    return [f"d_{ano}" for ano in anos if f"d_{ano}".lower() not in existentes]
+
+
+def comandos_alter_anos(tabela, faltantes, dialeto='mysql', tipo=TIPO_COLUNA_ANO):
+    """ALTER TABLE para as colunas faltantes.
+
+    No MySQL (dialeto do BDE) é um único comando com vários ADD COLUMN; o SQLite só
+    aceita uma coluna por ALTER TABLE, então gera um comando por coluna.
+    """
+    tabela = validar_identificador(tabela)
+    if not faltantes:
+        return []
+    adicoes = [f"ADD COLUMN {validar_identificador(coluna)} {tipo}" for coluna in faltantes]
+    if dialeto == 'sqlite':
+        return [f"ALTER TABLE {tabela} {adicao}" for adicao in adicoes]
+    if dialeto == 'mysql':
+        return [f"ALTER TABLE {tabela}\n" + ",\n".join(adicoes)]
+    raise ValueError(f"Erro: dialeto '{dialeto}' não suportado.")
+
+
+def preparar_colunas_anos(conexao, anos, tabela=TABELA_DESTINO, dialeto='mysql', arquivo_sql=None):
+    """Garante as colunas d_YYYY de `anos` na tabela; pode ser executado várias vezes.
+
+    Com `arquivo_sql` o comando é gravado no arquivo (para o DBA) em vez de executado.
+    Devolve a lista de colunas que faltavam.
+    """
+    faltantes = colunas_anos_faltantes(anos, colunas_existentes(conexao, tabela))
+    comandos = comandos_alter_anos(tabela, faltantes, dialeto)
+    if not comandos:
+        return faltantes
+
+    if arquivo_sql is not None:
+        with open(arquivo_sql, 'w', encoding='utf-8') as f:
+            f.write(";\n\n".join(comandos) + ";\n")
+        return faltantes
+
+    cursor = conexao.cursor()
+    try:
+        for comando in comandos:
+            cursor.execute(comando)
+        conexao.commit()
+    except Exception:
+        conexao.rollback()
+        raise
+    finally:
+        cursor.close()
+    return faltantes
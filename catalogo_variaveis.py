@@ -0,0 +1,157 @@
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+# =============================================================================
+# RESOLUÇÃO DO CATÁLOGO DE VARIÁVEIS (VAR -> GRUPO_VAR, SEXO_VAR, MergeKey)
+# =============================================================================
+# As regras são avaliadas na ordem abaixo; a primeira que casar define o grupo.
+# Cada regra vira uma única expressão regular pré-compilada, e cada texto de VAR
+# distinto é resolvido uma única vez.
+
+# Incrementar ao mudar as regras, invalidando as resoluções persistidas.
+REGRAS_VERSAO = 1
+
+REGRAS_GRUPO = [
+    ('0-4', ['0 a 4 anos', '0-4', '0 a 4']),
+    ('5-9', ['5 a 9 anos', '5-9', '5 a 9']),
+    ('10-14', ['10 a 14 anos', '10-14', '10 a 14']),
+    ('0-14', ['0 a 14 anos']),
+    ('15-29', ['15 a 29 anos']),
+    ('30-64', ['30 a 64 anos']),
+    ('65+', ['65 anos ou mais']),
+    ('90+', ['90 anos ou mais', '90+']),
+]
+
+_REGRAS_COMPILADAS = [
+    (grupo, re.compile('|'.join(re.escape(trecho) for trecho in trechos)))
+    for grupo, trechos in REGRAS_GRUPO
+]
+_RE_QUINQUENAL = re.compile(r'(\d{1,2})\s?a\s?(\d{1,2})\sanos')
+
+
+def extract_group_sex_variaveis(var_str):
+    """Extrai grupo e sexo de VAR e padroniza para a chave de mesclagem."""
+    if 'Feminina' in var_str:
+        sexo = 'feminina'
+    elif 'Masculina' in var_str:
+        sexo = 'masculina'
+    else:
+        sexo = 'total'
+
+    var_lower = var_str.lower()
+
+    for grupo, padrao in _REGRAS_COMPILADAS:
+        if padrao.search(var_lower):
+            return grupo, sexo
+
+    if 'total' in var_lower:
+        # Diferenciar entre diferentes tipos de total
+        if 'mulheres' in var_lower and 'feminina' in var_lower:
+            sexo = 'feminina'  # Para Mulheres - Total
+        elif 'homens' in var_lower or 'masculina' in var_lower:
+            sexo = 'masculina'  # Para Homens - Total
+        return 'total', sexo
+
+    # Quinquenais
+    match_idade = _RE_QUINQUENAL.search(var_lower)
+    if match_idade:
+        return f"{match_idade.group(1)}-{match_idade.group(2)}", sexo
+    return 'desconhecido', sexo
+
+
+def _ler_resolucoes(arquivo):
+    """Lê as resoluções persistidas, ou {} se o arquivo não existir ou for de outra versão."""
+    if arquivo is None or not os.path.exists(arquivo):
+        return {}
+    try:
+        with open(arquivo, encoding='utf-8') as f:
+            dados = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if dados.get('versao_regras') != REGRAS_VERSAO:
+        return {}
+    return {var: tuple(resolucao) for var, resolucao in dados.get('resolucoes', {}).items()}
+
+
+def _gravar_resolucoes(arquivo, resolucoes):
+    """Grava as resoluções (VAR -> [grupo, sexo]) de forma atômica."""
+    tmp_path = arquivo + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({'versao_regras': REGRAS_VERSAO, 'resolucoes': resolucoes}, f, ensure_ascii=False)
+    os.replace(tmp_path, arquivo)
+
+
+def arquivo_resolucoes(catalogo_file):
+    """Caminho do arquivo de MergeKeys persistido ao lado da planilha de variáveis."""
+    return os.path.splitext(catalogo_file)[0] + '.mergekeys.json'
+
+
+def resolver_catalogo(df_variaveis, arquivo=None):
+    """Cria GRUPO_VAR, SEXO_VAR e MergeKey, resolvendo cada VAR distinto uma única vez.
+
+    Com `arquivo`, as resoluções são reaproveitadas entre execuções e só os textos de
+    VAR novos passam pelas regras; o arquivo é regravado quando o catálogo muda.
+    """
+    codigos, unicos = pd.factorize(df_variaveis['VAR'])
+    conhecidas = _ler_resolucoes(arquivo)
+
+    resolucoes = {var: conhecidas.get(var) or extract_group_sex_variaveis(var) for var in unicos}
+    if arquivo is not None and resolucoes.keys() != conhecidas.keys():
+        _gravar_resolucoes(arquivo, {var: list(resolucao) for var, resolucao in resolucoes.items()})
+
+    grupos = np.array([resolucoes[var][0] for var in unicos], dtype=object)
+    sexos = np.array([resolucoes[var][1] for var in unicos], dtype=object)
+    df_variaveis['GRUPO_VAR'] = grupos[codigos]
+    df_variaveis['SEXO_VAR'] = sexos[codigos]
+    df_variaveis['MergeKey'] = df_variaveis['GRUPO_VAR'] + '|' + df_variaveis['SEXO_VAR']
+    return df_variaveis
+
+
+# =============================================================================
+# ÍNDICE MergeKey -> VAR_COD (JUNÇÃO UM-PARA-UM)
+# =============================================================================
+
+def construir_indice_chaves(df_variaveis, duplicadas='primeira'):
+    """Monta o índice MergeKey -> VAR_COD, verificando a unicidade das chaves.
+
+    Chaves com mais de um VAR_COD multiplicariam as linhas na junção. São listadas, e
+    com `duplicadas='primeira'` mantém-se o primeiro VAR_COD da planilha; com
+    `duplicadas='erro'` é levantado ValueError. Devolve (índice, DataFrame das duplicadas).
+    """
+    # Linhas repetidas (mesma chave e mesmo VAR_COD) não são conflito.
+    chaves = df_variaveis[['MergeKey', 'VAR_COD']].dropna().drop_duplicates()
+    repetidas = chaves['MergeKey'].duplicated(keep=False)
+    df_duplicadas = chaves[repetidas]
+
+    if not df_duplicadas.empty and duplicadas == 'erro':
+        raise ValueError(
+            "Erro: MergeKeys com mais de um VAR_COD na planilha de variáveis:\n"
+            + df_duplicadas.sort_values('MergeKey').to_string(index=False)
+        )
+
+    primeiras = chaves[~chaves['MergeKey'].duplicated(keep='first')]
+    indice = pd.Series(primeiras['VAR_COD'].to_numpy(), index=pd.Index(primeiras['MergeKey'].to_numpy()))
+    return indice, df_duplicadas
+
+
+def mapear_var_cod(merge_keys, indice):
+    """Atribui VAR_COD a cada MergeKey com uma única consulta ao índice.
+
+    Devolve a série de VAR_COD (NaN onde não houver correspondência) e as chaves sem
+    correspondência, calculadas em uma única passada sobre os valores distintos.
+    """
+    if isinstance(merge_keys.dtype, pd.CategoricalDtype):
+        # Consulta só as categorias e espalha pelos códigos.
+        codigos = merge_keys.cat.codes.to_numpy()
+        posicoes = np.where(codigos >= 0, indice.index.get_indexer(merge_keys.cat.categories)[codigos], -1)
+    else:
+        posicoes = indice.index.get_indexer(merge_keys)
+    encontrados = posicoes >= 0
+    var_cod = pd.Series(np.nan, index=merge_keys.index, dtype=float)
+    var_cod[encontrados] = indice.to_numpy()[posicoes[encontrados]]
+    sem_correspondencia = pd.unique(merge_keys[~encontrados].dropna())
+    return var_cod, [str(chave) for chave in sem_correspondencia]
@@ -0,0 +1,116 @@
+# =============================================================================
+# CONFIGURAÇÕES PADRÃO DO PROCESSAMENTO
+# =============================================================================
+# Valores usados quando nada é informado na linha de comando (Projeções_GO_2060.py)
+# ou no dicionário passado a pipeline.run(config). Este módulo não importa pandas,
+# para que a linha de comando responda rápido a --help e --validar.
+
+PROJECOES_FILE = "projecoes_2024.xlsx"
+VARIAVEIS_FILE = "Variáveis Projeção.xlsx"
+PROJECOES_SHEET = "2) POP_GRUPO QUINQUENAL"
+VARIAVEIS_SHEET = "Planilha1"
+OUTPUT_DIR = r"C:\Users\lorenna.santos\OneDrive - Subsecretaria de Tecnologia da Informação\Documentos\Projeções 2070"
+ANOS = [str(ano) for ano in range(2000, 2071)]
+CACHE_DIR = ".cache_planilhas"
+CACHE_MAX_BYTES = 512 * 1024 * 1024  # Limite do cache; entradas antigas são removidas
+FORCAR_RELEITURA = False  # True ignora o cache e relê as planilhas Excel
+# "stream": lê o XML da aba direto do .xlsx, só com as linhas das SIGLAS e as colunas usadas;
+# "openpyxl": leitura completa da aba via pandas (comportamento original).
+MOTOR_LEITURA = "stream"
+# UFs processadas. None processa todas as siglas presentes na planilha (modo lote);
+# LOC_NOME/LOC_COD de cada UF vêm de localidades.py.
+SIGLAS = ['GO']
+MAX_PROCESSOS = None  # Processos em paralelo no modo lote (None = nº de CPUs)
+# MergeKey associada a mais de um VAR_COD: "primeira" usa o primeiro VAR_COD da planilha
+# de variáveis (e avisa); "erro" interrompe a execução.
+CHAVES_DUPLICADAS = "primeira"
+# "anual": um arquivo {SIGLA}_{ANO}.csv por ano;
+# "largo": um único {SIGLA}_{ANO inicial}_{ANO final}.csv com todas as colunas d_YYYY (formato da tb_dados).
+MODO_EXPORTACAO = "anual"
+THREADS_ESCRITA = 8  # Arquivos gravados em paralelo (meça com python escrita_csv.py DIR)
+# Só regrava os anos cujos dados mudaram desde a última execução (manifesto de hashes
+# em OUTPUT_DIR). False regrava sempre todos os arquivos.
+EXPORTACAO_INCREMENTAL = True
+# Carga direta na tb_dados: módulo DB-API e argumentos de connect(), ex.:
+#   CONEXAO_BD = {'modulo': 'sqlite3', 'args': ['bde.db']}
+#   CONEXAO_BD = {'modulo': 'pymysql', 'kwargs': {'host': '...', 'user': '...', 'database': 'bde'}}
+# None mantém só a geração dos CSVs. PARAMSTYLE_BD = None usa o paramstyle do módulo.
+CONEXAO_BD = None
+PARAMSTYLE_BD = None
+# Colunas d_YYYY que faltarem na tb_dados são criadas automaticamente antes da carga.
+# "mysql" (BDE) gera um único ALTER TABLE com vários ADD COLUMN; com o módulo sqlite3
+# vale sempre "sqlite", que só aceita uma coluna por ALTER TABLE.
+DIALETO_BD = "mysql"
+ARQUIVO_DDL = None  # Caminho .sql: grava o ALTER TABLE para o DBA em vez de executá-lo
+# Teto de memória (MB, aproximado) para o processamento em lotes de localidades (projeções
+# municipais): a planilha é lida, agregada e gravada um lote por vez, cada município (CÓD.)
+# como uma localidade. None processa tudo em memória.
+MEMORIA_MAXIMA_MB = None
+# Regras de consistência (Homens + Mulheres = Ambos, faixas = linha Total da planilha, e as
+# de estrutura dos agregados 939-941/980-983; ver validacao.py)
+# conferidas antes de gravar qualquer arquivo: "aviso" imprime o relatório, "erro"
+# interrompe a execução se houver violação, "desligada" não confere. Diferenças até
+# TOLERANCIA_ABSOLUTA + TOLERANCIA_RELATIVA × |esperado| são aceitas. Em lotes, "erro"
+# confere todos os lotes antes do primeiro ser gravado (uma leitura a mais da planilha).
+VALIDACAO = "aviso"
+TOLERANCIA_ABSOLUTA = 0.5
+TOLERANCIA_RELATIVA = 0.0
+# "anual" exporta os valores das projeções; "trimestral" ou "mensal" exporta as séries
+# interpoladas (colunas d_2000T1... ou d_2000M01...) nos mesmos formatos de arquivo.
+# METODO_INTERPOLACAO: "linear" ou "geometrico" (taxa de crescimento constante).
+PERIODICIDADE = "anual"
+METODO_INTERPOLACAO = "linear"
+# Indicadores derivados (razões de dependência, índice de envelhecimento, razão de sexo,
+# proporção de 65+ e taxa de crescimento), exportados com os VAR_COD abaixo, com
+# CASAS_INDICADORES casas decimais. Não há códigos padrão: preencha os VAR_COD alocados
+# no BDE (distintos e fora do catálogo de variáveis) antes de usar --indicadores; um
+# código None omite o indicador, e sem nenhum código a execução é recusada.
+INDICADORES = False
+CODIGOS_INDICADORES = {
+    'razao_dependencia_total': None,
+    'razao_dependencia_jovens': None,
+    'razao_dependencia_idosos': None,
+    'indice_envelhecimento': None,
+    'razao_sexo': None,
+    'proporcao_65_mais': None,
+    'taxa_crescimento': None,
+}
+CASAS_INDICADORES = 2
+# Modo de comparação: "csv" compara o novo resultado com os CSVs já gravados em
+# OUTPUT_DIR e "bd" com as linhas da tb_dados (CONEXAO_BD). Nada é gravado além do
+# relatório de cada UF em DIRETORIO_DIFERENCAS/{SIGLA}.csv. None gera as saídas normalmente.
+COMPARAR_COM = None
+DIRETORIO_DIFERENCAS = "diferencas"
+# Diretório onde gravar o cubo (localidade × sexo × faixa × ano) das projeções, para
+# consultas posteriores com cubo_populacao.abrir_cubo (mmap). None não grava.
+CUBO_DIR = None
+# "debug" imprime os diagnósticos de grupos etários e MergeKeys (--verbose); "info" os omite.
+NIVEL_LOG = "info"
+# Métricas de cada etapa (tempo, CPU, linhas, pico de memória): uma linha JSON por
+# execução acrescentada a ARQUIVO_METRICAS (ex.: "metricas_execucoes.jsonl"). None (padrão)
+# não grava nada, para que uma reexecução sem mudanças não altere arquivos.
+# RESUMO_METRICAS imprime a tabela.
+ARQUIVO_METRICAS = None
+RESUMO_METRICAS = False
+MEDIR_MEMORIA = False  # True mede o pico alocado em cada etapa (tracemalloc; ~3x mais lento)
+
+NOMES = [
+    'PROJECOES_FILE', 'VARIAVEIS_FILE', 'PROJECOES_SHEET', 'VARIAVEIS_SHEET', 'OUTPUT_DIR',
+    'ANOS', 'CACHE_DIR', 'CACHE_MAX_BYTES', 'FORCAR_RELEITURA', 'MOTOR_LEITURA', 'SIGLAS',
+    'MAX_PROCESSOS', 'CHAVES_DUPLICADAS', 'MODO_EXPORTACAO', 'THREADS_ESCRITA',
+    'EXPORTACAO_INCREMENTAL', 'CONEXAO_BD', 'PARAMSTYLE_BD', 'DIALETO_BD', 'ARQUIVO_DDL',
+    'MEMORIA_MAXIMA_MB', 'VALIDACAO', 'TOLERANCIA_ABSOLUTA', 'TOLERANCIA_RELATIVA',
+    'PERIODICIDADE', 'METODO_INTERPOLACAO', 'INDICADORES', 'CODIGOS_INDICADORES',
+    'CASAS_INDICADORES', 'COMPARAR_COM', 'DIRETORIO_DIFERENCAS', 'CUBO_DIR', 'NIVEL_LOG',
+    'ARQUIVO_METRICAS', 'RESUMO_METRICAS', 'MEDIR_MEMORIA',
+]
+
+
+def configuracao_padrao(**alteracoes):
+    """Dicionário com as configurações padrão, com as alterações informadas aplicadas."""
+    config = {nome: globals()[nome] for nome in NOMES}
+    desconhecidas = set(alteracoes) - set(config)
+    if desconhecidas:
+        raise ValueError(f"Erro: Configurações desconhecidas: {', '.join(sorted(desconhecidas))}.")
+    config.update(alteracoes)
+    return config
@@ -0,0 +1,130 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from esquema import tipo_inteiro, transformar_categorias
+
+# =============================================================================
+# CUBO DE POPULAÇÃO (LOCALIDADE × SEXO × FAIXA × ANO)
+# =============================================================================
+# As linhas de projeção viram um array denso com um eixo por dimensão e uma lista
+# de rótulos para cada eixo. Agregados e consultas usam índices inteiros nesses
+# eixos, sem comparar textos de SEXO e GRUPO_ETARIO a cada filtro.
+#
+# gravar_cubo salva o cubo em um diretório (valores.npy, presentes.npy e
+# rotulos.json); abrir_cubo o abre com np.load(mmap_mode='r'), sem copiar os
+# valores para a memória:
+#
+#   cubo = abrir_cubo('cubo_2070')
+#   fatiar_cubo(cubo, siglas=['GO'], sexos=['Mulheres'], anos=['2047'])
+
+SEXOS = ['Ambos', 'Homens', 'Mulheres']
+# Faixas quinquenais em ordem crescente de idade (as mesmas de agregados.AGREGADOS).
+FAIXAS_QUINQUENAIS = [
+    '0-4', '5-9', '10-14', '15-19', '20-24', '25-29', '30-34', '35-39', '40-44', '45-49',
+    '50-54', '55-59', '60-64', '65-69', '70-74', '75-79', '80-84', '85-89', '90 ou mais'
+]
+EIXOS = ('siglas', 'sexos', 'faixas', 'anos')
+
+
+def padronizar_grupo_etario(grupos):
+    """Grupos etários da planilha no formato de FAIXAS_QUINQUENAIS ('00-04' -> '0-4')."""
+    return (
+        grupos.astype(str).str.strip()
+        .str.replace('00-04', '0-4', regex=False)
+        .str.replace('05-09', '5-9', regex=False)
+        .str.replace('10-14', '10-14', regex=False)
+    )
+
+
+def construir_cubo(df, anos, faixas=FAIXAS_QUINQUENAIS, sexos=SEXOS, coluna_grupo='GRUPO_ETARIO',
+                   coluna_localidade='SIGLA'):
+    """Monta o cubo a partir das linhas de projeção de uma ou de várias localidades.
+
+    O eixo de localidades (`siglas`) vem de `coluna_localidade`; use LOCALIDADE para
+    separar os municípios de uma mesma SIGLA.
+
+    O eixo de faixas começa pelas `faixas` (em ordem de idade); grupos da planilha fora
+    delas vêm em seguida, na ordem em que aparecem. Linhas repetidas são somadas e
+    valores vazios contam como zero, como no groupby().sum(). `presentes[l, s, f]`
+    indica se a combinação tinha alguma linha na planilha.
+    """
+    anos = [ano for ano in anos if ano in df.columns]
+    grupos = transformar_categorias(df[coluna_grupo], padronizar_grupo_etario).astype(str)
+    siglas = pd.unique(df[coluna_localidade].dropna().astype(str))
+    extras = [grupo for grupo in pd.unique(grupos) if grupo not in set(faixas)]
+    faixas = [*faixas, *extras]
+
+    cod_sigla = pd.Categorical(df[coluna_localidade].astype(str), categories=siglas).codes
+    cod_sexo = pd.Categorical(df['SEXO'].astype(str), categories=sexos).codes
+    cod_faixa = pd.Categorical(grupos, categories=faixas).codes
+    validas = (cod_sigla >= 0) & (cod_sexo >= 0) & (cod_faixa >= 0) & df[coluna_grupo].notna().to_numpy()
+
+    formato = (len(siglas), len(sexos), len(faixas))
+    posicao = np.ravel_multi_index((cod_sigla[validas], cod_sexo[validas], cod_faixa[validas]), formato)
+    matriz = np.nan_to_num(df[anos].to_numpy(dtype=np.float64)[validas])
+
+    valores = np.zeros((int(np.prod(formato)), len(anos)))
+    np.add.at(valores, posicao, matriz)
+    presentes = np.bincount(posicao, minlength=int(np.prod(formato))) > 0
+    tipo = tipo_inteiro(valores)
+    return {
+        'siglas': [str(sigla) for sigla in siglas],
+        'sexos': list(sexos),
+        'faixas': faixas,
+        'anos': anos,
+        'valores': (valores if tipo is None else valores.astype(tipo)).reshape(*formato, len(anos)),
+        'presentes': presentes.reshape(formato),
+    }
+
+
+def gravar_cubo(cubo, diretorio):
+    """Grava valores.npy, presentes.npy e rotulos.json no diretório."""
+    os.makedirs(diretorio, exist_ok=True)
+    np.save(os.path.join(diretorio, 'valores.npy'), np.ascontiguousarray(cubo['valores']))
+    np.save(os.path.join(diretorio, 'presentes.npy'), np.ascontiguousarray(cubo['presentes']))
+    with open(os.path.join(diretorio, 'rotulos.json'), 'w', encoding='utf-8') as f:
+        json.dump({eixo: list(cubo[eixo]) for eixo in EIXOS}, f, ensure_ascii=False)
+
+
+def abrir_cubo(diretorio, mmap_mode='r'):
+    """Abre um cubo gravado por gravar_cubo; com mmap_mode, os valores ficam no disco."""
+    try:
+        with open(os.path.join(diretorio, 'rotulos.json'), encoding='utf-8') as f:
+            rotulos = json.load(f)
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Erro: Cubo '{diretorio}' não encontrado.")
+    cubo = {eixo: rotulos[eixo] for eixo in EIXOS}
+    cubo['valores'] = np.load(os.path.join(diretorio, 'valores.npy'), mmap_mode=mmap_mode)
+    cubo['presentes'] = np.load(os.path.join(diretorio, 'presentes.npy'), mmap_mode=mmap_mode)
+    formato = tuple(len(cubo[eixo]) for eixo in EIXOS)
+    if cubo['valores'].shape != formato:
+        raise ValueError(f"Erro: Cubo '{diretorio}' com formato {cubo['valores'].shape}, esperado {formato}.")
+    return cubo
+
+
+def posicoes_eixo(cubo, eixo, rotulos):
+    """Índices inteiros dos rótulos no eixo (None = o eixo inteiro)."""
+    if rotulos is None:
+        return np.arange(len(cubo[eixo]))
+    posicao = {rotulo: i for i, rotulo in enumerate(cubo[eixo])}
+    faltantes = [str(rotulo) for rotulo in rotulos if str(rotulo) not in posicao]
+    if faltantes:
+        raise ValueError(f"Erro: {', '.join(faltantes)} fora do eixo '{eixo}' do cubo.")
+    return np.array([posicao[str(rotulo)] for rotulo in rotulos], dtype=np.intp)
+
+
+def fatiar_cubo(cubo, siglas=None, sexos=None, faixas=None, anos=None):
+    """Sub-cubo com os rótulos pedidos em cada eixo (None = todos), na ordem pedida.
+
+    Devolve um novo dicionário de cubo; em um cubo aberto com mmap só as posições
+    pedidas são lidas do disco.
+    """
+    pedidos = dict(zip(EIXOS, (siglas, sexos, faixas, anos)))
+    indices = [posicoes_eixo(cubo, eixo, pedidos[eixo]) for eixo in EIXOS]
+    fatia = {eixo: [cubo[eixo][i] for i in idx] for eixo, idx in zip(EIXOS, indices)}
+    fatia['valores'] = np.asarray(cubo['valores'][np.ix_(*indices)])
+    fatia['presentes'] = np.asarray(cubo['presentes'][np.ix_(*indices[:3])])
+    return fatia
@@ -0,0 +1,67 @@
+# =============================================================================
+# DIAGNÓSTICOS DE GRUPOS ETÁRIOS E MergeKeys
+# =============================================================================
+# Relatórios de conferência calculados em uma única passada agrupada
+# (value_counts) ou por conjuntos, em vez de refiltrar o DataFrame para cada
+# grupo ou código. Só rodam com NIVEL_LOG = "debug" (--verbose na linha de
+# comando); a verificação final dos códigos especiais roda sempre.
+
+NIVEIS_LOG = ('info', 'debug')
+CODIGOS_ESPECIAIS = [939, 940, 941, 942, 943, 944, 979, 980, 981, 982, 983]
+
+
+def diagnostico_ativo(nivel_log):
+    """True se o nível de log pede os relatórios de diagnóstico."""
+    if nivel_log not in NIVEIS_LOG:
+        raise ValueError(f"Erro: NIVEL_LOG '{nivel_log}' inválido (use {', '.join(NIVEIS_LOG)}).")
+    return nivel_log == 'debug'
+
+
+def imprimir_grupos_etarios(df_go):
+    """Lista os grupos etários com SEXO='Ambos' e quantas linhas cada um tem."""
+    ambos = df_go['SEXO'] == 'Ambos'
+    contagem = df_go.loc[ambos, 'GRUPO_ETARIO'].value_counts()
+    contagem = contagem[contagem > 0]  # Em colunas categóricas, value_counts lista todas as categorias.
+
+    print("\n" + "="*80)
+    print("DEBUG: Grupos Etários Disponíveis")
+    print("="*80)
+
+    print(f"\nLinhas com SEXO='Ambos': {int(ambos.sum())}")
+    print("Grupos etários únicos em df_go_ambos:")
+    for grupo, count in sorted(contagem.items()):
+        print(f"  '{grupo}' - {count} linhas")
+
+
+def imprimir_merge_keys(df_go, df_variaveis, codigos=CODIGOS_ESPECIAIS):
+    """Imprime a comparação das MergeKeys dos códigos especiais entre as duas bases."""
+    print("\n" + "="*80)
+    print("DEBUG: Verificação de MergeKeys")
+    print("="*80)
+
+    print("\nMergeKeys em df_variaveis para códigos 939-944 e 979-983:")
+    df_especiais = df_variaveis[df_variaveis['VAR_COD'].isin(codigos)]
+    print(df_especiais[['VAR_COD', 'GRUPO_VAR', 'SEXO_VAR', 'MergeKey']].to_string())
+
+    print("\n\nComparação - df_go vs df_variaveis:")
+    merge_keys_go = set(df_go['MergeKey'].unique())
+    # Primeira MergeKey de cada código, na ordem da planilha.
+    primeiras = df_especiais.drop_duplicates('VAR_COD').set_index('VAR_COD')['MergeKey']
+    print("MergeKey (df_variaveis)    | Status em df_go")
+    print("="*50)
+    for cod in codigos:
+        if cod in primeiras.index:
+            key = primeiras[cod]
+            status = "✓" if key in merge_keys_go else "✗"
+            print(f"Código {cod}: {key:<25} {status}")
+
+
+def imprimir_codigos_mapeados(df_final, codigos=CODIGOS_ESPECIAIS):
+    """Confere se cada código especial chegou ao resultado final (uma contagem só)."""
+    contagem = df_final['VAR_COD'].value_counts()
+    print("\nVerificação dos códigos especiais:")
+    for cod in codigos:
+        if cod in contagem.index:
+            print(f"✓ Código {cod} foi mapeado com sucesso. ({contagem[cod]} linhas)")
+        else:
+            print(f"✗ Aviso: O código {cod} AINDA está faltando no resultado final.")
@@ -0,0 +1,137 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+# =============================================================================
+# DIFERENÇAS EM RELAÇÃO ÀS SAÍDAS JÁ PUBLICADAS
+# =============================================================================
+# Relê os CSVs de OUTPUT_DIR (modo anual ou largo) ou as linhas da tb_dados,
+# converte os números do padrão brasileiro de volta e compara com o novo
+# df_final em uma única operação sobre a matriz (VAR_COD × ano) alinhada.
+# As linhas são alinhadas por (VAR_COD, ocorrência), para que um VAR_COD
+# repetido não se misture (a ocorrência, 0 na primeira, vai para o relatório);
+# os novos valores são arredondados como na exportação antes de comparar.
+
+COLUNAS_RELATORIO = ['VAR_COD', 'ocorrencia', 'ano', 'situacao', 'anterior', 'novo', 'diferenca', 'diferenca_relativa']
+
+
+def ler_numeros_br(valores):
+    """Converte textos no padrão brasileiro ('1.500', '52,31') em float; vazios viram NaN.
+
+    Valores que já são números (ex.: colunas numéricas do banco) passam direto.
+    """
+    arr = np.asarray(valores, dtype=object)
+    serie = pd.Series(arr.ravel(), dtype=object)
+    textos = serie.str.len().notna()
+    convertidos = pd.to_numeric(
+        serie[textos].str.replace('.', '', regex=False).str.replace(',', '.', regex=False), errors='coerce'
+    )
+    numeros = pd.to_numeric(serie[~textos], errors='coerce')
+    resultado = pd.concat([convertidos, numeros]).reindex(serie.index).to_numpy(dtype=np.float64)
+    return resultado.reshape(arr.shape)
+
+
+def chaves_linhas(var_cods):
+    """Índice (VAR_COD, ocorrência) das linhas, na ordem em que aparecem."""
+    var_cods = pd.Series(np.asarray(var_cods, dtype=np.int64))
+    ocorrencia = var_cods.groupby(var_cods).cumcount()
+    return pd.MultiIndex.from_arrays([var_cods.to_numpy(), ocorrencia.to_numpy()], names=['VAR_COD', 'ocorrencia'])
+
+
+def tabela_valores(var_cods, matriz, anos):
+    """DataFrame (VAR_COD, ocorrência) × anos com os valores em float."""
+    return pd.DataFrame(np.asarray(matriz, dtype=np.float64), index=chaves_linhas(var_cods), columns=list(anos))
+
+
+def ler_publicados_csv(output_dir, sigla, anos, modo='anual'):
+    """Valores dos CSVs já gravados da sigla, ou None se nenhum arquivo existir.
+
+    Anos cujo arquivo (modo anual) ou coluna (modo largo) não existe ficam NaN.
+    """
+    leitura = dict(sep=';', encoding='latin-1', dtype=str, keep_default_na=False)
+    if modo == 'largo':
+        caminho = os.path.join(output_dir, f"{sigla}_{anos[0]}_{anos[-1]}.csv")
+        if not os.path.exists(caminho):
+            return None
+        df = pd.read_csv(caminho, **leitura)
+        colunas = df.reindex(columns=[f"d_{ano}" for ano in anos])
+        return tabela_valores(df['VAR_COD'].astype(int), ler_numeros_br(colunas.to_numpy(dtype=object)), anos)
+
+    colunas = {}
+    for ano in anos:
+        caminho = os.path.join(output_dir, f"{sigla}_{ano}.csv")
+        if os.path.exists(caminho):
+            df = pd.read_csv(caminho, usecols=['VAR_COD', f"d_{ano}"], **leitura)
+            colunas[ano] = pd.Series(ler_numeros_br(df[f"d_{ano}"]), index=chaves_linhas(df['VAR_COD'].astype(int)))
+    if not colunas:
+        return None
+    return pd.concat(colunas, axis=1).reindex(columns=list(anos))
+
+
+def arredondar_como_exportado(matriz, casas=None):
+    """Arredonda cada linha com as casas decimais da exportação (par mais próximo, como o formatador)."""
+    matriz = np.asarray(matriz, dtype=np.float64)
+    if casas is None:
+        return np.rint(matriz)
+    escala = (10.0 ** np.asarray(casas))[:, None]
+    return np.rint(matriz * escala) / escala
+
+
+def comparar_saidas(anterior, novo):
+    """Relatório das diferenças entre duas tabelas (VAR_COD, ocorrência) × anos.
+
+    Cada célula alterada vira uma linha ('alterado'); linhas (VAR_COD, ocorrência) que
+    só existem em uma das tabelas viram uma linha 'adicionado' ou 'removido', sem ano.
+    """
+    anos = list(novo.columns)
+    chaves = novo.index.append(anterior.index.difference(novo.index, sort=False))
+    valores_anteriores = anterior.reindex(index=chaves, columns=anos).to_numpy(dtype=np.float64)
+    valores_novos = novo.reindex(index=chaves).to_numpy(dtype=np.float64)
+    em_anterior = chaves.isin(anterior.index)
+    em_novo = chaves.isin(novo.index)
+
+    iguais = (valores_anteriores == valores_novos) | (np.isnan(valores_anteriores) & np.isnan(valores_novos))
+    linhas, colunas = np.nonzero(~iguais & (em_anterior & em_novo)[:, None])
+    var_cods = chaves.get_level_values('VAR_COD').to_numpy()
+    ocorrencias = chaves.get_level_values('ocorrencia').to_numpy()
+    anteriores = valores_anteriores[linhas, colunas]
+    novos = valores_novos[linhas, colunas]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        relativas = np.where(anteriores != 0, (novos - anteriores) / np.abs(anteriores), np.nan)
+    alterados = pd.DataFrame({
+        'VAR_COD': var_cods[linhas],
+        'ocorrencia': ocorrencias[linhas],
+        'ano': np.asarray(anos, dtype=object)[colunas],
+        'situacao': 'alterado',
+        'anterior': anteriores,
+        'novo': novos,
+        'diferenca': novos - anteriores,
+        'diferenca_relativa': relativas,
+    })
+
+    so_novo = em_novo & ~em_anterior
+    so_anterior = em_anterior & ~em_novo
+    adicionados = pd.DataFrame({'VAR_COD': var_cods[so_novo], 'ocorrencia': ocorrencias[so_novo],
+                                'situacao': 'adicionado'})
+    removidos = pd.DataFrame({'VAR_COD': var_cods[so_anterior], 'ocorrencia': ocorrencias[so_anterior],
+                              'situacao': 'removido'})
+    partes = [parte for parte in (adicionados, removidos, alterados) if not parte.empty]
+    if not partes:
+        return pd.DataFrame(columns=COLUNAS_RELATORIO)
+    return pd.concat(partes, ignore_index=True).reindex(columns=COLUNAS_RELATORIO)
+
+
+def resumo_diferencas(relatorio):
+    """Uma linha com as contagens do relatório e a maior variação absoluta."""
+    if relatorio.empty:
+        return "✓ Nenhuma diferença em relação às saídas publicadas."
+    situacoes = relatorio['situacao'].value_counts()
+    alterados = relatorio[relatorio['situacao'] == 'alterado']
+    texto = (f"✗ Diferenças: {situacoes.get('alterado', 0)} células alteradas em "
+             f"{alterados['VAR_COD'].nunique()} VAR_COD, {situacoes.get('adicionado', 0)} VAR_COD adicionados, "
+             f"{situacoes.get('removido', 0)} removidos")
+    if not alterados.empty:
+        maior = alterados.loc[alterados['diferenca'].abs().idxmax()]
+        texto += f"; maior variação: VAR_COD {maior['VAR_COD']} em d_{maior['ano']} ({maior['diferenca']:+,.2f})"
+    return texto
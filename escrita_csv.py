@@ -0,0 +1,99 @@
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# =============================================================================
+# ESCRITA CONCORRENTE DE ARQUIVOS
+# =============================================================================
+# Os arquivos já renderizados em memória são gravados por um pool de threads em
+# um diretório temporário dentro do destino e, só depois que todos terminaram,
+# renomeados um a um para o nome final. Uma falha na gravação não substitui nenhum
+# arquivo; cada renomeação é atômica, mas o conjunto não: uma interrupção no meio
+# das renomeações deixa anos novos e antigos misturados. Como o manifesto só é
+# gravado depois, a execução seguinte regrava os anos que ficaram para trás.
+#
+# Em disco local as threads não ganham da gravação serial (python escrita_csv.py
+# mediu 0,003 s contra 0,004 s para 71 arquivos de 100 KiB). A ideia é sobrepor a
+# abertura/fechamento de arquivos em pastas sincronizadas (OneDrive) ou de rede,
+# o que ainda não foi medido; THREADS_ESCRITA = 1 grava um arquivo por vez.
+
+THREADS_ESCRITA = 8
+
+
+def _gravar(caminho, conteudo):
+    """Grava os bytes de um arquivo de uma só vez."""
+    with open(caminho, 'wb') as f:
+        f.write(conteudo)
+    return len(conteudo)
+
+
+def escrever_arquivos(arquivos, output_dir, max_threads=THREADS_ESCRITA):
+    """Grava {nome: bytes} em output_dir com um pool de threads e renomeação no final.
+
+    Se alguma gravação falhar, nenhum arquivo final é substituído; as renomeações são
+    feitas uma por arquivo, sem atomicidade do conjunto. Devolve um dicionário com
+    arquivos, bytes, segundos e as taxas por segundo.
+    """
+    inicio = time.perf_counter()
+    os.makedirs(output_dir, exist_ok=True)
+    temp_dir = tempfile.mkdtemp(prefix='.escrita_', dir=output_dir)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_threads) as executor:
+            futuros = [
+                executor.submit(_gravar, os.path.join(temp_dir, nome), conteudo)
+                for nome, conteudo in arquivos.items()
+            ]
+            total_bytes = sum(futuro.result() for futuro in futuros)
+
+        # Todos gravados: renomeia cada um para o nome final.
+        for nome in arquivos:
+            os.replace(os.path.join(temp_dir, nome), os.path.join(output_dir, nome))
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+    segundos = max(time.perf_counter() - inicio, 1e-9)
+    return {
+        'arquivos': len(arquivos),
+        'bytes': total_bytes,
+        'segundos': segundos,
+        'arquivos_por_s': len(arquivos) / segundos,
+        'bytes_por_s': total_bytes / segundos,
+    }
+
+
+def resumo_escrita(estatisticas):
+    """Texto curto com o desempenho da escrita."""
+    return (
+        f"{estatisticas['arquivos']} arquivos, {estatisticas['bytes'] / 1024:,.0f} KiB em "
+        f"{estatisticas['segundos']:.2f} s ({estatisticas['arquivos_por_s']:,.0f} arquivos/s, "
+        f"{estatisticas['bytes_por_s'] / 1024 / 1024:,.1f} MiB/s)"
+    )
+
+
+# =============================================================================
+# BENCHMARK: python escrita_csv.py [DIRETÓRIO]
+# =============================================================================
+# Compara a gravação serial (um arquivo por vez, como o laço original) com a
+# concorrente no diretório informado; rode na pasta do OneDrive/rede de OUTPUT_DIR
+# para saber se as threads compensam ali.
+
+if __name__ == '__main__':
+    destino = sys.argv[1] if len(sys.argv) > 1 else tempfile.mkdtemp(prefix='bench_escrita_')
+    conteudo = ("LOC_NOME;LOC_COD;VAR_COD;d_2000\n" + "Estado de Goiás;1000;939;7.056.495\n" * 3000).encode('latin-1')
+    arquivos = {f"BENCH_{ano}.csv": conteudo for ano in range(2000, 2071)}
+
+    inicio = time.perf_counter()
+    serial_dir = os.path.join(destino, 'serial')
+    os.makedirs(serial_dir, exist_ok=True)
+    for nome, dados in arquivos.items():
+        _gravar(os.path.join(serial_dir, nome), dados)
+    t_serial = time.perf_counter() - inicio
+
+    estatisticas = escrever_arquivos(arquivos, os.path.join(destino, 'concorrente'))
+    print(f"Destino: {destino}")
+    print(f"  serial:      {t_serial:.3f} s")
+    print(f"  concorrente: {resumo_escrita(estatisticas)}")
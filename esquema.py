@@ -0,0 +1,124 @@
+import numpy as np
+import pandas as pd
+
+# =============================================================================
+# TIPOS COMPACTOS DAS PROJEÇÕES
+# =============================================================================
+# Logo após a leitura, SIGLA, SEXO, GRUPO_ETARIO, COD e LOCAL viram categorias e
+# as colunas de ano (contagens de pessoas) viram inteiros. As funções abaixo aplicam
+# as transformações de texto só às categorias distintas e concatenam novas linhas
+# sem voltar a object/float64.
+
+COLUNAS_DIMENSAO = ['SIGLA', 'SEXO', 'GRUPO_ETARIO', 'COD', 'LOCAL']
+# int32 comporta até 2,1 bilhões: sobra espaço para os totais agregados de qualquer
+# localidade. Tipos menores estourariam nas somas.
+TIPOS_INTEIROS = [np.int32, np.int64]
+
+
+def memoria_bytes(df):
+    """Memória ocupada pelo DataFrame, incluindo o conteúdo das strings."""
+    return int(df.memory_usage(deep=True).sum())
+
+
+def tipo_inteiro(valores):
+    """Menor tipo de TIPOS_INTEIROS que representa os valores, ou None se não forem inteiros."""
+    valores = np.asarray(valores, dtype=np.float64)
+    if valores.size == 0:
+        return TIPOS_INTEIROS[0]
+    if not np.isfinite(valores).all() or (valores != np.round(valores)).any():
+        return None
+    minimo, maximo = valores.min(), valores.max()
+    for tipo in TIPOS_INTEIROS:
+        limites = np.iinfo(tipo)
+        if limites.min <= minimo and maximo <= limites.max:
+            return tipo
+    return None
+
+
+def compactar_tipos(df, anos, dimensoes=COLUNAS_DIMENSAO):
+    """Converte as dimensões em categorias e os anos no menor inteiro que os comporta.
+
+    Colunas de ano com valores vazios ou fracionários continuam float64.
+    """
+    for coluna in dimensoes:
+        if coluna in df.columns and not isinstance(df[coluna].dtype, pd.CategoricalDtype):
+            df[coluna] = df[coluna].astype('category')
+
+    anos = [ano for ano in anos if ano in df.columns]
+    if anos:
+        matriz = df[anos].to_numpy(dtype=np.float64)
+        tipo = tipo_inteiro(matriz)
+        if tipo is not None:
+            df[anos] = matriz.astype(tipo)
+    return df
+
+
+def transformar_categorias(serie, funcao):
+    """Aplica `funcao` (Series de texto -> Series de texto) só aos valores distintos.
+
+    Em uma coluna categórica o resultado continua categórico; nas demais, `funcao` é
+    aplicada à coluna inteira.
+    """
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        return funcao(serie)
+    novas = funcao(pd.Series(serie.cat.categories))
+    codigos_novos, categorias = pd.factorize(novas.to_numpy())
+    codigos = serie.cat.codes.to_numpy()
+    codigos = np.where(codigos >= 0, codigos_novos[codigos], -1)
+    return pd.Series(pd.Categorical.from_codes(codigos, categorias), index=serie.index, name=serie.name)
+
+
+def combinar_categorias(esquerda, direita, separador='|'):
+    """Equivale a esquerda + separador + direita, montando só as combinações distintas."""
+    if not (isinstance(esquerda.dtype, pd.CategoricalDtype) and isinstance(direita.dtype, pd.CategoricalDtype)):
+        return esquerda.astype(object) + separador + direita.astype(object)
+    cat_esq, cat_dir = esquerda.cat.categories, direita.cat.categories
+    cod_esq, cod_dir = esquerda.cat.codes.to_numpy(), direita.cat.codes.to_numpy()
+    codigos = np.where((cod_esq >= 0) & (cod_dir >= 0), cod_esq.astype(np.int64) * len(cat_dir) + cod_dir, -1)
+    usados, codigos_novos = np.unique(codigos[codigos >= 0], return_inverse=True)
+    categorias = [f"{cat_esq[c // len(cat_dir)]}{separador}{cat_dir[c % len(cat_dir)]}" for c in usados]
+    resultado = np.full(len(codigos), -1, dtype=np.int64)
+    resultado[codigos >= 0] = codigos_novos
+    return pd.Series(pd.Categorical.from_codes(resultado, categorias), index=esquerda.index)
+
+
+def concatenar_compacto(df_base, df_novo):
+    """Acrescenta as linhas de df_novo mantendo as categorias e os inteiros de df_base.
+
+    As categorias que faltam são acrescentadas; uma coluna inteira só é promovida
+    (ex.: int32 -> int64) se os novos valores não couberem nela.
+    """
+    df_base = df_base.copy(deep=False)
+    df_novo = df_novo.copy(deep=False)
+    tipos_base = df_base.dtypes
+    comuns = [coluna for coluna in df_base.columns if coluna in df_novo.columns]
+
+    for coluna in comuns:
+        tipo = tipos_base[coluna]
+        if isinstance(tipo, pd.CategoricalDtype):
+            novas = pd.Index(pd.unique(df_novo[coluna].dropna())).difference(tipo.categories)
+            if len(novas):
+                df_base[coluna] = df_base[coluna].cat.add_categories(novas)
+            df_novo[coluna] = df_novo[coluna].astype(df_base[coluna].dtype)
+
+    # Colunas inteiras (os anos) são convertidas em bloco, não coluna a coluna.
+    tipos_novo = df_novo.dtypes
+    inteiras = [
+        coluna for coluna in comuns
+        if pd.api.types.is_integer_dtype(tipos_base[coluna]) and pd.api.types.is_numeric_dtype(tipos_novo[coluna])
+    ]
+    if inteiras:
+        matriz = df_novo[inteiras].to_numpy(dtype=np.float64)
+        tipo_novo = tipo_inteiro(matriz)
+        if tipo_novo is not None:
+            promover = [coluna for coluna in inteiras if np.dtype(tipo_novo).itemsize > tipos_base[coluna].itemsize]
+            if promover:
+                df_base = df_base.astype({coluna: tipo_novo for coluna in promover})
+                tipos_base = df_base.dtypes
+            tipos = {tipos_base[coluna] for coluna in inteiras}
+            if len(tipos) == 1:
+                bloco = pd.DataFrame(matriz.astype(tipos.pop()), index=df_novo.index, columns=inteiras)
+                df_novo = pd.concat([df_novo.drop(columns=inteiras), bloco], axis=1)[list(df_novo.columns)]
+            else:
+                df_novo = df_novo.astype({coluna: tipos_base[coluna] for coluna in inteiras})
+    return pd.concat([df_base, df_novo], ignore_index=True)
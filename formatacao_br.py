@@ -0,0 +1,126 @@
+import time
+
+import numpy as np
+
+# =============================================================================
+# FORMATAÇÃO NUMÉRICA PADRÃO BRASILEIRO (MILHAR COM PONTO, DECIMAIS COM VÍRGULA)
+# =============================================================================
+
+# Acima deste valor o int64 não comporta o número arredondado; usa-se o formatador escalar.
+_LIMITE_VETORIAL = 1e18
+
+
+def formatar_numero_br(x):
+    """Formata o número no padrão brasileiro, sem casas decimais (ex.: 1.500)."""
+    return f"{x:,.0f}".replace(",", "TEMP_SEP").replace(".", ",").replace("TEMP_SEP", ".")
+
+
+_POTENCIAS_10 = 10 ** np.arange(19, dtype=np.int64)
+
+
+def _formatar_mesmo_tamanho(absolutos, n_digitos):
+    """Formata inteiros não negativos que têm todos `n_digitos` dígitos.
+
+    Monta diretamente a matriz de códigos de caractere (um número por linha), com os
+    pontos em posições fixas, e a reinterpreta como um array de strings.
+    """
+    largura = n_digitos + (n_digitos - 1) // 3
+    caracteres = np.full((len(absolutos), largura), ord('.'), dtype=np.uint32)
+    for k in range(n_digitos):
+        # Dígito k (da direita) vai para a coluna que desconta os pontos à sua direita.
+        coluna = largura - 1 - k - k // 3
+        caracteres[:, coluna] = (absolutos // _POTENCIAS_10[k]) % 10 + ord('0')
+    return caracteres.view(f'U{largura}').ravel()
+
+
+def formatar_inteiros_br(valores):
+    """Formata um array numérico (1-D ou 2-D) de uma só vez no padrão brasileiro.
+
+    O resultado é idêntico, célula a célula, ao de formatar_numero_br: arredondamento
+    para o par mais próximo, '-0' para negativos arredondados a zero e 'nan'/'inf' para
+    valores não finitos. Devolve um array de strings com a mesma forma da entrada.
+    """
+    arr = np.asarray(valores, dtype=np.float64)
+    forma = arr.shape
+    arr = arr.ravel()
+
+    arredondados = np.rint(arr)
+    vetoriais = np.isfinite(arredondados) & (np.abs(arredondados) < _LIMITE_VETORIAL)
+    negativos = np.signbit(arredondados) & vetoriais
+
+    absolutos = np.abs(np.where(vetoriais, arredondados, 0)).astype(np.int64)
+    n_digitos = np.maximum(np.searchsorted(_POTENCIAS_10, absolutos, side='right'), 1)
+
+    # Não finitos e valores fora do int64 (raros) passam pelo formatador escalar.
+    escalares = {i: formatar_numero_br(arr[i]) for i in np.flatnonzero(~vetoriais)}
+    max_digitos = int(n_digitos.max()) if len(arr) else 1
+    largura = max([max_digitos + (max_digitos - 1) // 3 + 1] + [len(texto) for texto in escalares.values()])
+
+    saida = np.empty(len(arr), dtype=f'U{largura}')
+    for tamanho in range(1, max_digitos + 1):
+        selecao = n_digitos == tamanho
+        if selecao.any():
+            saida[selecao] = _formatar_mesmo_tamanho(absolutos[selecao], tamanho)
+    saida[negativos] = np.char.add('-', saida[negativos])
+    for i, texto in escalares.items():
+        saida[i] = texto
+    return saida.reshape(forma)
+
+
+def formatar_decimais_br(valores, casas):
+    """Formata com `casas` casas decimais no padrão brasileiro (ex.: 1.500,25).
+
+    Valores não finitos (ex.: divisões por zero nos indicadores) viram texto vazio.
+    """
+    if casas == 0:
+        return formatar_inteiros_br(valores)
+    arr = np.asarray(valores, dtype=np.float64)
+    escala = 10 ** casas
+    escalados = np.rint(arr * escala)
+    finitos = np.isfinite(escalados) & (np.abs(escalados) < _LIMITE_VETORIAL)
+    absolutos = np.abs(np.where(finitos, escalados, 0)).astype(np.int64)
+
+    texto = np.char.add(np.char.add(formatar_inteiros_br(absolutos // escala), ','),
+                        np.char.zfill((absolutos % escala).astype(str), casas))
+    texto = np.where(np.signbit(escalados) & (absolutos > 0), np.char.add('-', texto), texto)
+    return np.where(finitos, texto, '')
+
+
+def formatar_linhas_br(valores, casas):
+    """Formata uma matriz 2-D com `casas[i]` casas decimais na linha i.
+
+    Linhas com 0 casas saem exatamente como em formatar_inteiros_br.
+    """
+    arr = np.asarray(valores, dtype=np.float64)
+    casas = np.asarray(casas)
+    saida = np.empty(arr.shape, dtype=object)
+    for n_casas in np.unique(casas):
+        selecao = casas == n_casas
+        saida[selecao] = formatar_decimais_br(arr[selecao], int(n_casas))
+    return saida
+
+
+# =============================================================================
+# BENCHMARK: python formatacao_br.py
+# =============================================================================
+
+if __name__ == '__main__':
+    rng = np.random.default_rng(0)
+    # Matriz do tamanho de 27 UFs x ~3.000 VAR_COD x 71 anos, com negativos e NaN.
+    matriz = rng.integers(-10_000_000, 250_000_000, size=(27 * 3000, 71)).astype(np.float64)
+    matriz[rng.random(matriz.shape) < 0.001] = np.nan
+    matriz[:, 0] = rng.normal(0, 2, size=len(matriz)).round(1)  # inclui -0,x e empates .5
+    print(f"Matriz de teste: {matriz.shape[0]} x {matriz.shape[1]} = {matriz.size:,} células")
+
+    inicio = time.perf_counter()
+    referencia = np.array([formatar_numero_br(x) for x in matriz.ravel()], dtype=object).reshape(matriz.shape)
+    t_lambda = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    vetorizado = formatar_inteiros_br(matriz)
+    t_vetor = time.perf_counter() - inicio
+
+    iguais = bool((vetorizado.astype(object) == referencia).all())
+    print(f"  lambda por célula: {t_lambda:8.2f} s")
+    print(f"  vetorizado:        {t_vetor:8.2f} s  ({t_lambda / t_vetor:.1f}x)")
+    print(f"  {'✓' if iguais else '✗'} Saídas idênticas")
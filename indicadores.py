@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+from indice_etario import consultar_faixas, indice_do_cubo
+
+# =============================================================================
+# INDICADORES DEMOGRÁFICOS DERIVADOS
+# =============================================================================
+# Calculados a partir das mesmas faixas de AGREGADOS (0-14, 15-29 + 30-64 e
+# 65 ou mais), para todas as localidades do cubo e todos os anos de uma vez.
+# Cada indicador vira uma linha com o VAR_COD de CODIGOS_INDICADORES
+# (configuracao.py) e sai nos mesmos CSVs/tb_dados das contagens.
+
+# (nome, descrição); a ordem é a das linhas exportadas.
+REGISTRO_INDICADORES = [
+    ('razao_dependencia_total', "(0-14 + 65 ou mais) / 15-64 x 100"),
+    ('razao_dependencia_jovens', "0-14 / 15-64 x 100"),
+    ('razao_dependencia_idosos', "65 ou mais / 15-64 x 100"),
+    ('indice_envelhecimento', "65 ou mais / 0-14 x 100"),
+    ('razao_sexo', "Homens / Mulheres x 100"),
+    ('proporcao_65_mais', "65 ou mais / total x 100"),
+    ('taxa_crescimento', "Crescimento anual da população total (%)"),
+]
+
+
+def _razao(numerador, denominador):
+    """numerador / denominador x 100, com NaN onde o denominador é zero."""
+    numerador = np.asarray(numerador, dtype=np.float64)
+    denominador = np.asarray(denominador, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(denominador != 0, 100 * numerador / denominador, np.nan)
+
+
+def taxa_crescimento(populacao, anos):
+    """Taxa geométrica anual (%) entre anos consecutivos da lista; o primeiro ano é NaN.
+
+    `populacao` é (..., ano). Com anos não consecutivos, a taxa é anualizada.
+    """
+    populacao = np.asarray(populacao, dtype=np.float64)
+    intervalos = np.diff(np.asarray(anos, dtype=np.float64))
+    taxa = np.full(populacao.shape, np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        razao = populacao[..., 1:] / populacao[..., :-1]
+        taxa[..., 1:] = np.where(populacao[..., :-1] > 0, (razao ** (1 / intervalos) - 1) * 100, np.nan)
+    return taxa
+
+
+def calcular_indicadores(cubo):
+    """Todos os indicadores do registro: array (localidade, indicador, ano)."""
+    indice = indice_do_cubo(cubo)
+    jovens, adultos, idosos, total = consultar_faixas(indice, ['0-14', '15-64', '65+', '0+'], sexo='Ambos')
+    homens = consultar_faixas(indice, ['0+'], sexo='Homens')[0]
+    mulheres = consultar_faixas(indice, ['0+'], sexo='Mulheres')[0]
+
+    valores = {
+        'razao_dependencia_total': _razao(jovens + idosos, adultos),
+        'razao_dependencia_jovens': _razao(jovens, adultos),
+        'razao_dependencia_idosos': _razao(idosos, adultos),
+        'indice_envelhecimento': _razao(idosos, jovens),
+        'razao_sexo': _razao(homens, mulheres),
+        'proporcao_65_mais': _razao(idosos, total),
+        'taxa_crescimento': taxa_crescimento(total, [int(ano) for ano in indice['anos']]),
+    }
+    return np.stack([valores[nome] for nome, _ in REGISTRO_INDICADORES], axis=1)
+
+
+def linhas_indicadores(cubo, codigos):
+    """Linhas VAR_COD + anos dos indicadores de cada localidade do cubo: {localidade: DataFrame}.
+
+    Os indicadores são calculados uma vez para todas as localidades e depois separados.
+    `codigos` é {nome do indicador: VAR_COD}; indicadores sem código ficam de fora.
+    """
+    matriz = calcular_indicadores(cubo)
+    presentes = [i for i, (nome, _) in enumerate(REGISTRO_INDICADORES) if codigos.get(nome) is not None]
+    var_cods = [int(codigos[REGISTRO_INDICADORES[i][0]]) for i in presentes]
+    matriz = matriz[:, presentes]
+    tabelas = {}
+    for posicao, localidade in enumerate(cubo['siglas']):
+        df_indicadores = pd.DataFrame(matriz[posicao], columns=cubo['anos'])
+        df_indicadores.insert(0, 'VAR_COD', var_cods)
+        tabelas[localidade] = df_indicadores
+    return tabelas
@@ -0,0 +1,163 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+from cubo_populacao import FAIXAS_QUINQUENAIS, construir_cubo
+from esquema import tipo_inteiro
+
+# =============================================================================
+# ÍNDICE DE SOMAS ACUMULADAS POR FAIXA ETÁRIA
+# =============================================================================
+# As projeções são somadas uma única vez em um cubo (localidade, sexo, faixa, ano)
+# acumulado ao longo das faixas quinquenais ordenadas. A população de qualquer
+# faixa alinhada às quinquenais (60+, 15-64, 0-4...) sai então da diferença de
+# duas posições do cubo, sem nova passada sobre as linhas:
+#
+#   indice = construir_indice_etario(df_projecoes, ANOS)
+#   consultar_faixa(indice, 60, None)                 # 60 ou mais, Ambos
+#   consultar_faixas(indice, ['0-14', '15-64', '65+'], sexo='Mulheres', anos=['2030'])
+#
+# O índice é um dicionário de arrays (pode ser enviado aos processos ou salvo
+# com np.savez). indice_do_cubo monta o mesmo índice a partir de um cubo já
+# construído ou aberto do disco (cubo_populacao.py).
+
+
+def idade_inicial(faixa):
+    """Idade em que a faixa quinquenal começa ('5-9' -> 5, '90 ou mais' -> 90)."""
+    return int(re.match(r'\d+', faixa).group())
+
+
+def faixa_idades(texto):
+    """Converte '15-64', '60+', '65 ou mais' ou '90' em (idade inicial, idade final ou None)."""
+    texto = str(texto).strip().lower()
+    aberta = re.fullmatch(r'(\d+)\s*(\+|ou mais)', texto)
+    if aberta:
+        return int(aberta.group(1)), None
+    fechada = re.fullmatch(r'(\d+)(?:\s*-\s*(\d+))?', texto)
+    if not fechada:
+        raise ValueError(f"Erro: Faixa etária '{texto}' inválida (use ex.: '15-64', '60+').")
+    inicio = int(fechada.group(1))
+    return inicio, int(fechada.group(2)) if fechada.group(2) else inicio
+
+
+def construir_indice_etario(df, anos):
+    """Índice das linhas de projeção (SIGLA, SEXO, GRUPO_ETARIO e os anos).
+
+    As linhas podem ser de uma ou de várias localidades; grupos fora das faixas
+    quinquenais (ex.: 'Total') ficam fora do índice.
+    """
+    return indice_do_cubo(construir_cubo(df, anos))
+
+
+def indice_do_cubo(cubo, faixas=FAIXAS_QUINQUENAIS):
+    """Acumula o cubo ao longo das faixas quinquenais.
+
+    `acumulado[l, s, i, a]` é a soma das faixas anteriores à i-ésima; `presentes`
+    acumula da mesma forma quantas faixas tinham linhas na planilha.
+    """
+    posicoes = [cubo['faixas'].index(faixa) for faixa in faixas if faixa in cubo['faixas']]
+    faixas = [cubo['faixas'][f] for f in posicoes]
+    valores = np.asarray(cubo['valores'])[:, :, posicoes]
+    n_siglas, n_sexos, _, n_anos = valores.shape
+
+    tipo = np.int64 if np.issubdtype(valores.dtype, np.integer) else np.float64
+    acumulado = np.zeros((n_siglas, n_sexos, len(faixas) + 1, n_anos), dtype=tipo)
+    np.cumsum(valores, axis=2, dtype=tipo, out=acumulado[:, :, 1:])
+    presentes = np.zeros((n_siglas, n_sexos, len(faixas) + 1), dtype=np.int32)
+    np.cumsum(np.asarray(cubo['presentes'])[:, :, posicoes], axis=2, out=presentes[:, :, 1:])
+    tipo = tipo_inteiro(acumulado[:, :, -1]) if tipo is np.int64 else None
+    return {
+        'siglas': np.asarray(cubo['siglas'], dtype=object),
+        'sexos': list(cubo['sexos']),
+        'faixas': faixas,
+        'idades': np.array([idade_inicial(faixa) for faixa in faixas]),
+        'anos': list(cubo['anos']),
+        'acumulado': acumulado if tipo is None else acumulado.astype(tipo),
+        'presentes': presentes,
+    }
+
+
+def posicoes_faixa(indice, inicio, fim=None):
+    """Posições (i, j) no eixo acumulado para as idades inicio..fim (fim None = em diante).
+
+    A faixa precisa começar e terminar nos limites das faixas quinquenais.
+    """
+    idades = indice['idades']
+    inicios = np.flatnonzero(idades == inicio)
+    if fim is None:
+        finais = [len(idades)]
+    else:
+        finais = np.flatnonzero(idades == fim + 1) if fim + 1 <= idades[-1] else []
+    if not len(inicios) or not len(finais) or finais[0] <= inicios[0]:
+        descricao = f"{inicio}+" if fim is None else f"{inicio}-{fim}"
+        raise ValueError(
+            f"Erro: Faixa {descricao} não está alinhada às faixas quinquenais "
+            f"({', '.join(indice['faixas'])})."
+        )
+    return int(inicios[0]), int(finais[0])
+
+
+def _selecao(indice, sexo, siglas, anos):
+    """Índices de sexo, localidades e anos pedidos (None = todas/todos)."""
+    if sexo not in indice['sexos']:
+        raise ValueError(f"Erro: SEXO '{sexo}' inválido (use {', '.join(indice['sexos'])}).")
+    linhas = slice(None)
+    if siglas is not None:
+        posicao = {sigla: i for i, sigla in enumerate(indice['siglas'])}
+        faltantes = [sigla for sigla in siglas if sigla not in posicao]
+        if faltantes:
+            raise ValueError(f"Erro: SIGLA(s) fora do índice: {', '.join(faltantes)}.")
+        linhas = [posicao[sigla] for sigla in siglas]
+    colunas = slice(None)
+    if anos is not None:
+        posicao = {ano: i for i, ano in enumerate(indice['anos'])}
+        faltantes = [str(ano) for ano in anos if str(ano) not in posicao]
+        if faltantes:
+            raise ValueError(f"Erro: Ano(s) fora do índice: {', '.join(faltantes)}.")
+        colunas = [posicao[str(ano)] for ano in anos]
+    return indice['sexos'].index(sexo), linhas, colunas
+
+
+def consultar_faixas(indice, faixas, sexo='Ambos', siglas=None, anos=None, completas=False):
+    """População de várias faixas etárias de uma vez: array (faixa, localidade, ano).
+
+    `faixas` aceita textos ('60+', '15-64') ou tuplas (inicio, fim) alinhadas às
+    faixas quinquenais. Cada faixa custa duas leituras do acumulado, qualquer que
+    seja a sua largura. Com `completas=True` devolve também a máscara (faixa, localidade)
+    que indica se todas as faixas quinquenais somadas existiam na planilha.
+    """
+    limites = [faixa if isinstance(faixa, tuple) else faixa_idades(faixa) for faixa in faixas]
+    posicoes = np.array([posicoes_faixa(indice, inicio, fim) for inicio, fim in limites], dtype=np.intp)
+    posicoes = posicoes.reshape(-1, 2)
+    s, linhas, colunas = _selecao(indice, sexo, siglas, anos)
+
+    acumulado = indice['acumulado'][linhas, s][:, :, colunas]  # (localidade, faixa + 1, ano)
+    valores = acumulado[:, posicoes[:, 1]] - acumulado[:, posicoes[:, 0]]
+    valores = valores.transpose(1, 0, 2)
+    if not completas:
+        return valores
+    presentes = indice['presentes'][linhas, s]
+    contagem = presentes[:, posicoes[:, 1]] - presentes[:, posicoes[:, 0]]
+    return valores, (contagem == (posicoes[:, 1] - posicoes[:, 0])).T
+
+
+def consultar_faixa(indice, inicio, fim=None, sexo='Ambos', siglas=None, anos=None):
+    """População das idades inicio..fim (fim None = em diante): array (localidade, ano)."""
+    return consultar_faixas(indice, [(inicio, fim)], sexo=sexo, siglas=siglas, anos=anos)[0]
+
+
+def tabela_faixas(indice, faixas, sexos=('Ambos',), siglas=None, anos=None):
+    """As faixas pedidas no layout das projeções: SIGLA, SEXO, GRUPO_ETARIO e os anos."""
+    anos = indice['anos'] if anos is None else [str(ano) for ano in anos]
+    siglas_tabela = indice['siglas'] if siglas is None else np.asarray(siglas, dtype=object)
+    partes = []
+    for sexo in sexos:
+        valores = consultar_faixas(indice, faixas, sexo=sexo, siglas=siglas, anos=anos)
+        n_faixas, n_siglas, _ = valores.shape
+        parte = pd.DataFrame(valores.reshape(n_faixas * n_siglas, len(anos)), columns=anos)
+        parte.insert(0, 'GRUPO_ETARIO', np.repeat([str(faixa) for faixa in faixas], n_siglas))
+        parte.insert(1, 'SEXO', sexo)
+        parte.insert(2, 'SIGLA', np.tile(siglas_tabela, n_faixas))
+        partes.append(parte)
+    return pd.concat(partes, ignore_index=True)
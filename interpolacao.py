@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+
+# =============================================================================
+# INTERPOLAÇÃO INFRA-ANUAL (TRIMESTRAL OU MENSAL)
+# =============================================================================
+# Cada valor anual das projeções é tratado como a população do meio do ano
+# (1º de julho); os valores de cada trimestre ou mês são estimados no ponto
+# médio do período, entre os dois anos vizinhos. Antes do meio do primeiro ano e
+# depois do meio do último, a tendência do segmento mais próximo é estendida.
+# Todas as linhas da tabela são interpoladas de uma vez: um único índice dos anos
+# vizinhos e um vetor de pesos por período.
+#
+#   "linear":     v = v0 + p * (v1 - v0)
+#   "geometrico": v = v0 * (v1 / v0) ** p   (crescimento a taxa constante; cai no
+#                 linear onde algum dos dois valores não é positivo)
+
+PERIODICIDADES = {'trimestral': 4, 'mensal': 12}
+METODOS = ('linear', 'geometrico')
+
+
+def periodos_por_ano(periodicidade):
+    """Número de períodos por ano da periodicidade (4 ou 12)."""
+    if periodicidade not in PERIODICIDADES:
+        raise ValueError(f"Erro: Periodicidade '{periodicidade}' inválida "
+                         f"(use {', '.join(PERIODICIDADES)}).")
+    return PERIODICIDADES[periodicidade]
+
+
+def rotulos_periodos(anos, periodicidade):
+    """Rótulos dos períodos: '2000T1'...'2000T4' ou '2000M01'...'2000M12'."""
+    n = periodos_por_ano(periodicidade)
+    formato = (lambda ano, k: f"{ano}T{k}") if n == 4 else (lambda ano, k: f"{ano}M{k:02d}")
+    return [formato(ano, k) for ano in anos for k in range(1, n + 1)]
+
+
+def pesos_interpolacao(anos, periodicidade):
+    """Para cada período: índice do ano anterior e peso p do ano seguinte (p fora de [0, 1] nas pontas)."""
+    n = periodos_por_ano(periodicidade)
+    meios = np.asarray([int(ano) for ano in anos], dtype=np.float64) + 0.5
+    if len(meios) < 2:
+        raise ValueError("Erro: A interpolação precisa de pelo menos dois anos.")
+    pontos = np.repeat(meios - 0.5, n) + np.tile((np.arange(n) + 0.5) / n, len(meios))
+    anterior = np.clip(np.searchsorted(meios, pontos, side='right') - 1, 0, len(meios) - 2)
+    peso = (pontos - meios[anterior]) / (meios[anterior + 1] - meios[anterior])
+    return anterior, peso
+
+
+def interpolar(matriz, anos, periodicidade='trimestral', metodo='linear'):
+    """Interpola a matriz (linha, ano) para (linha, período) em uma única operação."""
+    if metodo not in METODOS:
+        raise ValueError(f"Erro: Método de interpolação '{metodo}' inválido (use {', '.join(METODOS)}).")
+    anterior, peso = pesos_interpolacao(anos, periodicidade)
+    matriz = np.asarray(matriz, dtype=np.float64)
+    v0, v1 = matriz[:, anterior], matriz[:, anterior + 1]
+    lineares = v0 + peso * (v1 - v0)
+    # Nas pontas, a extensão da tendência não deixa contagens positivas ficarem negativas.
+    lineares = np.where((v0 >= 0) & (v1 >= 0), np.maximum(lineares, 0), lineares)
+    if metodo == 'linear':
+        return lineares
+    positivos = (v0 > 0) & (v1 > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        geometricos = v0 * (v1 / v0) ** peso
+    return np.where(positivos, geometricos, lineares)
+
+
+def interpolar_tabela(df, anos, periodicidade='trimestral', metodo='linear', colunas=('VAR_COD',)):
+    """DataFrame com `colunas` e uma coluna por período no lugar dos anos."""
+    rotulos = rotulos_periodos(anos, periodicidade)
+    valores = interpolar(df[anos].to_numpy(dtype=np.float64), anos, periodicidade, metodo)
+    df_periodos = pd.DataFrame(valores, columns=rotulos, index=df.index)
+    return pd.concat([df[list(colunas)], df_periodos], axis=1)
@@ -0,0 +1,277 @@
+import os
+import posixpath
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+import pandas as pd
+
+# =============================================================================
+# LEITOR XLSX EM STREAMING (SOMENTE BIBLIOTECA PADRÃO + PANDAS NO FINAL)
+# =============================================================================
+# Lê o XML da aba diretamente do arquivo .xlsx (que é um zip), linha a linha.
+# Filtros de linha (ex.: SIGLA/SEXO) e a seleção de colunas são aplicados durante
+# a leitura: células de linhas descartadas nunca são convertidas em valores.
+
+NS_MAIN = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+NS_REL = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+NS_PKG_REL = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+_TAG_ROW = NS_MAIN + 'row'
+_TAG_C = NS_MAIN + 'c'
+_TAG_V = NS_MAIN + 'v'
+_TAG_T = NS_MAIN + 't'
+_TAG_IS = NS_MAIN + 'is'
+_TAG_SI = NS_MAIN + 'si'
+_TAG_R = NS_MAIN + 'r'
+_TAG_SHEET_DATA = NS_MAIN + 'sheetData'
+
+_RE_COLUNA = re.compile(r'[A-Z]+')
+_INDICES_COLUNA = {}
+
+
+def limpar_nome_coluna(nome):
+    """Aplica ao cabeçalho a mesma limpeza de load_excel/load_projecoes."""
+    nome = str(nome).strip().replace('.', '').replace('CÓD', 'COD')
+    return nome.replace('GRUPO ETÁRIO', 'GRUPO_ETARIO').replace('GRUPO ETARIO', 'GRUPO_ETARIO')
+
+
+def _indice_coluna(ref):
+    """Converte a referência da célula ('AB12') no índice da coluna (0 = 'A')."""
+    letras = _RE_COLUNA.match(ref).group()
+    indice = _INDICES_COLUNA.get(letras)
+    if indice is None:
+        indice = 0
+        for letra in letras:
+            indice = indice * 26 + (ord(letra) - 64)
+        indice -= 1
+        _INDICES_COLUNA[letras] = indice
+    return indice
+
+
+def _caminho_aba(zf, sheet_name):
+    """Localiza dentro do zip o XML correspondente à aba pelo nome."""
+    workbook = ET.fromstring(zf.read('xl/workbook.xml'))
+    rel_id = None
+    for sheet in workbook.iter(NS_MAIN + 'sheet'):
+        if sheet.get('name') == sheet_name:
+            rel_id = sheet.get(NS_REL + 'id')
+            break
+    if rel_id is None:
+        raise ValueError(f"Erro: Planilha '{sheet_name}' não encontrada.")
+
+    rels = ET.fromstring(zf.read('xl/_rels/workbook.xml.rels'))
+    for rel in rels.iter(NS_PKG_REL + 'Relationship'):
+        if rel.get('Id') == rel_id:
+            target = rel.get('Target')
+            if target.startswith('/'):
+                return target.lstrip('/')
+            return posixpath.normpath(posixpath.join('xl', target))
+    raise ValueError(f"Erro: Planilha '{sheet_name}' sem relacionamento no arquivo.")
+
+
+def _ler_shared_strings(zf):
+    """Lê a tabela de strings compartilhadas em streaming."""
+    if 'xl/sharedStrings.xml' not in zf.namelist():
+        return []
+
+    strings = []
+    with zf.open('xl/sharedStrings.xml') as f:
+        for _, elem in ET.iterparse(f, events=('end',)):
+            if elem.tag == _TAG_SI:
+                # Concatena os trechos de texto rico, ignorando a grafia fonética (rPh).
+                partes = []
+                for filho in elem:
+                    if filho.tag == _TAG_T:
+                        partes.append(filho.text or '')
+                    elif filho.tag == _TAG_R:
+                        partes.extend(t.text or '' for t in filho.iter(_TAG_T))
+                strings.append(''.join(partes))
+                elem.clear()
+    return strings
+
+
+def _texto_celula(c, shared_strings):
+    """Devolve o valor de uma célula já convertido (str, int, float, bool ou None)."""
+    tipo = c.get('t')
+    if tipo == 'inlineStr':
+        inline = c.find(_TAG_IS)
+        return ''.join(t.text or '' for t in inline.iter(_TAG_T)) if inline is not None else None
+
+    v = c.find(_TAG_V)
+    if v is None or v.text is None:
+        return None
+    if tipo == 's':
+        return shared_strings[int(v.text)]
+    if tipo in ('str', 'e'):
+        return v.text
+    if tipo == 'b':
+        return v.text == '1'
+
+    # Numérico: inteiros viram int, como faz o pandas com o openpyxl.
+    numero = float(v.text)
+    return int(numero) if numero.is_integer() else numero
+
+
+def _valor_bruto_filtro(c):
+    """Valor da célula sem conversão, usado para testar filtros (índice da shared string ou texto)."""
+    tipo = c.get('t')
+    if tipo == 'inlineStr':
+        inline = c.find(_TAG_IS)
+        return ('t', ''.join(t.text or '' for t in inline.iter(_TAG_T)) if inline is not None else '')
+    v = c.find(_TAG_V)
+    texto = v.text if v is not None else None
+    return ('s', texto) if tipo == 's' else ('t', texto)
+
+
+def ler_aba_xlsx(file_path, sheet_name, colunas=None, filtros=None,
+                 colunas_cabecalho=('SIGLA', 'SEXO')):
+    """Lê uma aba de um .xlsx em streaming, aplicando filtros de linha e seleção de colunas.
+
+    A linha de cabeçalho é a primeira que contém todas as `colunas_cabecalho` (após a
+    limpeza de nomes). `filtros` mapeia coluna -> valores aceitos (comparação exata);
+    `colunas` restringe e ordena as colunas devolvidas.
+    """
+    linhas = _iterar_linhas(file_path, sheet_name, colunas, filtros, colunas_cabecalho)
+    nomes_saida = next(linhas)
+    return pd.DataFrame(list(linhas), columns=nomes_saida)
+
+
+def iterar_lotes_xlsx(file_path, sheet_name, coluna_lote, linhas_por_lote, colunas=None, filtros=None,
+                      colunas_cabecalho=('SIGLA', 'SEXO')):
+    """Lê a aba em lotes de até `linhas_por_lote` linhas, sem separar um mesmo valor de `coluna_lote`.
+
+    Cada lote é um DataFrame com as linhas completas de um ou mais valores de
+    `coluna_lote` (ex.: SIGLA); um valor com mais linhas que o limite sai sozinho.
+    As linhas de cada valor precisam estar contíguas na planilha (ValueError caso
+    contrário). Os demais parâmetros são os de ler_aba_xlsx.
+    """
+    linhas = _iterar_linhas(file_path, sheet_name, colunas, filtros, colunas_cabecalho)
+    nomes_saida = next(linhas)
+    if coluna_lote not in nomes_saida:
+        raise ValueError(f"Erro: Coluna de lote '{coluna_lote}' não está entre as colunas lidas.")
+    pos_lote = nomes_saida.index(coluna_lote)
+
+    lote, grupo, atual, encerrados = [], [], None, set()
+    for linha in linhas:
+        valor = linha[pos_lote]
+        if valor != atual:
+            if valor in encerrados:
+                raise ValueError(
+                    f"Erro: As linhas de {coluna_lote} = '{valor}' não estão contíguas na planilha "
+                    f"'{sheet_name}'; use o processamento em memória."
+                )
+            if lote and len(lote) + len(grupo) > linhas_por_lote:
+                yield pd.DataFrame(lote, columns=nomes_saida)
+                lote = []
+            lote.extend(grupo)
+            if atual is not None:
+                encerrados.add(atual)
+            grupo, atual = [], valor
+        grupo.append(linha)
+
+    if lote and len(lote) + len(grupo) > linhas_por_lote:
+        yield pd.DataFrame(lote, columns=nomes_saida)
+        lote = []
+    lote.extend(grupo)
+    if lote:
+        yield pd.DataFrame(lote, columns=nomes_saida)
+
+
+def _iterar_linhas(file_path, sheet_name, colunas, filtros, colunas_cabecalho):
+    """Gera primeiro a lista de nomes das colunas devolvidas e depois cada linha aceita."""
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"Erro: Arquivo '{file_path}' não encontrado.")
+
+    filtros = {col: set(valores) for col, valores in (filtros or {}).items()}
+
+    with zipfile.ZipFile(file_path) as zf:
+        caminho = _caminho_aba(zf, sheet_name)
+        shared_strings = _ler_shared_strings(zf)
+
+        # Para cada valor aceito em um filtro, o índice correspondente na tabela de
+        # strings compartilhadas: o teste da linha compara só o texto bruto de <v>.
+        aceitos_shared = {col: set() for col in filtros}
+        for i, texto in enumerate(shared_strings):
+            for col, valores in filtros.items():
+                if texto in valores:
+                    aceitos_shared[col].add(str(i))
+
+        cabecalho = None
+        idx_filtros = {}
+        idx_saida = {}
+
+        with zf.open(caminho) as f:
+            sheet_data = None
+            for evento, elem in ET.iterparse(f, events=('start', 'end')):
+                if evento == 'start':
+                    if elem.tag == _TAG_SHEET_DATA:
+                        sheet_data = elem
+                    continue
+                if elem.tag != _TAG_ROW:
+                    continue
+
+                if cabecalho is None:
+                    valores = {}
+                    for pos, c in enumerate(elem.iter(_TAG_C)):
+                        ref = c.get('r')
+                        valor = _texto_celula(c, shared_strings)
+                        if valor is not None:
+                            valores[_indice_coluna(ref) if ref else pos] = limpar_nome_coluna(valor)
+                    if all(nome in valores.values() for nome in colunas_cabecalho):
+                        cabecalho = valores
+                        por_nome = {}
+                        for idx, nome in sorted(cabecalho.items()):
+                            por_nome.setdefault(nome, idx)
+                        faltando = [c for c in list(filtros) + list(colunas or []) if c not in por_nome]
+                        if faltando:
+                            raise ValueError(f"Erro: Colunas {faltando} não encontradas na planilha '{sheet_name}'.")
+                        idx_filtros = {por_nome[col]: col for col in filtros}
+                        nomes_saida = colunas if colunas is not None else list(por_nome)
+                        idx_saida = {por_nome[nome]: pos for pos, nome in enumerate(nomes_saida)}
+                        yield nomes_saida
+                else:
+                    linha = _ler_linha(elem, idx_filtros, idx_saida, filtros, aceitos_shared, shared_strings)
+                    if linha is not None:
+                        yield linha
+
+                # Libera a memória da linha já processada.
+                elem.clear()
+                if sheet_data is not None:
+                    sheet_data.clear()
+
+    if cabecalho is None:
+        raise ValueError(
+            f"Erro: Cabeçalho com as colunas {list(colunas_cabecalho)} não encontrado na planilha '{sheet_name}'."
+        )
+
+
+def _ler_linha(row, idx_filtros, idx_saida, filtros, aceitos_shared, shared_strings):
+    """Converte uma linha de dados, ou devolve None se ela não passar nos filtros."""
+    valores = [None] * len(idx_saida)
+    pendentes = len(idx_filtros)
+    tem_valor = False
+
+    for pos, c in enumerate(row.iter(_TAG_C)):
+        ref = c.get('r')
+        idx = _indice_coluna(ref) if ref else pos
+
+        col_filtro = idx_filtros.get(idx)
+        if col_filtro is not None:
+            tipo, bruto = _valor_bruto_filtro(c)
+            aceitos = aceitos_shared[col_filtro] if tipo == 's' else filtros[col_filtro]
+            if bruto not in aceitos:
+                return None
+            pendentes -= 1
+
+        destino = idx_saida.get(idx)
+        if destino is not None:
+            valor = _texto_celula(c, shared_strings)
+            if valor is not None:
+                valores[destino] = valor
+                tem_valor = True
+
+    # Linha sem alguma célula de filtro (vazia) não atende ao filtro.
+    if pendentes or not tem_valor:
+        return None
+    return valores
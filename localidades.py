@@ -0,0 +1,81 @@
+# =============================================================================
+# TABELA DE LOCALIDADES (SIGLA -> LOC_NOME / LOC_COD do BDE)
+# =============================================================================
+# LOC_COD é o código da localidade na tabela tb_dados do BDE. Siglas com
+# LOC_COD = None ainda não têm código cadastrado e são ignoradas no modo lote;
+# preencha o código correspondente no BDE antes de processá-las.
+#
+# Nas projeções municipais, todos os municípios de uma UF têm a mesma SIGLA e se
+# distinguem pela coluna CÓD. (código IBGE de 7 dígitos, ou 6 sem o dígito
+# verificador; UFs têm 2). Cada município é uma localidade própria, identificada
+# por "{SIGLA}_{CÓD}" (ex.: GO_5208707), com LOC_NOME e LOC_COD tirados da própria
+# planilha (colunas LOCAL e CÓD.).
+
+LOCALIDADES = {
+    'RO': ('Estado de Rondônia', None),
+    'AC': ('Estado do Acre', None),
+    'AM': ('Estado do Amazonas', None),
+    'RR': ('Estado de Roraima', None),
+    'PA': ('Estado do Pará', None),
+    'AP': ('Estado do Amapá', None),
+    'TO': ('Estado do Tocantins', None),
+    'MA': ('Estado do Maranhão', None),
+    'PI': ('Estado do Piauí', None),
+    'CE': ('Estado do Ceará', None),
+    'RN': ('Estado do Rio Grande do Norte', None),
+    'PB': ('Estado da Paraíba', None),
+    'PE': ('Estado de Pernambuco', None),
+    'AL': ('Estado de Alagoas', None),
+    'SE': ('Estado de Sergipe', None),
+    'BA': ('Estado da Bahia', None),
+    'MG': ('Estado de Minas Gerais', None),
+    'ES': ('Estado do Espírito Santo', None),
+    'RJ': ('Estado do Rio de Janeiro', None),
+    'SP': ('Estado de São Paulo', None),
+    'PR': ('Estado do Paraná', None),
+    'SC': ('Estado de Santa Catarina', None),
+    'RS': ('Estado do Rio Grande do Sul', None),
+    'MS': ('Estado de Mato Grosso do Sul', None),
+    'MT': ('Estado de Mato Grosso', None),
+    'GO': ('Estado de Goiás', 1000),
+    'DF': ('Distrito Federal', None),
+}
+
+
+def buscar_localidade(sigla):
+    """Devolve (LOC_NOME, LOC_COD) da sigla, ou None se ela não tiver LOC_COD cadastrado."""
+    loc_nome, loc_cod = LOCALIDADES.get(sigla, (None, None))
+    if loc_cod is None:
+        return None
+    return loc_nome, loc_cod
+
+
+MENOR_CODIGO_MUNICIPIO = 100000
+
+
+def eh_municipio(cod):
+    """Se o CÓD. da planilha é um código IBGE de município (6 ou 7 dígitos)."""
+    try:
+        return int(float(cod)) >= MENOR_CODIGO_MUNICIPIO
+    except (TypeError, ValueError):
+        return False
+
+
+def chave_localidade(sigla, cod):
+    """Identificador da localidade: a SIGLA para UFs, "{SIGLA}_{CÓD}" para municípios."""
+    return f"{sigla}_{int(float(cod))}" if eh_municipio(cod) else sigla
+
+
+def sigla_da_chave(chave):
+    """SIGLA da UF de uma chave de localidade ("GO_5208707" -> "GO")."""
+    return chave.split('_', 1)[0]
+
+
+def resolver_localidade(sigla, cod=None, local=None):
+    """(LOC_NOME, LOC_COD) da localidade, ou None se ela não tiver LOC_COD.
+
+    Municípios usam o nome e o código da planilha; UFs, a tabela LOCALIDADES.
+    """
+    if eh_municipio(cod):
+        return (local if local is not None else chave_localidade(sigla, cod)), int(float(cod))
+    return buscar_localidade(sigla)
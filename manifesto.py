@@ -0,0 +1,65 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# =============================================================================
+# MANIFESTO DE EXPORTAÇÃO (HASH DO CONTEÚDO DE CADA ANO)
+# =============================================================================
+# Para cada UF e modo de exportação, guarda no diretório de saída o hash dos
+# vetores VAR_COD/valor de cada ano. Na execução seguinte só os anos cujo hash
+# mudou (ou cujo arquivo sumiu) são regravados.
+
+
+def caminho_manifesto(output_dir, sigla, modo):
+    """Arquivo de manifesto da UF/modo dentro do diretório de saída."""
+    return os.path.join(output_dir, f".manifesto_{sigla}_{modo}.json")
+
+
+def hashes_por_ano(df_final, anos, contexto=()):
+    """SHA-256 de (contexto, VAR_COD, valores) para cada ano de df_final.
+
+    `contexto` (ex.: LOC_NOME, LOC_COD) entra no hash para que mudanças nele também
+    regravem os arquivos.
+    """
+    base = hashlib.sha256(json.dumps(list(contexto), ensure_ascii=False, default=str).encode('utf-8'))
+    base.update(np.ascontiguousarray(df_final['VAR_COD'].to_numpy(dtype=np.int64)).tobytes())
+
+    matriz = np.ascontiguousarray(df_final[anos].to_numpy(dtype=np.float64).T)
+    hashes = {}
+    for ano, valores in zip(anos, matriz):
+        h = base.copy()
+        h.update(valores.tobytes())
+        hashes[ano] = h.hexdigest()
+    return hashes
+
+
+def ler_manifesto(caminho):
+    """Hashes gravados na execução anterior ({} se não houver manifesto válido)."""
+    try:
+        with open(caminho, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def gravar_manifesto(caminho, hashes):
+    """Grava o manifesto de forma atômica."""
+    tmp_path = caminho + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(hashes, f, indent=0, sort_keys=True)
+    os.replace(tmp_path, caminho)
+
+
+def atualizar_manifesto(caminho, hashes):
+    """Acrescenta os hashes ao manifesto existente, mantendo os dos anos fora desta execução.
+
+    Uma execução parcial (ex.: --anos 2030-2031) não apaga os hashes dos demais anos.
+    """
+    gravar_manifesto(caminho, {**ler_manifesto(caminho), **hashes})
+
+
+def anos_alterados(hashes, anteriores, arquivo_existe=lambda ano: True):
+    """Anos cujo hash difere do manifesto anterior ou cujo arquivo não existe mais."""
+    return [ano for ano, h in hashes.items() if anteriores.get(ano) != h or not arquivo_existe(ano)]
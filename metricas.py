@@ -0,0 +1,102 @@
+import json
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# =============================================================================
+# MÉTRICAS POR ETAPA (TEMPO, CPU, LINHAS E MEMÓRIA)
+# =============================================================================
+# Cada etapa do pipeline é medida com `medir`, que acrescenta um registro (dict)
+# à lista de métricas da execução. As listas são simples, por isso voltam dos
+# processos do modo lote junto com o resultado de cada UF. No fim, um único
+# registro JSON por execução é acrescentado ao arquivo de métricas (JSON lines).
+
+
+def iniciar_memoria():
+    """Liga o tracemalloc para medir o pico de memória de cada etapa.
+
+    O tracemalloc deixa o processamento bem mais lento; use só ao investigar memória.
+    """
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def pico_rss_bytes():
+    """Pico de memória residente do processo (None onde `resource` não existe)."""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss vem em KiB no Linux e em bytes no macOS.
+    return pico if sys.platform == 'darwin' else pico * 1024
+
+
+@contextmanager
+def medir(metricas, etapa, linhas_entrada=None, **contexto):
+    """Mede a etapa e acrescenta o registro em `metricas`.
+
+    O registro é devolvido no `with` para que a etapa informe `linhas_saida`.
+    `pico_rss_bytes` é o pico do processo até o fim da etapa (custo zero); o pico
+    alocado na própria etapa só é medido com o tracemalloc ligado (iniciar_memoria),
+    e nesse caso não deve haver etapas aninhadas.
+    """
+    registro = {'etapa': etapa, **contexto, 'linhas_entrada': linhas_entrada, 'linhas_saida': None}
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+        memoria_inicial = tracemalloc.get_traced_memory()[0]
+    inicio, inicio_cpu = time.perf_counter(), time.process_time()
+    try:
+        yield registro
+    finally:
+        registro['segundos'] = time.perf_counter() - inicio
+        registro['cpu_segundos'] = time.process_time() - inicio_cpu
+        registro['pico_memoria_bytes'] = (
+            tracemalloc.get_traced_memory()[1] - memoria_inicial if tracemalloc.is_tracing() else None
+        )
+        registro['pico_rss_bytes'] = pico_rss_bytes()
+        metricas.append(registro)
+
+
+def registro_execucao(metricas, segundos, **contexto):
+    """Registro único da execução: data, contexto, totais e a lista de etapas."""
+    return {
+        'inicio': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        **contexto,
+        'segundos': segundos,
+        'pico_rss_bytes': pico_rss_bytes(),
+        'etapas': metricas,
+    }
+
+
+def gravar_metricas(arquivo, registro):
+    """Acrescenta o registro da execução como uma linha JSON no arquivo."""
+    with open(arquivo, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(registro, ensure_ascii=False) + '\n')
+
+
+def tabela_metricas(metricas):
+    """Resumo legível das etapas, uma linha por etapa."""
+    linhas = [f"{'Etapa':<20} {'UF':<4} {'Tempo (s)':>10} {'CPU (s)':>9} "
+              f"{'Entrada':>9} {'Saída':>9} {'Pico (MiB)':>11} {'RSS (MiB)':>10}"]
+    for registro in metricas:
+        linhas.append(
+            f"{registro['etapa']:<20} {registro.get('sigla') or '':<4} {registro['segundos']:>10.3f} "
+            f"{registro['cpu_segundos']:>9.3f} {_inteiro(registro['linhas_entrada']):>9} "
+            f"{_inteiro(registro['linhas_saida']):>9} {_mib(registro['pico_memoria_bytes']):>11} "
+            f"{_mib(registro['pico_rss_bytes']):>10}"
+        )
+    return '\n'.join(linhas)
+
+
+def _inteiro(valor):
+    return '' if valor is None else f"{valor:,}"
+
+
+def _mib(valor):
+    return '' if valor is None else f"{valor / 1024 / 1024:.1f}"
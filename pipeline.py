@@ -0,0 +1,878 @@
+import contextlib
+import importlib
+import os
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from cache_planilhas import carregar_com_cache
+from leitor_xlsx import iterar_lotes_xlsx, ler_aba_xlsx
+from localidades import chave_localidade, resolver_localidade, sigla_da_chave
+from agregados import calcular_agregados_registro
+from cubo_populacao import construir_cubo, fatiar_cubo, gravar_cubo, padronizar_grupo_etario
+from formatacao_br import formatar_inteiros_br, formatar_linhas_br
+from indicadores import linhas_indicadores
+from interpolacao import interpolar_tabela, rotulos_periodos
+from escrita_csv import escrever_arquivos, resumo_escrita
+from catalogo_variaveis import arquivo_resolucoes, construir_indice_chaves, mapear_var_cod, resolver_catalogo
+from manifesto import (anos_alterados, atualizar_manifesto, caminho_manifesto, gravar_manifesto, hashes_por_ano,
+                       ler_manifesto)
+from carga_bd import carregar_tb_dados, ler_tb_dados, linhas_tb_dados, preparar_colunas_anos
+from configuracao import configuracao_padrao
+from esquema import combinar_categorias, compactar_tipos, concatenar_compacto, memoria_bytes, transformar_categorias
+from diagnosticos import diagnostico_ativo, imprimir_codigos_mapeados, imprimir_grupos_etarios, imprimir_merge_keys
+from diferencas import (arredondar_como_exportado, comparar_saidas, ler_numeros_br, ler_publicados_csv,
+                        resumo_diferencas, tabela_valores)
+from validacao import resumo_violacoes, validar_cubo
+from metricas import gravar_metricas, iniciar_memoria, medir, pico_rss_bytes, registro_execucao, tabela_metricas
+
+# =============================================================================
+# PIPELINE DE PROJEÇÕES (API IMPORTÁVEL)
+# =============================================================================
+# Cada etapa recebe o dicionário de configuração (chaves de configuracao.py) em vez
+# de ler constantes globais, para que o processamento possa ser chamado de outros
+# scripts ou notebooks:
+#
+#   from configuracao import configuracao_padrao
+#   from pipeline import run
+#   run(configuracao_padrao(SIGLAS=['GO'], OUTPUT_DIR='saida'))
+#
+# O dicionário é enviado aos processos do modo lote, por isso deve conter apenas
+# valores simples (CONEXAO_BD é uma especificação, não uma conexão aberta).
+
+# =============================================================================
+# 2. CARREGAMENTO DE DADOS
+# =============================================================================
+
+def load_excel(file_path, sheet_name, skiprows=None):
+    """Carrega uma planilha Excel e converte nomes de colunas para string."""
+    try:
+        df = pd.read_excel(
+            file_path,
+            sheet_name=sheet_name,
+            skiprows=skiprows,
+            engine='openpyxl'
+        )
+        df.columns = [str(col).strip().replace('.', '').replace('CÓD', 'COD') for col in df.columns]
+        return df
+    except FileNotFoundError:
+        raise FileNotFoundError(f"Erro: Arquivo '{file_path}' não encontrado.")
+    except ValueError as e:
+        if "Worksheet named" in str(e):
+            raise ValueError(f"Erro: Planilha '{sheet_name}' não encontrada.")
+        raise
+
+def load_projecoes(file_path, sheet_name, skiprows=None):
+    """Carrega a planilha de projeções e padroniza o nome da coluna de grupo etário."""
+    df = load_excel(file_path, sheet_name, skiprows=skiprows)
+    df.columns = [c.replace('GRUPO ETÁRIO', 'GRUPO_ETARIO').replace('GRUPO ETARIO', 'GRUPO_ETARIO') for c in df.columns]
+    return df
+
+# Colunas de identificação lidas da aba de projeções (além dos anos). CÓD. e LOCAL
+# distinguem os municípios de uma mesma SIGLA (ver localidades.py).
+COLUNAS_PROJECOES = ['GRUPO_ETARIO', 'SEXO', 'COD', 'SIGLA', 'LOCAL']
+
+def load_projecoes_stream(file_path, sheet_name, skiprows=None, siglas=('GO',), anos=()):
+    """Lê em streaming só as linhas das siglas pedidas e as colunas usadas no processamento.
+
+    O cabeçalho é localizado automaticamente, por isso `skiprows` é ignorado.
+    Com `siglas=None` todas as linhas são lidas.
+    """
+    return ler_aba_xlsx(
+        file_path, sheet_name,
+        colunas=[*COLUNAS_PROJECOES, *anos],
+        filtros={'SIGLA': list(siglas)} if siglas is not None else None
+    )
+
+def carregar_projecoes(config, siglas=None):
+    """Carrega a aba de projeções (pelo cache) com o motor de leitura configurado."""
+    print(f"Carregando {config['PROJECOES_FILE']}, aba '{config['PROJECOES_SHEET']}' "
+          f"(motor: {config['MOTOR_LEITURA']})...")
+    cache = dict(cache_dir=config['CACHE_DIR'], max_bytes=config['CACHE_MAX_BYTES'], forcar=config['FORCAR_RELEITURA'])
+    if config['MOTOR_LEITURA'] == "stream":
+        return carregar_com_cache(
+            load_projecoes_stream, config['PROJECOES_FILE'], config['PROJECOES_SHEET'], skiprows=None,
+            siglas=list(siglas) if siglas is not None else None, anos=list(config['ANOS']), **cache
+        )
+    return carregar_com_cache(
+        load_projecoes, config['PROJECOES_FILE'], config['PROJECOES_SHEET'], skiprows=5, **cache
+    )
+
+def compactar_projecoes(df_projecoes, config):
+    """Passa as projeções para tipos compactos (categorias e inteiros) e informa a memória."""
+    antes = memoria_bytes(df_projecoes)
+    df_projecoes = compactar_tipos(df_projecoes, config['ANOS'])
+    depois = memoria_bytes(df_projecoes)
+    print(f"  ✓ Tipos compactos: {antes / 1024:,.0f} KiB -> {depois / 1024:,.0f} KiB "
+          f"({depois / max(antes, 1):.0%} do original)")
+    return df_projecoes
+
+def identificar_localidades(df_projecoes):
+    """Acrescenta a coluna categórica LOCALIDADE: a SIGLA nas linhas de UF e
+    "{SIGLA}_{CÓD}" nas de município (calculada só sobre os pares distintos).
+    """
+    if 'COD' not in df_projecoes.columns:
+        df_projecoes['LOCALIDADE'] = df_projecoes['SIGLA']
+        return df_projecoes
+    pares = pd.MultiIndex.from_arrays([df_projecoes['SIGLA'].astype(object), df_projecoes['COD'].astype(object)])
+    distintos = pares.unique()
+    chaves = np.array([None if pd.isna(sigla) else chave_localidade(sigla, cod) for sigla, cod in distintos],
+                      dtype=object)
+    df_projecoes['LOCALIDADE'] = pd.Categorical(chaves[distintos.get_indexer(pares)])
+    return df_projecoes
+
+def validar_projecoes(cubo, config):
+    """Confere a consistência das projeções das SIGLAS; com VALIDACAO = "erro", interrompe.
+
+    Devolve o relatório de violações.
+    """
+    if config['VALIDACAO'] not in ('aviso', 'erro'):
+        raise ValueError(f"Erro: VALIDACAO '{config['VALIDACAO']}' inválida (use aviso, erro ou desligada).")
+    if config['SIGLAS'] is not None:
+        localidades = [chave for chave in cubo['siglas'] if sigla_da_chave(chave) in config['SIGLAS']]
+        cubo = fatiar_cubo(cubo, siglas=localidades)
+    relatorio = validar_cubo(cubo, config['TOLERANCIA_ABSOLUTA'], config['TOLERANCIA_RELATIVA'])
+    print(resumo_violacoes(relatorio))
+    if not relatorio.empty and config['VALIDACAO'] == 'erro':
+        raise ValueError(f"Erro: Projeções inconsistentes ({len(relatorio)} violações); "
+                         f"execução interrompida antes da gravação dos arquivos.")
+    return relatorio
+
+def carregar_variaveis(config):
+    """Carrega a planilha de variáveis (pelo cache) e limpa a coluna VAR."""
+    print(f"Carregando {config['VARIAVEIS_FILE']}, aba '{config['VARIAVEIS_SHEET']}'...")
+    df_variaveis = carregar_com_cache(
+        load_excel, config['VARIAVEIS_FILE'], config['VARIAVEIS_SHEET'], skiprows=None,
+        cache_dir=config['CACHE_DIR'], max_bytes=config['CACHE_MAX_BYTES'], forcar=config['FORCAR_RELEITURA']
+    )
+    df_variaveis['VAR'] = df_variaveis['VAR'].astype(str).str.strip()
+    return df_variaveis
+
+# =============================================================================
+# 3. FILTRO, CÁLCULO E MESCLAGEM
+# =============================================================================
+
+def calcular_agregados(df_go, sigla, anos):
+    """Acrescenta ao DataFrame da UF as linhas agregadas (980-983, 979, 939-944)."""
+    print("Extraindo e calculando grupos etários agregados...")
+
+    # Padronizar grupos etários
+    df_go['GRUPO_ETARIO_PADRAO'] = transformar_categorias(df_go['GRUPO_ETARIO'], padronizar_grupo_etario)
+
+    # =========================================================================
+    # CRIAR AGREGADOS: 980-983, 979, 939-944 (definidos em REGISTRO_AGREGADOS)
+    # =========================================================================
+
+    print("\nCriando agregados...")
+    df_agregados, codigos = calcular_agregados_registro(df_go, anos, sigla)
+    for codigo, (_, grupo, sexo) in zip(codigos, df_agregados[['GRUPO_ETARIO', 'SEXO']].itertuples()):
+        print(f"  ✓ Código {codigo} ({grupo} {sexo}) criado")
+
+    # Concatenar os agregados ao DataFrame principal
+    print(f"\nConcatenando agregados...")
+    print(f"  df_go original: {len(df_go)} linhas")
+
+    df_agregados = df_agregados.reindex(columns=df_go.columns)
+    print(f"  Agregados a adicionar: {len(df_agregados)} linhas")
+
+    df_go = concatenar_compacto(df_go, df_agregados)
+    print(f"  df_go após concatenação: {len(df_go)} linhas")
+
+    # Remover coluna auxiliar de padronização
+    if 'GRUPO_ETARIO_PADRAO' in df_go.columns:
+        df_go = df_go.drop('GRUPO_ETARIO_PADRAO', axis=1)
+
+    return df_go
+
+# =============================================================================
+# C. CRIAÇÃO DAS CHAVES DE MESCLAGEM
+# =============================================================================
+
+def criar_chaves_projecoes(df_go):
+    """Cria a MergeKey (grupo|sexo padronizados) nas linhas de projeção."""
+    # As padronizações são aplicadas só aos valores distintos (colunas categóricas).
+    # 1. Padronização de GRUPO ETÁRIO em df_go
+    df_go['GRUPO_PADRONIZADO'] = transformar_categorias(df_go['GRUPO_ETARIO'], lambda grupos: (
+        grupos.astype(str).str.strip().str.lower()
+        .str.replace(' ', '')
+        .str.replace('00-', '0-', regex=False)
+        .str.replace(r'(\d+)-(\d+)', r'\1-\2', regex=True)
+        .str.replace('90oumais', '90+', regex=False)
+        .str.replace('65oumais', '65+', regex=False)
+    ))
+
+    # 2. Padronização de SEXO em df_go
+    df_go['SEXO_PADRONIZADO'] = transformar_categorias(df_go['SEXO'], lambda sexos: sexos.replace({
+        'Ambos': 'total',
+        'Homens': 'masculina',
+        'Mulheres': 'feminina'
+    }))
+
+    # 3. Criação da MergeKey em df_go
+    df_go['MergeKey'] = combinar_categorias(df_go['GRUPO_PADRONIZADO'], df_go['SEXO_PADRONIZADO'])
+    return df_go
+
+def preparar_variaveis(df_variaveis, config):
+    """Cria GRUPO_VAR, SEXO_VAR e a MergeKey na planilha de variáveis.
+
+    As resoluções ficam salvas ao lado da planilha de variáveis e são reaproveitadas
+    enquanto os textos de VAR não mudarem.
+    """
+    return resolver_catalogo(df_variaveis, arquivo=arquivo_resolucoes(config['VARIAVEIS_FILE']))
+
+# =============================================================================
+# D. MESCLAGEM FINAL
+# =============================================================================
+
+def indexar_variaveis(df_variaveis, config):
+    """Monta o índice MergeKey -> VAR_COD e avisa sobre chaves com mais de um código."""
+    indice, df_duplicadas = construir_indice_chaves(df_variaveis, duplicadas=config['CHAVES_DUPLICADAS'])
+    if not df_duplicadas.empty:
+        print("\n✗ Aviso: MergeKeys com mais de um VAR_COD (mantido o primeiro da planilha):")
+        for key, codigos in df_duplicadas.groupby('MergeKey', sort=True)['VAR_COD']:
+            print(f"  {key:<25} {', '.join(str(int(c)) for c in codigos)}")
+    return indice
+
+def mesclar_variaveis(df_go, indice):
+    """Atribui VAR_COD às linhas da UF pelo índice de MergeKeys e descarta as não mapeadas."""
+    df_final = df_go.copy()
+    df_final['VAR_COD'], sem_correspondencia = mapear_var_cod(df_final['MergeKey'], indice)
+    if sem_correspondencia:
+        exemplos = sorted(map(str, sem_correspondencia))
+        print(f"\n{len(exemplos)} MergeKeys sem VAR_COD na planilha de variáveis "
+              f"(descartadas): {', '.join(exemplos[:10])}{', ...' if len(exemplos) > 10 else ''}")
+
+    # E. LIMPEZA E VERIFICAÇÃO FINAL
+    print("\n" + "="*80)
+    print("--- Resultado do Mapeamento Final ---")
+    print("="*80)
+
+    df_final = df_final.dropna(subset=['VAR_COD'])
+    df_final['VAR_COD'] = df_final['VAR_COD'].astype(int)
+    print(f"\nTotal de linhas Mapeadas: {len(df_final)}")
+
+    imprimir_codigos_mapeados(df_final)
+
+    return df_final
+
+def codigos_indicadores(config):
+    """{indicador: VAR_COD} só dos indicadores com código alocado."""
+    return {nome: int(codigo) for nome, codigo in config['CODIGOS_INDICADORES'].items() if codigo is not None}
+
+def conferir_codigos_indicadores(df_variaveis, config):
+    """Recusa --indicadores sem códigos alocados, com códigos repetidos ou já usados no catálogo."""
+    codigos = codigos_indicadores(config)
+    if not codigos:
+        raise ValueError("Erro: INDICADORES ligado sem nenhum VAR_COD em CODIGOS_INDICADORES "
+                         "(preencha os códigos alocados no BDE em configuracao.py).")
+    repetidos = sorted({codigo for codigo in codigos.values() if list(codigos.values()).count(codigo) > 1})
+    if repetidos:
+        raise ValueError(f"Erro: VAR_COD repetidos em CODIGOS_INDICADORES: {', '.join(map(str, repetidos))}.")
+    no_catalogo = sorted(set(codigos.values()) & set(df_variaveis['VAR_COD'].dropna().astype(int)))
+    if no_catalogo:
+        raise ValueError(f"Erro: VAR_COD de indicadores já usados no catálogo de variáveis: "
+                         f"{', '.join(map(str, no_catalogo))}.")
+
+def calcular_indicadores_cubo(cubo, config, metricas):
+    """Indicadores de todas as localidades do cubo de uma vez: {localidade: DataFrame}."""
+    with medir(metricas, 'indicadores', len(cubo['siglas'])) as etapa:
+        indicadores = linhas_indicadores(cubo, codigos_indicadores(config))
+        etapa['linhas_saida'] = sum(len(df) for df in indicadores.values())
+    return indicadores
+
+def acrescentar_indicadores(df_final, df_indicadores, config):
+    """Acrescenta ao final de df_final as linhas dos indicadores demográficos da UF."""
+    repetidos = sorted(set(df_indicadores['VAR_COD']) & set(df_final['VAR_COD']))
+    if repetidos:
+        raise ValueError(f"Erro: VAR_COD de indicadores já usados pelas projeções: "
+                         f"{', '.join(map(str, repetidos))}.")
+    print(f"  ✓ Indicadores acrescentados: {len(df_indicadores)} "
+          f"(VAR_COD {', '.join(map(str, df_indicadores['VAR_COD']))})")
+    return pd.concat([df_final, df_indicadores], ignore_index=True)
+
+def interpolar_periodos(df_final, config):
+    """Troca as colunas de ano de df_final pelas séries trimestrais/mensais interpoladas.
+
+    Os indicadores (razões e taxas) não são interpolados e ficam de fora.
+    """
+    anos = [ano for ano in config['ANOS'] if ano in df_final.columns]
+    if config['INDICADORES']:
+        indicadores = df_final['VAR_COD'].isin(list(codigos_indicadores(config).values()))
+        if indicadores.any():
+            print(f"  ✗ Aviso: {int(indicadores.sum())} indicadores não são interpolados e ficam fora "
+                  f"da saída {config['PERIODICIDADE']}.")
+            df_final = df_final[~indicadores]
+    df_periodos = interpolar_tabela(df_final, anos, config['PERIODICIDADE'], config['METODO_INTERPOLACAO'])
+    print(f"  ✓ Interpolação {config['PERIODICIDADE']} ({config['METODO_INTERPOLACAO']}): "
+          f"{len(anos)} anos -> {len(df_periodos.columns) - 1} períodos")
+    return df_periodos
+
+def configuracao_exportacao(config):
+    """Configuração usada na exportação: com períodos infra-anuais, ANOS vira a lista de períodos."""
+    if config['PERIODICIDADE'] == 'anual':
+        return config
+    return {**config, 'ANOS': rotulos_periodos(config['ANOS'], config['PERIODICIDADE'])}
+
+# Parâmetros que mudam o conteúdo dos arquivos sem mudar os valores de df_final; entram no
+# hash do manifesto para que alterá-los regrave as saídas.
+PARAMETROS_EXPORTACAO = ['INDICADORES', 'CODIGOS_INDICADORES', 'CASAS_INDICADORES', 'PERIODICIDADE',
+                         'METODO_INTERPOLACAO']
+
+def parametros_exportacao(config):
+    """Valores de PARAMETROS_EXPORTACAO, na ordem, para o contexto do hash do manifesto."""
+    return [config[nome] for nome in PARAMETROS_EXPORTACAO]
+
+def modo_manifesto(modo, config):
+    """Modo no nome do manifesto; séries infra-anuais têm manifesto próprio."""
+    return modo if config['PERIODICIDADE'] == 'anual' else f"{modo}_{config['PERIODICIDADE']}"
+
+# =============================================================================
+# 4. GERAÇÃO DOS ARQUIVOS CSV (AJUSTADO CONFORME SOLICITADO)
+# =============================================================================
+
+def casas_decimais(df_final, config):
+    """Casas decimais de cada linha (indicadores com CASAS_INDICADORES), ou None se todas são inteiras."""
+    if not config['INDICADORES']:
+        return None
+    indicadores = df_final['VAR_COD'].isin(list(codigos_indicadores(config).values())).to_numpy()
+    return np.where(indicadores, config['CASAS_INDICADORES'], 0)
+
+def formatar_valores(df_final, anos, config):
+    """Matriz (linha, ano) dos valores no padrão brasileiro (ex.: 1.500 e 52,31)."""
+    matriz = df_final[anos].to_numpy(dtype=float)
+    casas = casas_decimais(df_final, config)
+    return formatar_inteiros_br(matriz) if casas is None else formatar_linhas_br(matriz, casas)
+
+def verificar_alteracoes(df_final, anos, sigla, loc_nome, loc_cod, output_dir, modo, arquivo_do_ano,
+                         incremental=True, parametros=()):
+    """Compara os hashes de cada ano com o manifesto anterior.
+
+    `parametros` (parametros_exportacao) entram no hash junto com LOC_NOME e LOC_COD. Devolve os anos alterados (todos, se `incremental` for False), os hashes
+    atuais e o caminho do manifesto.
+    """
+    hashes = hashes_por_ano(df_final, anos, contexto=(loc_nome, loc_cod, *parametros))
+    manifesto = caminho_manifesto(output_dir, sigla, modo)
+    if not incremental:
+        return anos, hashes, manifesto
+
+    existe = lambda ano: os.path.exists(os.path.join(output_dir, arquivo_do_ano(ano)))
+    alterados = anos_alterados(hashes, ler_manifesto(manifesto), existe)
+    if alterados:
+        print(f"  Colunas alteradas ({len(alterados)}): {', '.join(f'd_{ano}' for ano in alterados)}")
+    else:
+        print("  ✓ Nenhum ano alterado desde a última execução; arquivos mantidos.")
+    return alterados, hashes, manifesto
+
+def exportar_csv(df_final, sigla, loc_nome, loc_cod, config):
+    """Gera um arquivo {SIGLA}_{ano}.csv por ano no diretório de saída.
+
+    Todos os arquivos são montados em memória e gravados juntos por escrever_arquivos.
+    Devolve os anos regravados.
+    """
+    output_dir = config['OUTPUT_DIR']
+    print(f"\nGerando {len(config['ANOS'])} arquivos CSV no diretório: {output_dir}...")
+
+    anos = [ano for ano in config['ANOS'] if ano in df_final.columns]
+    alterados, hashes, manifesto = verificar_alteracoes(
+        df_final, anos, sigla, loc_nome, loc_cod, output_dir, modo_manifesto("anual", config),
+        lambda ano: f"{sigla}_{ano}.csv", config['EXPORTACAO_INCREMENTAL'], parametros_exportacao(config)
+    )
+    if not alterados:
+        return alterados
+
+    # Formata todos os anos alterados de uma vez (padrão brasileiro, ex.: 1.500)
+    valores_br = dict(zip(alterados, formatar_valores(df_final, alterados, config).T))
+
+    arquivos = {}
+    for ano in alterados:
+        # 1. Seleciona VAR_COD e a coluna do ano (que contém o valor da população)
+        df_output = df_final[['VAR_COD', ano]].copy()
+
+        # 2. Adiciona as colunas solicitadas LOC_NOME e LOC_COD
+        df_output.insert(0, 'LOC_NOME', loc_nome)
+        df_output.insert(1, 'LOC_COD', loc_cod)
+
+        # 3. Renomeia a coluna do ano (e.g., '2000') para o formato solicitado (e.g., 'd_2000')
+        col_d_ano = f"d_{ano}"
+        df_output.rename(columns={ano: col_d_ano}, inplace=True)
+        df_output[col_d_ano] = valores_br[ano]
+
+        file_name = f"{sigla}_{ano}.csv"
+        arquivos[file_name] = df_output.to_csv(index=False, sep=';').encode('latin-1')
+
+    estatisticas = escrever_arquivos(arquivos, output_dir, max_threads=config['THREADS_ESCRITA'])
+    atualizar_manifesto(manifesto, hashes)
+    print(f"  ✓ {resumo_escrita(estatisticas)}")
+    return alterados
+
+def exportar_csv_largo(df_final, sigla, loc_nome, loc_cod, config):
+    """Gera um único CSV com LOC_NOME;LOC_COD;VAR_COD e uma coluna d_YYYY por ano.
+
+    O arquivo é regravado por inteiro se qualquer ano mudou. Cada intervalo de anos é um
+    arquivo com manifesto próprio. Devolve os anos alterados.
+    """
+    output_dir = config['OUTPUT_DIR']
+    anos = [ano for ano in config['ANOS'] if ano in df_final.columns]
+    file_name = f"{sigla}_{anos[0]}_{anos[-1]}.csv"
+    print(f"\nGerando {file_name} ({len(anos)} anos) no diretório: {output_dir}...")
+
+    alterados, hashes, manifesto = verificar_alteracoes(
+        df_final, anos, sigla, loc_nome, loc_cod, output_dir,
+        f"{modo_manifesto('largo', config)}_{anos[0]}_{anos[-1]}", lambda ano: file_name,
+        config['EXPORTACAO_INCREMENTAL'], parametros_exportacao(config)
+    )
+    if not alterados:
+        return alterados
+
+    df_output = df_final[['VAR_COD', *anos]].copy()
+    df_output.insert(0, 'LOC_NOME', loc_nome)
+    df_output.insert(1, 'LOC_COD', loc_cod)
+    df_output[anos] = formatar_valores(df_final, anos, config)
+    df_output.columns = ['LOC_NOME', 'LOC_COD', 'VAR_COD', *[f"d_{ano}" for ano in anos]]
+
+    conteudo = df_output.to_csv(index=False, sep=';').encode('latin-1')
+    estatisticas = escrever_arquivos({file_name: conteudo}, output_dir, max_threads=1)
+    gravar_manifesto(manifesto, hashes)
+    print(f"  ✓ {resumo_escrita(estatisticas)}")
+    return alterados
+
+def conectar_bd(config):
+    """Abre a conexão descrita em CONEXAO_BD e devolve (conexão, paramstyle).
+
+    CONEXAO_BD é {'modulo': ..., 'args': [...], 'kwargs': {...}} (ou uma função que
+    devolve a conexão, só no processamento em um único processo). Sem PARAMSTYLE_BD,
+    usa o paramstyle declarado pelo módulo do driver.
+    """
+    especificacao = config['CONEXAO_BD']
+    if callable(especificacao):
+        return especificacao(), config['PARAMSTYLE_BD'] or 'qmark'
+    modulo = importlib.import_module(especificacao['modulo'])
+    conexao = modulo.connect(*especificacao.get('args', ()), **especificacao.get('kwargs', {}))
+    return conexao, config['PARAMSTYLE_BD'] or getattr(modulo, 'paramstyle', 'qmark')
+
+def dialeto_bd(config):
+    """Dialeto do ALTER TABLE: "sqlite" para conexões sqlite3, senão DIALETO_BD."""
+    especificacao = config['CONEXAO_BD']
+    if not callable(especificacao) and especificacao['modulo'] == 'sqlite3':
+        return 'sqlite'
+    return config['DIALETO_BD']
+
+def carregar_bd(df_final, loc_nome, loc_cod, config):
+    """Grava as linhas da UF direto na tb_dados, substituindo as do mesmo LOC_COD."""
+    anos = [ano for ano in config['ANOS'] if ano in df_final.columns]
+    linhas = linhas_tb_dados(df_final, anos, loc_nome, loc_cod, casas=casas_decimais(df_final, config))
+    conexao, paramstyle = conectar_bd(config)
+    try:
+        estatisticas = carregar_tb_dados(conexao, linhas, anos, paramstyle=paramstyle, apagar_loc_cod=loc_cod)
+    finally:
+        conexao.close()
+    print(f"  ✓ Carga na tb_dados: {estatisticas['linhas']} linhas em {estatisticas['segundos']:.2f} s "
+          f"({estatisticas['linhas_por_s']:,.0f} linhas/s)")
+
+def preparar_bd(config):
+    """Cria na tb_dados as colunas d_YYYY que faltam para os ANOS configurados.
+
+    Devolve True se a tabela está pronta para a carga.
+    """
+    conexao, _ = conectar_bd(config)
+    try:
+        faltantes = preparar_colunas_anos(
+            conexao, config['ANOS'], dialeto=dialeto_bd(config), arquivo_sql=config['ARQUIVO_DDL']
+        )
+    finally:
+        conexao.close()
+    if not faltantes:
+        print("  ✓ tb_dados já possui todas as colunas de ano")
+    elif config['ARQUIVO_DDL'] is not None:
+        print(f"  ✓ ALTER TABLE com {len(faltantes)} colunas gravado em {config['ARQUIVO_DDL']}")
+        print("  ✗ Aviso: carga na tb_dados suspensa até o ALTER TABLE ser aplicado.")
+        return False
+    else:
+        print(f"  ✓ Colunas criadas na tb_dados: {', '.join(faltantes)}")
+    return True
+
+def ler_publicados(sigla, loc_cod, anos, config):
+    """Saídas já publicadas da UF (CSVs de OUTPUT_DIR ou tb_dados), ou None se não houver."""
+    if config['COMPARAR_COM'] == 'csv':
+        return ler_publicados_csv(config['OUTPUT_DIR'], sigla, anos, config['MODO_EXPORTACAO'])
+    conexao, paramstyle = conectar_bd(config)
+    try:
+        registros = ler_tb_dados(conexao, loc_cod, anos, paramstyle=paramstyle)
+    finally:
+        conexao.close()
+    if not registros:
+        return None
+    matriz = np.array(registros, dtype=object)
+    return tabela_valores(matriz[:, 0].astype(np.int64), ler_numeros_br(matriz[:, 1:]), anos)
+
+def comparar_publicados(df_final, sigla, loc_cod, config):
+    """Compara df_final com as saídas publicadas e grava o relatório da UF.
+
+    Devolve o relatório (uma linha por célula alterada ou VAR_COD adicionado/removido).
+    """
+    anos = [ano for ano in config['ANOS'] if ano in df_final.columns]
+    novo = tabela_valores(
+        df_final['VAR_COD'], arredondar_como_exportado(df_final[anos], casas_decimais(df_final, config)), anos
+    )
+    anterior = ler_publicados(sigla, loc_cod, anos, config)
+    if anterior is None:
+        print(f"  ✗ Aviso: Nenhuma saída publicada de {sigla} para comparar; todos os VAR_COD são novos.")
+        anterior = novo.iloc[:0]
+    relatorio = comparar_saidas(anterior, novo)
+    print(f"  {resumo_diferencas(relatorio)}")
+
+    os.makedirs(config['DIRETORIO_DIFERENCAS'], exist_ok=True)
+    caminho = os.path.join(config['DIRETORIO_DIFERENCAS'], f"{sigla}.csv")
+    relatorio.to_csv(caminho, index=False, sep=';', encoding='latin-1')
+    print(f"  ✓ Relatório de diferenças gravado em {caminho}")
+    return relatorio
+
+# =============================================================================
+# 5. PROCESSAMENTO POR UF (MODO LOTE)
+# =============================================================================
+
+def processar_uf(df_go, df_variaveis, indice, sigla, loc_nome, loc_cod, config, carga_bd=False,
+                 df_indicadores=None):
+    """Executa agregados, mesclagem e exportação para as linhas de uma UF.
+
+    `df_indicadores` são as linhas dos indicadores da UF, já calculadas para todas as
+    localidades por calcular_indicadores_cubo. Devolve (sigla, linhas mapeadas, métricas
+    das etapas).
+    """
+    if config['MEDIR_MEMORIA']:
+        iniciar_memoria()
+    diagnostico = diagnostico_ativo(config['NIVEL_LOG'])
+    metricas = []
+
+    if diagnostico:
+        imprimir_grupos_etarios(df_go)
+    with medir(metricas, 'agregados', len(df_go), sigla=sigla) as etapa:
+        df_go = calcular_agregados(df_go, sigla, config['ANOS'])
+        etapa['linhas_saida'] = len(df_go)
+    with medir(metricas, 'chaves', len(df_go), sigla=sigla) as etapa:
+        df_go = criar_chaves_projecoes(df_go)
+        etapa['linhas_saida'] = len(df_go)
+    if diagnostico:
+        imprimir_merge_keys(df_go, df_variaveis)
+    with medir(metricas, 'mesclagem', len(df_go), sigla=sigla) as etapa:
+        df_final = mesclar_variaveis(df_go, indice)
+        etapa['linhas_saida'] = len(df_final)
+    if df_indicadores is not None:
+        df_final = acrescentar_indicadores(df_final, df_indicadores, config)
+    if config['PERIODICIDADE'] != 'anual':
+        with medir(metricas, 'interpolacao', len(df_final), sigla=sigla) as etapa:
+            df_final = interpolar_periodos(df_final, config)
+            etapa['linhas_saida'] = len(df_final)
+    config_exportacao = configuracao_exportacao(config)
+    if config['COMPARAR_COM'] is not None:
+        with medir(metricas, 'diferencas', len(df_final), sigla=sigla) as etapa:
+            etapa['linhas_saida'] = len(comparar_publicados(df_final, sigla, loc_cod, config_exportacao))
+        return sigla, len(df_final), metricas
+    with medir(metricas, 'exportacao', len(df_final), sigla=sigla) as etapa:
+        if config['MODO_EXPORTACAO'] == "largo":
+            alterados = exportar_csv_largo(df_final, sigla, loc_nome, loc_cod, config_exportacao)
+        else:
+            alterados = exportar_csv(df_final, sigla, loc_nome, loc_cod, config_exportacao)
+        etapa['anos_gravados'] = len(alterados)
+        etapa['linhas_saida'] = len(df_final) if alterados else 0
+    if carga_bd:
+        with medir(metricas, 'carga_bd', len(df_final), sigla=sigla) as etapa:
+            carregar_bd(df_final, loc_nome, loc_cod, config)
+            etapa['linhas_saida'] = len(df_final)
+    return sigla, len(df_final), metricas
+
+def separar_localidades(df_projecoes, siglas):
+    """Separa as linhas de cada localidade (UF ou município) em uma única passada.
+
+    Devolve [(localidade, linhas, LOC_NOME, LOC_COD)] para as localidades das siglas
+    pedidas, na ordem de `siglas` e, dentro de cada sigla, na ordem da planilha. UFs
+    sem LOC_COD cadastrado e siglas ausentes da planilha são avisadas e ignoradas.
+    """
+    if 'LOCALIDADE' not in df_projecoes.columns:
+        df_projecoes = identificar_localidades(df_projecoes)
+    por_sigla = {}
+    for chave, df in df_projecoes.groupby('LOCALIDADE', sort=False, observed=True):
+        por_sigla.setdefault(sigla_da_chave(chave), []).append((chave, df))
+
+    localidades = []
+    for sigla in siglas:
+        if sigla not in por_sigla:
+            print(f"✗ Aviso: SIGLA '{sigla}' não encontrada na planilha de projeções.")
+            continue
+        for chave, df in por_sigla[sigla]:
+            primeira = df.iloc[0]
+            localidade = resolver_localidade(sigla, primeira.get('COD'), primeira.get('LOCAL'))
+            if localidade is None:
+                print(f"✗ Aviso: SIGLA '{sigla}' sem LOC_COD cadastrado em localidades.py. Ignorada.")
+            else:
+                print(f"Filtrando projeções para {'SIGLA' if chave == sigla else 'LOCALIDADE'} = '{chave}'...")
+                localidades.append((chave, df.copy(), *localidade))
+    return localidades
+
+def processar_lote(df_projecoes, df_variaveis, indice, siglas, config, carga_bd=False, executor=None,
+                   indicadores=None):
+    """Processa várias localidades, distribuindo o trabalho de cada uma entre processos.
+
+    Com `executor` (um ProcessPoolExecutor já aberto) as localidades vão para ele;
+    sem ele, um pool é criado só para esta chamada. `indicadores` é o resultado de
+    calcular_indicadores_cubo para as localidades do lote.
+    """
+    indicadores = indicadores or {}
+    tarefas = [
+        (df_go, df_variaveis, indice, chave, loc_nome, loc_cod, config, carga_bd, indicadores.get(chave))
+        for chave, df_go, loc_nome, loc_cod in separar_localidades(df_projecoes, siglas)
+    ]
+
+    if executor is not None and len(tarefas) > 1:
+        futuros = [executor.submit(processar_uf, *tarefa) for tarefa in tarefas]
+        return [futuro.result() for futuro in futuros]
+    max_processos = config['MAX_PROCESSOS']
+    if len(tarefas) <= 1 or max_processos == 1:
+        return [processar_uf(*tarefa) for tarefa in tarefas]
+
+    n_processos = min(max_processos or os.cpu_count() or 1, len(tarefas))
+    print(f"\nProcessando {len(tarefas)} UFs em {n_processos} processos...")
+    with ProcessPoolExecutor(max_workers=n_processos) as executor:
+        futuros = [executor.submit(processar_uf, *tarefa) for tarefa in tarefas]
+        return [futuro.result() for futuro in futuros]
+
+# =============================================================================
+# 6. PROCESSAMENTO EM LOTES DE LOCALIDADES (MEMÓRIA LIMITADA)
+# =============================================================================
+# Para projeções municipais: em vez de manter a planilha inteira em memória, as
+# localidades (UFs ou municípios, pela coluna CÓD.) são lidas, agregadas, mescladas
+# e gravadas um lote de cada vez. O tamanho do lote é a memória livre sob o teto
+# (MEMORIA_MAXIMA_MB menos o pico já ocupado pelo processo: Python, pandas, catálogo)
+# dividida pelo custo por linha medido com o tracemalloc nas primeiras LINHAS_AMOSTRA
+# linhas (leitura das células, cubo da validação e cópia das linhas de cada localidade).
+#
+# O teto é aproximado: a memória que o alocador retém entre lotes e o processamento
+# de cada localidade não entram na medida, e o pico do processo pode passar um pouco
+# dele. Com MAX_PROCESSOS diferente de 1, cada processo do pool tem a própria memória.
+
+LINHAS_AMOSTRA = 2000
+
+def ler_lotes_projecoes(config, linhas_por_lote):
+    """Gerador de lotes (DataFrames com tipos compactos e LOCALIDADE) sem separar uma localidade."""
+    siglas = config['SIGLAS']
+    lotes = iterar_lotes_xlsx(
+        config['PROJECOES_FILE'], config['PROJECOES_SHEET'], 'COD', linhas_por_lote,
+        colunas=[*COLUNAS_PROJECOES, *config['ANOS']],
+        filtros={'SIGLA': list(siglas)} if siglas is not None else None
+    )
+    for df_lote in lotes:
+        yield identificar_localidades(compactar_tipos(df_lote, config['ANOS']))
+
+def bytes_por_linha(config):
+    """Memória por linha do lote, medida com o tracemalloc em uma amostra do início da planilha.
+
+    Soma o pico da leitura (o alocador retém essa memória para o lote seguinte), o
+    acréscimo do cubo da validação e uma cópia do lote (as linhas de cada localidade
+    separadas em processar_lote).
+    """
+    ligado = tracemalloc.is_tracing()
+    if not ligado:
+        tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        inicial = tracemalloc.get_traced_memory()[0]
+        lotes = ler_lotes_projecoes(config, LINHAS_AMOSTRA)
+        amostra = next(lotes, None)
+        lotes.close()
+        custo = tracemalloc.get_traced_memory()[1] - inicial
+        if amostra is not None:
+            custo += memoria_bytes(amostra)
+            if config['VALIDACAO'] != 'desligada' or config['INDICADORES']:
+                tracemalloc.reset_peak()
+                inicial = tracemalloc.get_traced_memory()[0]
+                construir_cubo(amostra, config['ANOS'], coluna_localidade='LOCALIDADE')
+                custo += tracemalloc.get_traced_memory()[1] - inicial
+    finally:
+        if not ligado:
+            tracemalloc.stop()
+    return max(1, custo // max(1, 0 if amostra is None else len(amostra)))
+
+def linhas_por_lote(memoria_maxima_mb, custo_linha, memoria_ocupada=0):
+    """Linhas da planilha que cabem no que sobra do teto após a memória já ocupada."""
+    return max(1, int((memoria_maxima_mb * 1024 * 1024 - memoria_ocupada) // custo_linha))
+
+def limite_lote(config, metricas):
+    """Linhas por lote sob MEMORIA_MAXIMA_MB, a partir do custo por linha e da memória já ocupada."""
+    with medir(metricas, 'custo_linha') as etapa:
+        custo = bytes_por_linha(config)
+        etapa['bytes_por_linha'] = custo
+    ocupada = pico_rss_bytes() or 0
+    if ocupada >= config['MEMORIA_MAXIMA_MB'] * 1024 * 1024:
+        print(f"✗ Aviso: O processo já ocupa {ocupada / 1024 / 1024:,.0f} MB, acima do teto de "
+              f"{config['MEMORIA_MAXIMA_MB']} MB; cada lote terá uma única localidade.")
+    limite = linhas_por_lote(config['MEMORIA_MAXIMA_MB'], custo, ocupada)
+    print(f"Carregando {config['PROJECOES_FILE']}, aba '{config['PROJECOES_SHEET']}' em lotes de até "
+          f"{limite:,} linhas (teto de {config['MEMORIA_MAXIMA_MB']} MB, {ocupada / 1024 / 1024:,.0f} MB já "
+          f"ocupados, ~{custo:,} bytes por linha)...")
+    return limite
+
+def validar_em_lotes(config, limite, metricas):
+    """Confere todos os lotes sem processá-los; com VALIDACAO = "erro", interrompe no primeiro inconsistente.
+
+    Usado antes de qualquer gravação, para que o modo "erro" não deixe para trás os
+    arquivos dos lotes anteriores a uma violação. Custa uma leitura a mais da planilha.
+    """
+    print("Conferindo a consistência de todos os lotes antes da gravação...")
+    for numero, df_lote in enumerate(ler_lotes_projecoes(config, limite), start=1):
+        with medir(metricas, 'validacao', len(df_lote), lote=numero) as etapa:
+            cubo = construir_cubo(df_lote, config['ANOS'], coluna_localidade='LOCALIDADE')
+            etapa['violacoes'] = len(validar_projecoes(cubo, config))
+        del df_lote, cubo
+
+def processar_em_lotes(df_variaveis, indice, config, limite, carga_bd=False, metricas=None):
+    """Lê as projeções em lotes de até `limite` linhas e processa cada lote antes de ler o próximo.
+
+    Sempre usa o leitor em streaming e não passa pelo cache de planilhas. Os arquivos
+    gerados são os mesmos do processamento em memória. Com VALIDACAO = "aviso", cada
+    lote é conferido antes de ser gravado; com "erro", a conferência já foi feita por
+    validar_em_lotes. Devolve, como processar_lote, [(localidade, linhas mapeadas, métricas)].
+    """
+    metricas = [] if metricas is None else metricas
+    siglas = config['SIGLAS']
+
+    lotes = ler_lotes_projecoes(config, limite)
+    resultados = []
+    vistas = set()
+    numero = 0
+    with contextlib.ExitStack() as pilha:
+        # Um único pool de processos atende todos os lotes.
+        executor = None
+        if config['MAX_PROCESSOS'] != 1:
+            executor = pilha.enter_context(ProcessPoolExecutor(
+                max_workers=config['MAX_PROCESSOS'] or os.cpu_count() or 1
+            ))
+        while True:
+            leitura = []
+            with medir(leitura, 'carregar_lote', lote=numero + 1) as etapa:
+                df_lote = next(lotes, None)
+            if df_lote is None:
+                break
+            etapa['linhas_saida'] = len(df_lote)
+            metricas.extend(leitura)
+            # Um cubo por lote atende a validação e os indicadores.
+            validar = config['VALIDACAO'] not in ('erro', 'desligada')
+            indicadores = None
+            if validar or config['INDICADORES']:
+                cubo = construir_cubo(df_lote, config['ANOS'], coluna_localidade='LOCALIDADE')
+                if validar:
+                    with medir(metricas, 'validacao', len(df_lote), lote=numero + 1) as etapa:
+                        etapa['violacoes'] = len(validar_projecoes(cubo, config))
+                if config['INDICADORES']:
+                    indicadores = calcular_indicadores_cubo(cubo, config, metricas)
+                del cubo
+
+            numero += 1
+            presentes = list(pd.unique(df_lote['SIGLA'].dropna()))
+            vistas.update(presentes)
+            print(f"\nLote {numero}: {len(df_lote):,} linhas, {df_lote['LOCALIDADE'].nunique()} localidades")
+            resultados.extend(processar_lote(df_lote, df_variaveis, indice, presentes, config, carga_bd, executor,
+                                             indicadores))
+            del df_lote
+
+    for sigla in siglas or []:
+        if sigla not in vistas:
+            print(f"✗ Aviso: SIGLA '{sigla}' não encontrada na planilha de projeções.")
+    return resultados
+
+# =============================================================================
+# 7. EXECUÇÃO COMPLETA
+# =============================================================================
+
+def run(config=None):
+    """Executa o processamento completo e devolve [(sigla, linhas mapeadas)].
+
+    `config` é um dicionário como o de configuracao_padrao(); sem ele, valem os padrões
+    de configuracao.py. Com ARQUIVO_METRICAS, as métricas de cada etapa são acrescentadas a ele.
+    """
+    config = configuracao_padrao() if config is None else configuracao_padrao(**config)
+    if config['PERIODICIDADE'] != 'anual' and config['CONEXAO_BD'] is not None:
+        raise ValueError("Erro: A carga na tb_dados só aceita PERIODICIDADE 'anual'.")
+    if config['COMPARAR_COM'] not in (None, 'csv', 'bd'):
+        raise ValueError(f"Erro: COMPARAR_COM '{config['COMPARAR_COM']}' inválido (use csv ou bd).")
+    if config['COMPARAR_COM'] == 'bd' and config['CONEXAO_BD'] is None:
+        raise ValueError("Erro: A comparação com a tb_dados precisa de CONEXAO_BD.")
+    if config['MEDIR_MEMORIA']:
+        iniciar_memoria()
+    metricas = []
+    inicio = time.perf_counter()
+
+    em_lotes = config['MEMORIA_MAXIMA_MB'] is not None
+    indicadores = None
+    if not em_lotes:
+        with medir(metricas, 'carregar_projecoes') as etapa:
+            df_projecoes = carregar_projecoes(config, config['SIGLAS'])
+            etapa['linhas_saida'] = len(df_projecoes)
+        with medir(metricas, 'tipos_compactos', len(df_projecoes)) as etapa:
+            etapa['memoria_antes_bytes'] = memoria_bytes(df_projecoes)
+            df_projecoes = identificar_localidades(compactar_projecoes(df_projecoes, config))
+            etapa['memoria_depois_bytes'] = memoria_bytes(df_projecoes)
+            etapa['linhas_saida'] = len(df_projecoes)
+        if config['CUBO_DIR'] is not None or config['VALIDACAO'] != 'desligada' or config['INDICADORES']:
+            with medir(metricas, 'cubo', len(df_projecoes)) as etapa:
+                cubo = construir_cubo(df_projecoes, config['ANOS'], coluna_localidade='LOCALIDADE')
+                etapa['linhas_saida'] = int(cubo['presentes'].sum())
+        if config['VALIDACAO'] != 'desligada':
+            with medir(metricas, 'validacao', len(df_projecoes)) as etapa:
+                etapa['violacoes'] = len(validar_projecoes(cubo, config))
+        if config['INDICADORES']:
+            indicadores = calcular_indicadores_cubo(cubo, config, metricas)
+        if config['CUBO_DIR'] is not None:
+            gravar_cubo(cubo, config['CUBO_DIR'])
+            print(f"  ✓ Cubo {' × '.join(map(str, cubo['valores'].shape))} gravado em {config['CUBO_DIR']}")
+    else:
+        if config['CUBO_DIR'] is not None:
+            print("✗ Aviso: CUBO_DIR é ignorado no processamento em lotes.")
+        limite = limite_lote(config, metricas)
+        # Com VALIDACAO = "erro", todos os lotes são conferidos antes do primeiro ser gravado.
+        if config['VALIDACAO'] == 'erro':
+            validar_em_lotes(config, limite, metricas)
+    with medir(metricas, 'carregar_variaveis') as etapa:
+        df_variaveis = carregar_variaveis(config)
+        etapa['linhas_saida'] = len(df_variaveis)
+    with medir(metricas, 'resolver_catalogo', len(df_variaveis)) as etapa:
+        df_variaveis = preparar_variaveis(df_variaveis, config)
+        indice = indexar_variaveis(df_variaveis, config)
+        etapa['linhas_saida'] = len(indice)
+    if config['INDICADORES']:
+        conferir_codigos_indicadores(df_variaveis, config)
+
+    # No modo de comparação nada é gravado em OUTPUT_DIR nem na tb_dados.
+    comparacao = config['COMPARAR_COM'] is not None
+    if not comparacao:
+        os.makedirs(config['OUTPUT_DIR'], exist_ok=True)
+
+    carga_bd = not comparacao and config['CONEXAO_BD'] is not None and preparar_bd(config)
+
+    if em_lotes:
+        processadas = processar_em_lotes(df_variaveis, indice, config, limite, carga_bd, metricas)
+        siglas = [chave for chave, _, _ in processadas]
+    else:
+        siglas = config['SIGLAS']
+        if siglas is None:
+            siglas = sorted(df_projecoes['SIGLA'].dropna().unique())
+        processadas = processar_lote(df_projecoes, df_variaveis, indice, siglas, config, carga_bd,
+                                     indicadores=indicadores)
+
+    resultados = []
+    for sigla, n_linhas, metricas_uf in processadas:
+        print(f"  ✓ {sigla}: {n_linhas} linhas mapeadas por ano")
+        resultados.append((sigla, n_linhas))
+        metricas.extend(metricas_uf)
+
+    if config['ARQUIVO_METRICAS'] is not None:
+        gravar_metricas(config['ARQUIVO_METRICAS'], registro_execucao(
+            metricas, time.perf_counter() - inicio,
+            projecoes=config['PROJECOES_FILE'], siglas=list(siglas), anos=len(config['ANOS']),
+            modo=config['MODO_EXPORTACAO'], motor=config['MOTOR_LEITURA'],
+        ))
+    if config['RESUMO_METRICAS']:
+        print("\n" + tabela_metricas(metricas))
+    return resultados
@@ -0,0 +1,237 @@
+import argparse
+import functools
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+import configuracao
+from cubo_populacao import abrir_cubo
+from formatacao_br import formatar_inteiros_br
+from indice_etario import consultar_faixas, faixa_idades, indice_do_cubo
+
+# =============================================================================
+# SERVIÇO LOCAL DE CONSULTAS ÀS PROJEÇÕES
+# =============================================================================
+# Abre uma única vez o cubo gravado pelo pipeline (--cubo DIR) e o catálogo de
+# variáveis, e responde por HTTP a consultas por localidade, sexo, faixa etária
+# ou VAR_COD e intervalo de anos, em JSON ou CSV. Só lê arquivos locais e, por
+# padrão, só aceita conexões da própria máquina.
+#
+#   python servico_consultas.py --cubo cubo_2070
+#   GET /consulta?sigla=GO&var_cod=979&anos=2047
+#   GET /consulta?sigla=GO,DF&faixa=0-14,65+&sexo=Mulheres&anos=2030-2060&formato=csv
+#   GET /estado
+#
+# Na URL, '+' é sempre literal (faixa=65+); espaços são enviados como %20.
+#
+# As respostas recentes ficam em um cache LRU (TAMANHO_CACHE consultas), servidas
+# sem espera; no máximo MAX_CONCORRENTES consultas fora do cache são calculadas ao
+# mesmo tempo e as demais esperam até ESPERA_VAGA segundos e recebem 503.
+
+HOST = "127.0.0.1"
+PORTA = 8060
+TAMANHO_CACHE = 256
+MAX_CONCORRENTES = 8
+ESPERA_VAGA = 5.0
+
+# SEXO_VAR do catálogo -> SEXO das projeções.
+SEXOS_CATALOGO = {'total': 'Ambos', 'masculina': 'Homens', 'feminina': 'Mulheres'}
+
+
+def faixas_var_cod(df_variaveis):
+    """VAR_COD -> (faixa, SEXO) pelas MergeKeys resolvidas do catálogo.
+
+    O grupo 'total' vira a faixa '0+'; códigos de grupo desconhecido ficam de fora.
+    """
+    faixas = {}
+    for var_cod, grupo, sexo in df_variaveis[['VAR_COD', 'GRUPO_VAR', 'SEXO_VAR']].dropna().itertuples(index=False):
+        if grupo == 'desconhecido' or int(var_cod) in faixas:
+            continue
+        faixas[int(var_cod)] = ('0+' if grupo == 'total' else grupo, SEXOS_CATALOGO[sexo])
+    return faixas
+
+
+def carregar_dados(cubo_dir, config=None):
+    """Abre o cubo (mmap), monta o índice de faixas e o mapa de VAR_COD do catálogo."""
+    indice = indice_do_cubo(abrir_cubo(cubo_dir))
+    config = configuracao.configuracao_padrao(**(config or {}))
+    from pipeline import carregar_variaveis, preparar_variaveis
+    df_variaveis = preparar_variaveis(carregar_variaveis(config), config)
+    return {'indice': indice, 'var_cod': faixas_var_cod(df_variaveis)}
+
+
+def ler_parametros(query):
+    """parse_qs mantendo o '+' literal: em parse_qs ele viraria espaço e '65+' não seria uma faixa."""
+    return parse_qs(query.replace('+', '%2B'))
+
+
+def _lista(texto):
+    return [parte.strip() for parte in texto.split(',') if parte.strip()]
+
+
+def anos_consulta(texto, anos_disponiveis):
+    """'2030-2060', '2047' ou '2030,2040' -> anos como texto (vazio = todos).
+
+    Os intervalos são recortados dos anos do cubo (nunca um range do tamanho pedido);
+    anos fora das projeções são rejeitados.
+    """
+    if not texto:
+        return tuple(anos_disponiveis)
+    primeiro, ultimo = int(anos_disponiveis[0]), int(anos_disponiveis[-1])
+    anos = []
+    for parte in _lista(texto):
+        inicio, _, fim = parte.partition('-')
+        if not (inicio.isdigit() and (fim or inicio).isdigit()) or int(inicio) > int(fim or inicio):
+            raise ValueError(f"Erro: Intervalo de anos inválido: '{parte}'.")
+        inicio, fim = int(inicio), int(fim or inicio)
+        if inicio < primeiro or fim > ultimo:
+            raise ValueError(f"Erro: Anos '{parte}' fora das projeções ({primeiro}-{ultimo}).")
+        anos.extend(ano for ano in anos_disponiveis if inicio <= int(ano) <= fim)
+    return tuple(anos)
+
+
+def interpretar_consulta(parametros, dados):
+    """Normaliza os parâmetros da URL na chave da consulta (usada também pelo cache).
+
+    Devolve (siglas, ((rótulo, início, fim, SEXO, VAR_COD), ...), anos, formato).
+    """
+    valores = {nome: lista[-1] for nome, lista in parametros.items()}
+    desconhecidos = set(valores) - {'sigla', 'sexo', 'faixa', 'var_cod', 'anos', 'formato'}
+    if desconhecidos:
+        raise ValueError(f"Erro: Parâmetros desconhecidos: {', '.join(sorted(desconhecidos))}.")
+
+    siglas = tuple(sigla.upper() for sigla in _lista(valores['sigla'])) if valores.get('sigla') else None
+    anos = anos_consulta(valores.get('anos'), dados['indice']['anos'])
+    formato = valores.get('formato', 'json')
+    if formato not in ('json', 'csv'):
+        raise ValueError(f"Erro: Formato '{formato}' inválido (use json ou csv).")
+
+    if valores.get('var_cod'):
+        if 'faixa' in valores or 'sexo' in valores:
+            raise ValueError("Erro: Use var_cod ou faixa/sexo, não os dois.")
+        itens = []
+        for texto in _lista(valores['var_cod']):
+            if not texto.isdigit() or int(texto) not in dados['var_cod']:
+                raise ValueError(f"Erro: VAR_COD '{texto}' não encontrado no catálogo.")
+            faixa, sexo = dados['var_cod'][int(texto)]
+            itens.append((faixa, *faixa_idades(faixa), sexo, int(texto)))
+    else:
+        sexo = valores.get('sexo', 'Ambos')
+        itens = [(faixa, *faixa_idades(faixa), sexo, None) for faixa in _lista(valores.get('faixa', '0+'))]
+    return siglas, tuple(itens), anos, formato
+
+
+def executar_consulta(dados, chave):
+    """Calcula a consulta e devolve (tipo de conteúdo, corpo em bytes)."""
+    siglas, itens, anos, formato = chave
+    indice = dados['indice']
+    linhas, blocos = [], []
+    for rotulo, inicio, fim, sexo, var_cod in itens:
+        valores = consultar_faixas(indice, [(inicio, fim)], sexo=sexo, siglas=siglas, anos=anos)[0]
+        for sigla in siglas or indice['siglas']:
+            linhas.append({'SIGLA': str(sigla), 'VAR_COD': var_cod, 'SEXO': sexo, 'FAIXA': rotulo})
+        blocos.append(valores)
+    matriz = np.concatenate(blocos) if blocos else np.zeros((0, len(anos)))
+
+    if formato == 'json':
+        for linha, valores in zip(linhas, matriz.tolist()):
+            linha.update(zip((f"d_{ano}" for ano in anos), valores))
+        return 'application/json; charset=utf-8', json.dumps(linhas, ensure_ascii=False).encode('utf-8')
+
+    texto = formatar_inteiros_br(matriz.astype(float)) if len(matriz) else matriz
+    cabecalho = ['SIGLA', 'VAR_COD', 'SEXO', 'FAIXA', *(f"d_{ano}" for ano in anos)]
+    saida = [';'.join(cabecalho)]
+    for linha, valores in zip(linhas, texto):
+        dimensoes = ['' if valor is None else str(valor) for valor in linha.values()]
+        saida.append(';'.join([*dimensoes, *valores]))
+    return 'text/csv; charset=latin-1', ('\n'.join(saida) + '\n').encode('latin-1')
+
+
+class ManipuladorConsultas(BaseHTTPRequestHandler):
+    """Atende GET /consulta e GET /estado com os dados e o cache do servidor."""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/estado':
+            return self._responder(200, 'application/json; charset=utf-8', self.server.estado())
+        if url.path != '/consulta':
+            return self._erro(404, f"Erro: Caminho '{url.path}' inexistente (use /consulta ou /estado).")
+
+        try:
+            chave = interpretar_consulta(ler_parametros(url.query), self.server.dados)
+            tipo, corpo = self.server.consultar(chave)
+        except ValueError as e:
+            return self._erro(400, str(e))
+        except TimeoutError as e:
+            return self._erro(503, str(e))
+        self._responder(200, tipo, corpo)
+
+    def _erro(self, status, mensagem):
+        self._responder(status, 'application/json; charset=utf-8',
+                        json.dumps({'erro': mensagem}, ensure_ascii=False).encode('utf-8'))
+
+    def _responder(self, status, tipo, corpo):
+        self.send_response(status)
+        self.send_header('Content-Type', tipo)
+        self.send_header('Content-Length', str(len(corpo)))
+        self.end_headers()
+        self.wfile.write(corpo)
+
+
+def criar_servidor(dados, host=HOST, porta=PORTA, tamanho_cache=TAMANHO_CACHE, max_concorrentes=MAX_CONCORRENTES):
+    """Servidor HTTP (uma thread por conexão) com cache LRU e limite de consultas simultâneas."""
+    servidor = ThreadingHTTPServer((host, porta), ManipuladorConsultas)
+    servidor.daemon_threads = True
+    servidor.dados = dados
+    servidor.vagas = threading.BoundedSemaphore(max_concorrentes)
+
+    def calcular(chave):
+        # Só chamada nas faltas do cache: respostas em cache nunca esperam por vaga.
+        if not servidor.vagas.acquire(timeout=ESPERA_VAGA):
+            raise TimeoutError("Erro: Limite de consultas simultâneas atingido; tente novamente.")
+        try:
+            return executar_consulta(dados, chave)
+        finally:
+            servidor.vagas.release()
+
+    servidor.consultar = functools.lru_cache(maxsize=tamanho_cache)(calcular)
+
+    def estado():
+        indice = dados['indice']
+        return json.dumps({
+            'localidades': len(indice['siglas']),
+            'anos': [indice['anos'][0], indice['anos'][-1]] if indice['anos'] else [],
+            'var_cod': len(dados['var_cod']),
+            'cache': servidor.consultar.cache_info()._asdict(),
+        }).encode('utf-8')
+
+    servidor.estado = estado
+    return servidor
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Serviço local de consultas às projeções (HTTP).")
+    parser.add_argument('--cubo', default=configuracao.CUBO_DIR, required=configuracao.CUBO_DIR is None,
+                        help="Diretório do cubo gravado com --cubo no pipeline")
+    parser.add_argument('--variaveis', default=configuracao.VARIAVEIS_FILE, help="Planilha de variáveis (.xlsx)")
+    parser.add_argument('--aba-variaveis', default=configuracao.VARIAVEIS_SHEET, help="Aba da planilha de variáveis")
+    parser.add_argument('--host', default=HOST, help="Endereço de escuta (padrão: só a máquina local)")
+    parser.add_argument('--porta', type=int, default=PORTA)
+    parser.add_argument('--cache', type=int, default=TAMANHO_CACHE, help="Consultas guardadas no cache LRU")
+    parser.add_argument('--max-concorrentes', type=int, default=MAX_CONCORRENTES,
+                        help="Consultas calculadas ao mesmo tempo")
+    argumentos = parser.parse_args()
+
+    dados = carregar_dados(argumentos.cubo, {
+        'VARIAVEIS_FILE': argumentos.variaveis, 'VARIAVEIS_SHEET': argumentos.aba_variaveis,
+    })
+    servidor = criar_servidor(dados, argumentos.host, argumentos.porta, argumentos.cache, argumentos.max_concorrentes)
+    print(f"✓ Servindo {len(dados['indice']['siglas'])} localidades e {len(dados['var_cod'])} VAR_COD "
+          f"em http://{argumentos.host}:{argumentos.porta}/consulta")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        print("\nServiço encerrado.")
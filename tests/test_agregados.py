@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from agregados import AGREGADOS, agregados_cubo, calcular_agregados_registro
+from cubo_populacao import FAIXAS_QUINQUENAIS, construir_cubo, padronizar_grupo_etario
+
+ANOS = ['2030', '2031', '2032']
+GRUPOS_PLANILHA = ['00-04', '05-09', *FAIXAS_QUINQUENAIS[2:]]
+
+
+def _projecoes(sigla, semente, sem=()):
+    """Linhas de uma UF com valores aleatórios; `sem` remove (SEXO, grupo) da planilha."""
+    rng = np.random.default_rng(semente)
+    linhas = [(grupo, sexo, sigla, *rng.integers(0, 100000, size=len(ANOS)))
+              for sexo in ('Ambos', 'Homens', 'Mulheres') for grupo in GRUPOS_PLANILHA
+              if (sexo, grupo) not in sem]
+    df = pd.DataFrame(linhas, columns=['GRUPO_ETARIO', 'SEXO', 'SIGLA', *ANOS])
+    df['GRUPO_ETARIO_PADRAO'] = padronizar_grupo_etario(df['GRUPO_ETARIO'])
+    return df
+
+
+def _agregados_originais(df_go, sigla):
+    """Laços de filtro e soma do script original (980-983, 979, 939-941, 942-944), em ordem."""
+    linhas = []
+    ambos = df_go[df_go['SEXO'] == 'Ambos']
+    for grupo, faixas in AGREGADOS.items():
+        df_sum = ambos[ambos['GRUPO_ETARIO_PADRAO'].isin(faixas)]
+        if not df_sum.empty:
+            linhas.append((grupo, 'Ambos', *df_sum[ANOS].sum()))
+    df_979 = df_go[(df_go['SEXO'] == 'Mulheres') & (df_go['GRUPO_ETARIO'].str.strip() == '90 ou mais')]
+    for _, row in df_979.iterrows():
+        linhas.append((row['GRUPO_ETARIO'], 'Mulheres', *row[ANOS]))
+    for sexo in ('Ambos', 'Homens', 'Mulheres'):
+        df_sexo = df_go[df_go['SEXO'] == sexo]
+        if not df_sexo.empty:
+            linhas.append(('Total', sexo, *df_sexo[ANOS].sum()))
+    for faixa in ('0-4', '5-9', '10-14'):
+        df_faixa = df_go[(df_go['SEXO'] == 'Homens') & (df_go['GRUPO_ETARIO_PADRAO'] == faixa)]
+        if not df_faixa.empty:
+            linhas.append((faixa, 'Homens', *df_faixa[ANOS].sum()))
+    df = pd.DataFrame(linhas, columns=['GRUPO_ETARIO', 'SEXO', *ANOS])
+    df.insert(2, 'SIGLA', sigla)
+    return df
+
+
+def test_registro_igual_aos_lacos_originais():
+    df_go = _projecoes('GO', 0)
+    df_agregados, codigos = calcular_agregados_registro(df_go, ANOS, 'GO')
+    assert codigos == [980, 981, 982, 983, 979, 939, 940, 941, 942, 943, 944]
+    pd.testing.assert_frame_equal(df_agregados, _agregados_originais(df_go, 'GO'), check_dtype=False)
+
+
+def test_entradas_sem_linhas_de_origem_sao_omitidas():
+    df_go = _projecoes('GO', 1, sem=[('Homens', '05-09'), ('Mulheres', '90 ou mais')])
+    df_agregados, codigos = calcular_agregados_registro(df_go, ANOS, 'GO')
+    assert 943 not in codigos and 979 not in codigos
+    pd.testing.assert_frame_equal(df_agregados, _agregados_originais(df_go, 'GO'), check_dtype=False)
+
+
+def test_cubo_de_varias_localidades():
+    df = pd.concat([_projecoes('GO', 2), _projecoes('DF', 3)], ignore_index=True)
+    somas, presentes = agregados_cubo(construir_cubo(df, ANOS, coluna_grupo='GRUPO_ETARIO_PADRAO'))
+    assert presentes.all()
+    for posicao, sigla in enumerate(['GO', 'DF']):
+        esperado = _agregados_originais(df[df['SIGLA'] == sigla], sigla)
+        np.testing.assert_array_equal(somas[posicao], esperado[ANOS].to_numpy())
@@ -0,0 +1,14 @@
+import pandas as pd
+
+from benchmark_pipeline import gerar_catalogo_variaveis
+from catalogo_variaveis import construir_indice_chaves, resolver_catalogo
+
+
+def test_catalogo_sintetico_sem_chaves_duplicadas(tmp_path):
+    caminho = str(tmp_path / 'variaveis.xlsx')
+    gerar_catalogo_variaveis(caminho)
+    df_variaveis = resolver_catalogo(pd.read_excel(caminho))
+    indice, df_duplicadas = construir_indice_chaves(df_variaveis)
+    assert df_duplicadas.empty
+    assert indice['40-44|masculina'] == 1017
+    assert indice['0-4|masculina'] == 942
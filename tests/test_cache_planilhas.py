@@ -0,0 +1,67 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import cache_planilhas
+from cache_planilhas import carregar_com_cache
+
+
+def _carregador(file_path, sheet_name, skiprows):
+    _carregador.leituras += 1
+    return pd.DataFrame({'SIGLA': ['GO', None, 'DF'], 'SEXO': ['Ambos', 'Homens', 'Mulheres'], '2030': [1, 2, 3]})
+
+
+def _carregar(tmp_path):
+    planilha = tmp_path / 'planilha.xlsx'
+    if not planilha.exists():
+        planilha.write_bytes(b'conteudo')
+    return carregar_com_cache(_carregador, str(planilha), 'aba', cache_dir=str(tmp_path / 'cache'))
+
+
+def test_acerto_no_cache_nao_grava_no_disco(tmp_path):
+    _carregador.leituras = 0
+    primeiro = _carregar(tmp_path)
+    entrada = next((tmp_path / 'cache').glob('*.npz'))
+    mtime = os.stat(entrada).st_mtime_ns
+
+    segundo = _carregar(tmp_path)
+    assert _carregador.leituras == 1
+    assert os.stat(entrada).st_mtime_ns == mtime
+    assert sorted(os.listdir(tmp_path / 'cache')) == sorted([entrada.name, 'hashes.json'])
+    pd.testing.assert_frame_equal(segundo, primeiro)
+    assert segundo['SIGLA'].isna().tolist() == [False, True, False]
+
+
+def test_hash_so_quando_tamanho_ou_mtime_mudam(tmp_path, monkeypatch):
+    hashes = []
+    original = cache_planilhas._hash_arquivo
+    monkeypatch.setattr(cache_planilhas, '_hash_arquivo', lambda caminho: hashes.append(caminho) or original(caminho))
+    _carregador.leituras = 0
+    _carregar(tmp_path)
+    _carregar(tmp_path)
+    assert len(hashes) == 1
+
+    # Arquivo só "tocado": o hash é refeito, mas o conteúdo é o mesmo e a entrada vale.
+    planilha = tmp_path / 'planilha.xlsx'
+    os.utime(planilha, ns=(0, os.stat(planilha).st_mtime_ns + 10**9))
+    _carregar(tmp_path)
+    assert (len(hashes), _carregador.leituras) == (2, 1)
+
+    planilha.write_bytes(b'outro conteudo')
+    _carregar(tmp_path)
+    assert (len(hashes), _carregador.leituras) == (3, 2)
+
+
+def test_colunas_mistas_sem_pickle(tmp_path):
+    df = pd.DataFrame({
+        'CÓD.': [5208707, 'GO', np.nan, 5208707],
+        'LOCAL': ['Goiânia', np.nan, 'Anápolis', 'Goiânia'],
+        '2030': [1.5, 2.0, np.nan, 4.0],
+    })
+    destino = str(tmp_path / 'entrada.npz')
+    cache_planilhas._salvar_npz(df, destino)
+    with np.load(destino, allow_pickle=False) as dados:
+        assert all(dados[nome].dtype != object for nome in dados.files)
+
+    pd.testing.assert_frame_equal(cache_planilhas._ler_npz(destino), df)
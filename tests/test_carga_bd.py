@@ -0,0 +1,52 @@
+import sqlite3
+
+import pytest
+
+from carga_bd import carregar_tb_dados
+
+ANOS = ['2030', '2031']
+
+
+def _conexao(linhas_existentes=()):
+    conexao = sqlite3.connect(':memory:')
+    conexao.execute("CREATE TABLE tb_dados (LOC_NOME TEXT, LOC_COD INTEGER NOT NULL, VAR_COD INTEGER NOT NULL, "
+                    "d_2030 VARCHAR(100), d_2031 VARCHAR(100))")
+    conexao.executemany("INSERT INTO tb_dados VALUES (?, ?, ?, ?, ?)", linhas_existentes)
+    conexao.commit()
+    return conexao
+
+
+def _linhas(conexao):
+    return conexao.execute("SELECT * FROM tb_dados ORDER BY LOC_COD, VAR_COD").fetchall()
+
+
+def test_carga_em_varios_lotes():
+    conexao = _conexao()
+    linhas = [('Goiás', 1000, var_cod, '1.500', '1.600') for var_cod in range(25)]
+    estatisticas = carregar_tb_dados(conexao, linhas, ANOS, tamanho_lote=10, max_parametros=15)
+    assert estatisticas['linhas'] == 25
+    assert _linhas(conexao) == sorted(linhas, key=lambda linha: linha[2])
+
+
+def test_recarga_substitui_so_o_loc_cod():
+    conexao = _conexao([('Goiás', 1000, 944, '1', '2'), ('Distrito Federal', 2000, 944, '3', '4')])
+    novas = [('Goiás', 1000, 944, '10', '20'), ('Goiás', 1000, 979, '30', '40')]
+    carregar_tb_dados(conexao, novas, ANOS, tamanho_lote=1, apagar_loc_cod=1000)
+    assert _linhas(conexao) == [*novas, ('Distrito Federal', 2000, 944, '3', '4')]
+
+
+def test_recarga_sem_linhas_confirma_o_delete():
+    conexao = _conexao([('Goiás', 1000, 944, '1', '2')])
+    carregar_tb_dados(conexao, [], ANOS, apagar_loc_cod=1000)
+    conexao.rollback()
+    assert _linhas(conexao) == []
+
+
+def test_falha_em_lote_posterior_mantem_linhas_antigas():
+    antigas = [('Goiás', 1000, 944, '1', '2'), ('Goiás', 1000, 979, '3', '4')]
+    conexao = _conexao(antigas)
+    # O segundo lote viola o NOT NULL de VAR_COD depois de o primeiro já ter sido inserido.
+    novas = [('Goiás', 1000, 944, '10', '20'), ('Goiás', 1000, None, '30', '40')]
+    with pytest.raises(sqlite3.IntegrityError):
+        carregar_tb_dados(conexao, novas, ANOS, tamanho_lote=1, apagar_loc_cod=1000)
+    assert _linhas(conexao) == antigas
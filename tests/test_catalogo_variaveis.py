@@ -0,0 +1,120 @@
+import re
+
+import pandas as pd
+import pytest
+
+from catalogo_variaveis import (construir_indice_chaves, extract_group_sex_variaveis, mapear_var_cod,
+                                resolver_catalogo)
+
+
+def _cadeia_original(var_str):
+    """if/elif do script original, sem alterações."""
+    if 'Feminina' in var_str:
+        sexo = 'feminina'
+    elif 'Masculina' in var_str:
+        sexo = 'masculina'
+    else:
+        sexo = 'total'
+
+    var_lower = var_str.lower()
+
+    if '0 a 4 anos' in var_lower or '0-4' in var_lower or '0 a 4' in var_lower:
+        grupo = '0-4'
+    elif '5 a 9 anos' in var_lower or '5-9' in var_lower or '5 a 9' in var_lower:
+        grupo = '5-9'
+    elif '10 a 14 anos' in var_lower or '10-14' in var_lower or '10 a 14' in var_lower:
+        grupo = '10-14'
+    elif '0 a 14 anos' in var_lower:
+        grupo = '0-14'
+    elif '15 a 29 anos' in var_lower:
+        grupo = '15-29'
+    elif '30 a 64 anos' in var_lower:
+        grupo = '30-64'
+    elif '65 anos ou mais' in var_lower:
+        grupo = '65+'
+    elif '90 anos ou mais' in var_lower or '90+' in var_lower:
+        grupo = '90+'
+    elif 'total' in var_lower:
+        if 'mulheres' in var_lower and 'feminina' in var_lower:
+            grupo = 'total'
+            sexo = 'feminina'
+        elif ('homens' in var_lower or 'masculina' in var_lower) and 'total' in var_lower:
+            grupo = 'total'
+            sexo = 'masculina'
+        else:
+            grupo = 'total'
+    else:
+        match_idade = re.search(r'(\d{1,2})\s?a\s?(\d{1,2})\sanos', var_lower)
+        if match_idade:
+            grupo = f"{match_idade.group(1)}-{match_idade.group(2)}"
+        else:
+            grupo = 'desconhecido'
+
+    return grupo, sexo
+
+
+TEXTOS = [
+    'População Total', 'População Masculina Total', 'População Feminina Total',
+    'Mulheres - População Feminina Total', 'Homens - Total', 'Total de homens',
+    'População Masculina de 0 a 4 anos', 'População Masculina de 5 a 9 anos',
+    'População Masculina de 10 a 14 anos', 'População de 0 a 14 anos', 'População de 15 a 29 anos',
+    'População de 30 a 64 anos', 'População de 65 anos ou mais', 'População Feminina de 90 anos ou mais',
+    'População 90+', 'Pop. 0-4', 'Pop. 5-9 Feminina', 'Pop. 10-14',
+    'População de 15 a 19 anos', 'População Feminina de 40 a 44 anos', 'População Masculina de 85a89 anos',
+    'População de 20 a 24 anos', 'Taxa de fecundidade', '',
+]
+
+
+def test_regras_compiladas_iguais_a_cadeia_original():
+    for texto in TEXTOS:
+        assert extract_group_sex_variaveis(texto) == _cadeia_original(texto), texto
+
+
+def test_resolucoes_persistidas_sao_reaproveitadas(tmp_path):
+    arquivo = str(tmp_path / 'variaveis.mergekeys.json')
+    df = pd.DataFrame({'VAR_COD': range(len(TEXTOS)), 'VAR': TEXTOS})
+    primeira = resolver_catalogo(df.copy(), arquivo)
+    segunda = resolver_catalogo(df.copy(), arquivo)
+    pd.testing.assert_frame_equal(primeira, segunda)
+    assert primeira['MergeKey'].tolist() == ['|'.join(_cadeia_original(texto)) for texto in TEXTOS]
+
+
+def _variaveis(pares):
+    return pd.DataFrame(pares, columns=['MergeKey', 'VAR_COD'])
+
+
+def test_indice_igual_ao_merge_com_chaves_unicas():
+    df_variaveis = _variaveis([('0-4|masculina', 942), ('total|total', 939), ('90+|feminina', 979)])
+    chaves = pd.Series(['total|total', '0-4|masculina', 'desconhecido|total', '90+|feminina', 'total|total'])
+    indice, duplicadas = construir_indice_chaves(df_variaveis)
+    assert duplicadas.empty
+
+    var_cod, sem_correspondencia = mapear_var_cod(chaves, indice)
+    esperado = pd.merge(chaves.to_frame('MergeKey'), df_variaveis, on='MergeKey', how='left')['VAR_COD']
+    pd.testing.assert_series_equal(var_cod, esperado.astype(float), check_names=False)
+    assert sem_correspondencia == ['desconhecido|total']
+
+    var_cod_categorico, _ = mapear_var_cod(chaves.astype('category'), indice)
+    pd.testing.assert_series_equal(var_cod_categorico, var_cod)
+
+
+def test_chave_duplicada_mantem_o_primeiro_var_cod():
+    df_variaveis = _variaveis([('0-4|masculina', 942), ('0-4|masculina', 1017), ('total|total', 939)])
+    indice, duplicadas = construir_indice_chaves(df_variaveis)
+    assert indice['0-4|masculina'] == 942
+    assert sorted(duplicadas['VAR_COD']) == [942, 1017]
+    # Uma linha por chave: a junção não multiplica as linhas como o merge fazia.
+    var_cod, _ = mapear_var_cod(pd.Series(['0-4|masculina']), indice)
+    assert var_cod.tolist() == [942.0]
+
+
+def test_chave_duplicada_com_politica_erro():
+    df_variaveis = _variaveis([('0-4|masculina', 942), ('0-4|masculina', 1017)])
+    with pytest.raises(ValueError, match='mais de um VAR_COD'):
+        construir_indice_chaves(df_variaveis, duplicadas='erro')
+
+
+def test_linha_repetida_com_o_mesmo_var_cod_nao_e_conflito():
+    df_variaveis = _variaveis([('0-4|masculina', 942), ('0-4|masculina', 942)])
+    _, duplicadas = construir_indice_chaves(df_variaveis, duplicadas='erro')
+    assert duplicadas.empty
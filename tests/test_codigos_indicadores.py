@@ -0,0 +1,31 @@
+import pandas as pd
+import pytest
+
+from configuracao import configuracao_padrao
+from pipeline import conferir_codigos_indicadores
+
+CATALOGO = pd.DataFrame({'VAR_COD': [939, 944, 979]})
+
+
+def _config(**codigos):
+    padrao = configuracao_padrao()['CODIGOS_INDICADORES']
+    return configuracao_padrao(INDICADORES=True, CODIGOS_INDICADORES={**padrao, **codigos})
+
+
+def test_sem_codigos_alocados():
+    with pytest.raises(ValueError, match='sem nenhum VAR_COD'):
+        conferir_codigos_indicadores(CATALOGO, _config())
+
+
+def test_codigo_ja_usado_no_catalogo():
+    with pytest.raises(ValueError, match='catálogo de variáveis: 944'):
+        conferir_codigos_indicadores(CATALOGO, _config(razao_sexo=944, taxa_crescimento=1200))
+
+
+def test_codigos_repetidos():
+    with pytest.raises(ValueError, match='repetidos'):
+        conferir_codigos_indicadores(CATALOGO, _config(razao_sexo=1200, taxa_crescimento=1200))
+
+
+def test_codigos_livres():
+    conferir_codigos_indicadores(CATALOGO, _config(razao_sexo=1200, taxa_crescimento=1201))
@@ -0,0 +1,38 @@
+import sqlite3
+
+import pytest
+
+from carga_bd import colunas_existentes, comandos_alter_anos, preparar_colunas_anos
+
+
+def _conexao():
+    conexao = sqlite3.connect(':memory:')
+    conexao.execute("CREATE TABLE tb_dados (LOC_NOME TEXT, LOC_COD INTEGER, VAR_COD INTEGER, D_2000 VARCHAR(100))")
+    return conexao
+
+
+def test_mysql_gera_um_unico_alter_table():
+    comandos = comandos_alter_anos('tb_dados', ['d_2001', 'd_2002'])
+    assert comandos == ["ALTER TABLE tb_dados\nADD COLUMN d_2001 VARCHAR(100),\nADD COLUMN d_2002 VARCHAR(100)"]
+
+
+def test_sqlite_cria_so_as_colunas_faltantes():
+    conexao = _conexao()
+    faltantes = preparar_colunas_anos(conexao, ['2000', '2001', '2002'], dialeto='sqlite')
+    assert faltantes == ['d_2001', 'd_2002']
+    assert colunas_existentes(conexao) == ['LOC_NOME', 'LOC_COD', 'VAR_COD', 'D_2000', 'd_2001', 'd_2002']
+    # Segunda execução: nada a criar.
+    assert preparar_colunas_anos(conexao, ['2000', '2001', '2002'], dialeto='sqlite') == []
+
+
+def test_arquivo_ddl_nao_altera_a_tabela(tmp_path):
+    conexao = _conexao()
+    arquivo = tmp_path / 'alter.sql'
+    assert preparar_colunas_anos(conexao, ['2000', '2001', '2002'], arquivo_sql=str(arquivo)) == ['d_2001', 'd_2002']
+    assert arquivo.read_text(encoding='utf-8').count('ALTER TABLE') == 1
+    assert colunas_existentes(conexao) == ['LOC_NOME', 'LOC_COD', 'VAR_COD', 'D_2000']
+
+
+def test_dialeto_desconhecido():
+    with pytest.raises(ValueError):
+        comandos_alter_anos('tb_dados', ['d_2001'], dialeto='oracle')
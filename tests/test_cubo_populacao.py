@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cubo_populacao import FAIXAS_QUINQUENAIS, SEXOS, abrir_cubo, construir_cubo, fatiar_cubo, gravar_cubo
+
+ANOS = ['2030', '2031']
+
+
+@pytest.fixture
+def cubo():
+    rng = np.random.default_rng(0)
+    linhas = [(sigla, sexo, faixa, *rng.integers(0, 100000, size=len(ANOS)))
+              for sigla in ('GO', 'DF') for sexo in SEXOS for faixa in FAIXAS_QUINQUENAIS]
+    # MT só tem Mulheres 0-4 (as demais combinações ficam ausentes).
+    linhas.append(('MT', 'Mulheres', '00-04', 5, 6))
+    return construir_cubo(pd.DataFrame(linhas, columns=['SIGLA', 'SEXO', 'GRUPO_ETARIO', *ANOS]), ANOS)
+
+
+def test_gravar_e_abrir(cubo, tmp_path):
+    gravar_cubo(cubo, str(tmp_path / 'cubo'))
+    aberto = abrir_cubo(str(tmp_path / 'cubo'))
+    assert isinstance(aberto['valores'], np.memmap)
+    for eixo in ('siglas', 'sexos', 'faixas', 'anos'):
+        assert aberto[eixo] == cubo[eixo]
+    np.testing.assert_array_equal(aberto['valores'], cubo['valores'])
+    assert aberto['valores'].dtype == cubo['valores'].dtype
+    np.testing.assert_array_equal(aberto['presentes'], cubo['presentes'])
+    assert aberto['presentes'][2].sum() == 1
+
+
+def test_fatia_do_cubo_aberto(cubo, tmp_path):
+    gravar_cubo(cubo, str(tmp_path / 'cubo'))
+    fatia = fatiar_cubo(abrir_cubo(str(tmp_path / 'cubo')), siglas=['MT', 'GO'], sexos=['Mulheres'],
+                        faixas=['0-4'], anos=['2031'])
+    assert fatia['valores'].shape == (2, 1, 1, 1)
+    assert fatia['valores'][0, 0, 0, 0] == 6
+    assert fatia['valores'][1, 0, 0, 0] == cubo['valores'][0, SEXOS.index('Mulheres'), 0, 1]
+
+
+def test_cubo_inexistente(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        abrir_cubo(str(tmp_path / 'nada'))
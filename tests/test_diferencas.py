@@ -0,0 +1,21 @@
+from diferencas import comparar_saidas, tabela_valores
+
+ANOS = ['2030', '2031']
+
+
+def test_ocorrencia_de_var_cod_repetido():
+    anterior = tabela_valores([944, 979, 979], [[1, 2], [3, 4], [5, 6]], ANOS)
+    novo = tabela_valores([944, 979, 979, 979], [[1, 2], [3, 4], [5, 7], [8, 9]], ANOS)
+    relatorio = comparar_saidas(anterior, novo)
+    assert relatorio[['VAR_COD', 'ocorrencia', 'situacao']].values.tolist() == [
+        [979, 2, 'adicionado'], [979, 1, 'alterado'],
+    ]
+    alterado = relatorio.iloc[1]
+    assert (alterado['ano'], alterado['anterior'], alterado['novo']) == ('2031', 6.0, 7.0)
+
+
+def test_ocorrencia_removida():
+    anterior = tabela_valores([979, 979], [[3, 4], [5, 6]], ANOS)
+    novo = tabela_valores([979], [[3, 4]], ANOS)
+    relatorio = comparar_saidas(anterior, novo)
+    assert relatorio[['VAR_COD', 'ocorrencia', 'situacao']].values.tolist() == [[979, 1, 'removido']]
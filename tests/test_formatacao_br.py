@@ -0,0 +1,42 @@
+import numpy as np
+
+from formatacao_br import formatar_decimais_br, formatar_inteiros_br
+
+
+def _lambda_original(x):
+    """Formatador por célula do script original."""
+    return f"{x:,.0f}".replace(",", "TEMP_SEP").replace(".", ",").replace("TEMP_SEP", ".")
+
+
+def _conferir(valores):
+    valores = np.asarray(valores, dtype=np.float64)
+    esperado = [_lambda_original(x) for x in valores.ravel()]
+    assert formatar_inteiros_br(valores).ravel().tolist() == esperado
+
+
+def test_casos_especiais():
+    _conferir([np.nan, np.inf, -np.inf, 0.0, -0.0, -0.4, 0.4, -0.5])
+
+
+def test_empates_arredondam_para_o_par():
+    _conferir([0.5, 1.5, 2.5, -2.5, 999.5, 1000.5, 1234567.5, -7056494.5])
+
+
+def test_limites_do_int64():
+    _conferir([999_999_999_999_999_999.0, 1e18, -1e18, 9.3e18, 1e19, -1e20, 1.5e300])
+
+
+def test_matriz_aleatoria_mantem_a_forma():
+    rng = np.random.default_rng(0)
+    matriz = rng.integers(-10_000_000, 250_000_000, size=(200, 7)).astype(np.float64)
+    matriz[:, 0] = rng.normal(0, 2, size=len(matriz)).round(1)
+    matriz[rng.random(matriz.shape) < 0.05] = np.nan
+    saida = formatar_inteiros_br(matriz)
+    assert saida.shape == matriz.shape
+    _conferir(matriz)
+
+
+def test_decimais():
+    assert formatar_decimais_br([52.314, -1.005, 1500.5, np.nan, np.inf], 2).tolist() == [
+        '52,31', '-1,00', '1.500,50', '', '',
+    ]
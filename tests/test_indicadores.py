@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+
+from cubo_populacao import FAIXAS_QUINQUENAIS, SEXOS, construir_cubo
+from indicadores import REGISTRO_INDICADORES, linhas_indicadores
+
+ANOS = ['2030', '2031']
+CODIGOS = {nome: 1200 + i for i, (nome, _) in enumerate(REGISTRO_INDICADORES)}
+
+
+def _projecoes():
+    rng = np.random.default_rng(0)
+    linhas = [(local, sexo, faixa, *rng.integers(100, 1000, size=len(ANOS)))
+              for local in ('GO', 'DF') for sexo in SEXOS for faixa in FAIXAS_QUINQUENAIS]
+    return pd.DataFrame(linhas, columns=['SIGLA', 'SEXO', 'GRUPO_ETARIO', *ANOS])
+
+
+def test_cubo_de_todas_as_localidades_igual_ao_de_cada_uma():
+    df = _projecoes()
+    todas = linhas_indicadores(construir_cubo(df, ANOS), CODIGOS)
+    assert list(todas) == ['GO', 'DF']
+    for sigla, df_indicadores in todas.items():
+        sozinha = linhas_indicadores(construir_cubo(df[df['SIGLA'] == sigla], ANOS), CODIGOS)[sigla]
+        pd.testing.assert_frame_equal(df_indicadores, sozinha)
+
+
+def test_indicadores_sem_codigo_ficam_de_fora():
+    tabelas = linhas_indicadores(construir_cubo(_projecoes(), ANOS), {'razao_sexo': 1204})
+    assert tabelas['GO']['VAR_COD'].tolist() == [1204]
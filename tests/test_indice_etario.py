@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from cubo_populacao import FAIXAS_QUINQUENAIS, SEXOS
+from indice_etario import consultar_faixa, consultar_faixas, construir_indice_etario, tabela_faixas
+
+ANOS = ['2030', '2031', '2032']
+
+
+@pytest.fixture(scope='module')
+def projecoes():
+    rng = np.random.default_rng(0)
+    linhas = [(sigla, sexo, faixa, *rng.integers(0, 100000, size=len(ANOS)))
+              for sigla in ('GO', 'DF', 'MT') for sexo in SEXOS for faixa in FAIXAS_QUINQUENAIS]
+    # Linha fora das faixas quinquenais: não entra em nenhuma consulta.
+    linhas.append(('GO', 'Ambos', 'Total', 1, 1, 1))
+    return pd.DataFrame(linhas, columns=['SIGLA', 'SEXO', 'GRUPO_ETARIO', *ANOS])
+
+
+def _soma_direta(df, inicio, fim, sexo, sigla):
+    """Soma das linhas quinquenais cujas idades estão em inicio..fim (fim None = em diante)."""
+    idades = {faixa: int(faixa.split('-')[0].split()[0]) for faixa in FAIXAS_QUINQUENAIS}
+    faixas = [faixa for faixa, idade in idades.items() if idade >= inicio and (fim is None or idade <= fim)]
+    selecao = (df['SIGLA'] == sigla) & (df['SEXO'] == sexo) & df['GRUPO_ETARIO'].isin(faixas)
+    return df.loc[selecao, ANOS].sum().to_numpy()
+
+
+@pytest.mark.parametrize('inicio, fim', [(0, 4), (0, 14), (15, 64), (60, None), (65, None), (90, None), (0, None)])
+@pytest.mark.parametrize('sexo', SEXOS)
+def test_consultar_faixa_igual_a_soma_direta(projecoes, inicio, fim, sexo):
+    indice = construir_indice_etario(projecoes, ANOS)
+    valores = consultar_faixa(indice, inicio, fim, sexo=sexo)
+    for posicao, sigla in enumerate(['GO', 'DF', 'MT']):
+        np.testing.assert_array_equal(valores[posicao], _soma_direta(projecoes, inicio, fim, sexo, sigla))
+
+
+def test_filtros_de_localidade_e_ano(projecoes):
+    indice = construir_indice_etario(projecoes, ANOS)
+    valores = consultar_faixas(indice, ['15-64', '65+'], sexo='Mulheres', siglas=['MT', 'GO'], anos=['2032'])
+    assert valores.shape == (2, 2, 1)
+    assert valores[1, 0, 0] == _soma_direta(projecoes, 65, None, 'Mulheres', 'MT')[2]
+    tabela = tabela_faixas(indice, ['0-14'], siglas=['DF'])
+    assert tabela[ANOS].to_numpy().tolist() == [_soma_direta(projecoes, 0, 14, 'Ambos', 'DF').tolist()]
+
+
+def test_faixa_desalinhada(projecoes):
+    with pytest.raises(ValueError, match='não está alinhada'):
+        consultar_faixa(construir_indice_etario(projecoes, ANOS), 12, 20)
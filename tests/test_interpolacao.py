@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from interpolacao import interpolar, interpolar_tabela, pesos_interpolacao, rotulos_periodos
+
+ANOS = ['2030', '2031', '2032', '2033']
+
+
+def _pontos(periodicidade, n):
+    """Ponto médio de cada período, em anos (2030.125 = meio do 1º trimestre de 2030)."""
+    return np.repeat([int(ano) for ano in ANOS], n) + np.tile((np.arange(n) + 0.5) / n, len(ANOS))
+
+
+@pytest.mark.parametrize('periodicidade, n', [('trimestral', 4), ('mensal', 12)])
+def test_valor_anual_e_o_do_meio_do_ano(periodicidade, n):
+    # Série linear no tempo com o valor anual em 1º de julho: a interpolação a reproduz
+    # em todos os períodos, inclusive nas pontas (extensão da tendência).
+    anual = 1000 + 10 * (np.array([int(ano) for ano in ANOS]) + 0.5 - 2030)
+    periodos = interpolar(anual[None, :], ANOS, periodicidade)[0]
+    np.testing.assert_allclose(periodos, 1000 + 10 * (_pontos(periodicidade, n) - 2030))
+    # A média dos períodos de cada ano é o valor anual.
+    np.testing.assert_allclose(periodos.reshape(len(ANOS), n).mean(axis=1), anual)
+
+
+def test_pesos_entre_os_anos_vizinhos():
+    anterior, peso = pesos_interpolacao(ANOS, 'trimestral')
+    assert anterior.tolist() == [0, 0, 0, 0, 0, 0, 1, 1, 1, 1, 2, 2, 2, 2, 2, 2]
+    np.testing.assert_allclose(peso[:4], [-0.375, -0.125, 0.125, 0.375])
+    np.testing.assert_allclose(peso[-4:], [0.625, 0.875, 1.125, 1.375])
+
+
+def test_geometrico_reproduz_crescimento_constante():
+    anual = 1000 * 1.02 ** np.arange(len(ANOS))
+    periodos = interpolar(anual[None, :], ANOS, 'mensal', 'geometrico')[0]
+    np.testing.assert_allclose(periodos, 1000 * 1.02 ** (_pontos('mensal', 12) - 2030.5))
+
+
+def test_geometrico_cai_no_linear_sem_valores_positivos():
+    matriz = np.array([[0.0, 100.0, 200.0, 300.0], [-5.0, 10.0, 20.0, 40.0]])
+    geometrico = interpolar(matriz, ANOS, 'trimestral', 'geometrico')
+    linear = interpolar(matriz, ANOS, 'trimestral', 'linear')
+    # O segmento 2030-2031 tem um valor não positivo: usa o linear; os demais, o geométrico.
+    np.testing.assert_allclose(geometrico[:, :6], linear[:, :6])
+    assert not np.allclose(geometrico[:, 6:], linear[:, 6:])
+    assert (linear[0] >= 0).all()
+
+
+def test_tabela_com_rotulos_dos_periodos():
+    df = pd.DataFrame({'VAR_COD': [939, 979], **{ano: [100.0, 10.0] for ano in ANOS}})
+    tabela = interpolar_tabela(df, ANOS, 'trimestral')
+    assert list(tabela.columns) == ['VAR_COD', *rotulos_periodos(ANOS, 'trimestral')]
+    assert tabela.columns[1] == '2030T1'
+    assert (tabela.iloc[:, 1:] == df[['2030']].to_numpy()).all().all()
+
+
+@pytest.mark.parametrize('kwargs, mensagem', [
+    ({'periodicidade': 'semanal'}, 'Periodicidade'),
+    ({'metodo': 'spline'}, 'Método de interpolação'),
+])
+def test_opcoes_invalidas(kwargs, mensagem):
+    with pytest.raises(ValueError, match=mensagem):
+        interpolar(np.ones((1, len(ANOS))), ANOS, **kwargs)
+
+
+def test_um_ano_so():
+    with pytest.raises(ValueError, match='pelo menos dois anos'):
+        interpolar(np.ones((1, 1)), ['2030'])
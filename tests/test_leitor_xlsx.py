@@ -0,0 +1,59 @@
+import numpy as np
+import openpyxl
+import pandas as pd
+import pytest
+
+from leitor_xlsx import iterar_lotes_xlsx, ler_aba_xlsx
+from pipeline import load_projecoes
+
+ABA = '2) POP_GRUPO QUINQUENAL'
+
+
+@pytest.fixture(scope='module')
+def planilha(tmp_path_factory):
+    """Aba no layout das projeções: 5 linhas de título, cabeçalho e valores de vários tipos."""
+    caminho = str(tmp_path_factory.mktemp('xlsx') / 'projecoes.xlsx')
+    livro = openpyxl.Workbook()
+    aba = livro.active
+    aba.title = ABA
+    for titulo in (['PROJEÇÕES DA POPULAÇÃO'], ['Goiás e Distrito Federal'], [], ['Fonte: teste'], []):
+        aba.append(titulo)
+    aba.append(['GRUPO ETÁRIO', 'CÓD.', 'SEXO', 'SIGLA', 'LOCAL', 2030, 2031])
+    linhas = [
+        ['00-04', 52, 'Homens', 'GO', 'Goiás', 250000, 249000],
+        ['00-04', 52, 'Mulheres', 'GO', 'Goiás', 240000, 239500.5],
+        ['90 ou mais', 52, 'Ambos', 'GO', 'Goiás', 30000, None],
+        ['00-04', 53, 'Homens', 'DF', 'Distrito Federal', 90000, 89000],
+        ['05-09', 53, 'Mulheres', 'DF', 'Distrito Federal', 0, 1.25],
+    ]
+    for linha in linhas:
+        aba.append(linha)
+    livro.save(caminho)
+    return caminho
+
+
+def _referencia(planilha):
+    """Leitura original: pd.read_excel com skiprows=5 e a limpeza dos nomes de coluna."""
+    return load_projecoes(planilha, ABA, skiprows=5)
+
+
+def test_igual_ao_read_excel(planilha):
+    esperado = _referencia(planilha)
+    lido = ler_aba_xlsx(planilha, ABA)
+    assert list(lido.columns) == list(esperado.columns) == ['GRUPO_ETARIO', 'COD', 'SEXO', 'SIGLA', 'LOCAL',
+                                                            '2030', '2031']
+    pd.testing.assert_frame_equal(lido.fillna(np.nan), esperado, check_dtype=False)
+
+
+def test_filtros_e_colunas_na_leitura(planilha):
+    esperado = _referencia(planilha)
+    esperado = esperado[esperado['SIGLA'] == 'DF'][['SIGLA', 'SEXO', '2031']].reset_index(drop=True)
+    lido = ler_aba_xlsx(planilha, ABA, colunas=['SIGLA', 'SEXO', '2031'], filtros={'SIGLA': ['DF']})
+    pd.testing.assert_frame_equal(lido, esperado, check_dtype=False)
+
+
+def test_lotes_nao_separam_a_localidade(planilha):
+    lotes = list(iterar_lotes_xlsx(planilha, ABA, 'COD', linhas_por_lote=2))
+    assert [sorted(set(lote['COD'])) for lote in lotes] == [[52], [53]]
+    pd.testing.assert_frame_equal(pd.concat(lotes, ignore_index=True).fillna(np.nan), _referencia(planilha),
+                                  check_dtype=False)
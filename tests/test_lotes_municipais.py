@@ -0,0 +1,81 @@
+import contextlib
+import io
+import os
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from benchmark_pipeline import gerar_catalogo_variaveis, gerar_planilha_projecoes
+from configuracao import configuracao_padrao
+from pipeline import run
+
+ANOS = ['2020', '2021', '2022']
+N_MUNICIPIOS = 40
+
+
+@pytest.fixture(scope='module')
+def planilhas(tmp_path_factory):
+    """Planilha municipal sintética: 40 municípios com a SIGLA da UF e CÓD. de 7 dígitos."""
+    diretorio = tmp_path_factory.mktemp('municipios')
+    projecoes = str(diretorio / 'projecoes.xlsx')
+    variaveis = str(diretorio / 'variaveis.xlsx')
+    gerar_planilha_projecoes(projecoes, N_MUNICIPIOS, ANOS)
+    gerar_catalogo_variaveis(variaveis)
+    return diretorio, projecoes, variaveis
+
+
+def _executar(planilhas, saida, **alteracoes):
+    diretorio, projecoes, variaveis = planilhas
+    config = configuracao_padrao(**{
+        'PROJECOES_FILE': projecoes, 'VARIAVEIS_FILE': variaveis, 'VARIAVEIS_SHEET': 'Planilha1', 'ANOS': ANOS,
+        'SIGLAS': None, 'OUTPUT_DIR': str(diretorio / saida), 'CACHE_DIR': str(diretorio / 'cache'),
+        'MAX_PROCESSOS': 1, **alteracoes,
+    })
+    with contextlib.redirect_stdout(io.StringIO()) as log:
+        resultados = run(config)
+    return resultados, log.getvalue()
+
+
+def _arquivos(diretorio):
+    return {nome: open(os.path.join(diretorio, nome), 'rb').read()
+            for nome in os.listdir(diretorio) if not nome.startswith('.')}
+
+
+def test_cada_municipio_e_uma_localidade(planilhas):
+    resultados, log = _executar(planilhas, 'memoria')
+    assert len(resultados) == N_MUNICIPIOS
+    assert 'Ignorada' not in log
+
+    df = pd.read_csv(planilhas[0] / 'memoria' / 'RO_1100001_2020.csv', sep=';', encoding='latin-1')
+    assert set(df['LOC_NOME']) == {'Município 00001'}
+    assert set(df['LOC_COD']) == {1100001}
+    assert len(_arquivos(planilhas[0] / 'memoria')) == N_MUNICIPIOS * len(ANOS)
+
+
+def test_lotes_geram_os_mesmos_arquivos(planilhas):
+    _executar(planilhas, 'memoria_ref')
+    resultados, log = _executar(planilhas, 'lotes', MEMORIA_MAXIMA_MB=1)
+    assert len(resultados) == N_MUNICIPIOS
+    assert log.count('\nLote ') > 1
+    assert _arquivos(planilhas[0] / 'lotes') == _arquivos(planilhas[0] / 'memoria_ref')
+
+
+def test_lotes_com_pool_de_processos(planilhas):
+    _executar(planilhas, 'memoria_pool')
+    _executar(planilhas, 'lotes_pool', MEMORIA_MAXIMA_MB=1, MAX_PROCESSOS=2)
+    assert _arquivos(planilhas[0] / 'lotes_pool') == _arquivos(planilhas[0] / 'memoria_pool')
+
+
+def test_validacao_erro_nao_grava_lotes_anteriores(planilhas, tmp_path):
+    diretorio, projecoes, variaveis = planilhas
+    # Ambos ≠ Homens + Mulheres só no último município, que cai no último lote.
+    livro = openpyxl.load_workbook(projecoes)
+    aba = livro.active
+    aba.cell(aba.max_row, 6).value += 1000
+    corrompida = str(tmp_path / 'corrompida.xlsx')
+    livro.save(corrompida)
+
+    with pytest.raises(ValueError, match='inconsistentes'):
+        _executar((diretorio, corrompida, variaveis), 'erro', MEMORIA_MAXIMA_MB=1, VALIDACAO='erro')
+    assert not os.path.exists(diretorio / 'erro')
@@ -0,0 +1,70 @@
+import contextlib
+import io
+import os
+
+import pytest
+
+from benchmark_pipeline import gerar_catalogo_variaveis, gerar_planilha_projecoes
+from configuracao import configuracao_padrao
+from pipeline import run
+
+ANOS = ['2020', '2021']
+
+
+@pytest.fixture
+def planilhas(tmp_path):
+    projecoes = str(tmp_path / 'projecoes.xlsx')
+    variaveis = str(tmp_path / 'variaveis.xlsx')
+    gerar_planilha_projecoes(projecoes, 27, ANOS)
+    gerar_catalogo_variaveis(variaveis)
+    return tmp_path, projecoes, variaveis
+
+
+def _executar(planilhas, **alteracoes):
+    diretorio, projecoes, variaveis = planilhas
+    padrao = configuracao_padrao()['CODIGOS_INDICADORES']
+    config = configuracao_padrao(**{
+        'PROJECOES_FILE': projecoes, 'VARIAVEIS_FILE': variaveis, 'VARIAVEIS_SHEET': 'Planilha1', 'ANOS': ANOS,
+        'SIGLAS': ['GO'], 'OUTPUT_DIR': str(diretorio / 'saida'), 'CACHE_DIR': str(diretorio / 'cache'),
+        'MAX_PROCESSOS': 1, 'INDICADORES': True,
+        'CODIGOS_INDICADORES': {**padrao, 'razao_sexo': 1200, 'proporcao_65_mais': 1201}, **alteracoes,
+    })
+    with contextlib.redirect_stdout(io.StringIO()) as log:
+        run(config)
+    return log.getvalue()
+
+
+def _conteudo(planilhas, ano='2021'):
+    with open(os.path.join(planilhas[0], 'saida', f'GO_{ano}.csv'), encoding='latin-1') as f:
+        return f.read()
+
+
+def test_reexecucao_sem_mudancas_nao_regrava(planilhas):
+    _executar(planilhas)
+    assert 'Nenhum ano alterado' in _executar(planilhas)
+
+
+def test_mudar_casas_indicadores_regrava(planilhas):
+    _executar(planilhas)
+    antes = _conteudo(planilhas)
+    log = _executar(planilhas, CASAS_INDICADORES=4)
+    assert 'Nenhum ano alterado' not in log
+    depois = _conteudo(planilhas)
+    linha_1200 = lambda texto: next(linha for linha in texto.splitlines() if ';1200;' in linha)
+    assert len(linha_1200(depois).split(',')[-1]) == 4
+    assert len(linha_1200(antes).split(',')[-1]) == 2
+
+
+def test_execucao_parcial_mantem_hashes_dos_outros_anos(planilhas):
+    _executar(planilhas)
+    # Sem o arquivo, a execução parcial regrava 2021 e atualiza o manifesto.
+    os.remove(os.path.join(planilhas[0], 'saida', 'GO_2021.csv'))
+    assert 'd_2021' in _executar(planilhas, ANOS=['2021'])
+    assert 'Nenhum ano alterado' in _executar(planilhas)
+
+
+def test_largo_com_outro_intervalo_tem_manifesto_proprio(planilhas):
+    _executar(planilhas, MODO_EXPORTACAO='largo')
+    assert 'd_2021' in _executar(planilhas, MODO_EXPORTACAO='largo', ANOS=['2021'])
+    assert 'Nenhum ano alterado' in _executar(planilhas, MODO_EXPORTACAO='largo')
+    assert os.path.exists(os.path.join(planilhas[0], 'saida', 'GO_2021_2021.csv'))
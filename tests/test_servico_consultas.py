@@ -0,0 +1,88 @@
+import json
+import threading
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pandas as pd
+import pytest
+
+from cubo_populacao import FAIXAS_QUINQUENAIS, SEXOS, construir_cubo
+from indice_etario import indice_do_cubo
+import servico_consultas
+from servico_consultas import anos_consulta, criar_servidor, ler_parametros
+
+ANOS = ['2030', '2031']
+
+
+def _iniciar(**opcoes):
+    """Serviço em uma porta livre com GO e DF: 1 pessoa por faixa quinquenal, sexo e ano."""
+    linhas = [(sigla, sexo, faixa, 1, 1) for sigla in ('GO', 'DF') for sexo in SEXOS for faixa in FAIXAS_QUINQUENAIS]
+    df = pd.DataFrame(linhas, columns=['SIGLA', 'SEXO', 'GRUPO_ETARIO', *ANOS])
+    dados = {'indice': indice_do_cubo(construir_cubo(df, ANOS)), 'var_cod': {979: ('90+', 'Mulheres')}}
+    servidor = criar_servidor(dados, porta=0, **opcoes)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor, f"http://127.0.0.1:{servidor.server_address[1]}"
+
+
+def _status(url):
+    try:
+        with urlopen(url) as resposta:
+            return resposta.status
+    except HTTPError as e:
+        return e.code
+
+
+@pytest.fixture(scope='module')
+def servidor():
+    servidor, url = _iniciar()
+    yield url
+    servidor.shutdown()
+
+
+def test_mais_literal_na_query():
+    assert ler_parametros('faixa=0-14,65+&sexo=Mulheres') == {'faixa': ['0-14,65+'], 'sexo': ['Mulheres']}
+
+
+def test_exemplo_documentado_em_json(servidor):
+    with urlopen(f"{servidor}/consulta?sigla=GO,DF&faixa=0-14,65+&sexo=Mulheres&anos=2030-2031") as resposta:
+        linhas = json.load(resposta)
+    assert [(linha['SIGLA'], linha['FAIXA']) for linha in linhas] == [
+        ('GO', '0-14'), ('DF', '0-14'), ('GO', '65+'), ('DF', '65+'),
+    ]
+    # 0-14 são 3 faixas quinquenais; 65+ são 6 (65-69 ... 90 ou mais).
+    assert [linha['d_2030'] for linha in linhas] == [3, 3, 6, 6]
+
+
+def test_exemplo_documentado_em_csv(servidor):
+    url = f"{servidor}/consulta?sigla=GO&faixa=65+&sexo=Mulheres&anos=2030&formato=csv"
+    with urlopen(url) as resposta:
+        texto = resposta.read().decode('latin-1')
+    assert texto.splitlines() == ['SIGLA;VAR_COD;SEXO;FAIXA;d_2030', 'GO;;Mulheres;65+;6']
+
+
+def test_anos_recortados_do_cubo():
+    anos = [str(ano) for ano in range(2030, 2071)]
+    assert anos_consulta('2069-2070,2030', anos) == ('2069', '2070', '2030')
+    for texto in ('2029-2031', '2070-99999999999', '2040-2035'):
+        with pytest.raises(ValueError, match='Erro'):
+            anos_consulta(texto, anos)
+
+
+def test_anos_fora_do_cubo_sao_400(servidor):
+    assert _status(f"{servidor}/consulta?sigla=GO&anos=2030-99999999999") == 400
+
+
+def test_cache_nao_espera_por_vaga(monkeypatch):
+    monkeypatch.setattr(servico_consultas, 'ESPERA_VAGA', 0.1)
+    servidor, url = _iniciar(max_concorrentes=1)
+    try:
+        assert _status(f"{url}/consulta?sigla=GO&anos=2030") == 200
+        # Com a única vaga ocupada por uma consulta lenta, o que está em cache continua
+        # sendo servido; só uma consulta nova espera e recebe 503.
+        servidor.vagas.acquire()
+        assert _status(f"{url}/consulta?sigla=GO&anos=2030") == 200
+        assert _status(f"{url}/consulta?sigla=DF&anos=2030") == 503
+        servidor.vagas.release()
+        assert _status(f"{url}/consulta?sigla=DF&anos=2030") == 200
+    finally:
+        servidor.shutdown()
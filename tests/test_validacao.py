@@ -0,0 +1,42 @@
+import pandas as pd
+
+from cubo_populacao import FAIXAS_QUINQUENAIS, construir_cubo
+from validacao import validar_cubo
+
+ANOS = ['2030', '2031']
+
+
+def _projecoes(total=None, extra=None):
+    """GO com 10 Homens e 20 Mulheres por faixa; `total` acrescenta as linhas Total por sexo."""
+    linhas = []
+    for faixa in FAIXAS_QUINQUENAIS:
+        linhas += [('GO', 'Homens', faixa, 10, 10), ('GO', 'Mulheres', faixa, 20, 20), ('GO', 'Ambos', faixa, 30, 30)]
+    if total is not None:
+        linhas += [('GO', sexo, 'Total', *valores) for sexo, valores in total.items()]
+    if extra is not None:
+        linhas += [('GO', 'Homens', extra, 2, 2), ('GO', 'Mulheres', extra, 3, 3), ('GO', 'Ambos', extra, 5, 5)]
+    return pd.DataFrame(linhas, columns=['SIGLA', 'SEXO', 'GRUPO_ETARIO', *ANOS])
+
+
+def _regras(df):
+    return set(validar_cubo(construir_cubo(df, ANOS))['regra'])
+
+
+def test_planilha_consistente():
+    assert _regras(_projecoes()) == set()
+
+
+def test_total_da_planilha_divergente():
+    n = len(FAIXAS_QUINQUENAIS)
+    total = {'Homens': (10 * n, 10 * n), 'Mulheres': (20 * n, 20 * n), 'Ambos': (30 * n, 30 * n + 7)}
+    relatorio = validar_cubo(construir_cubo(_projecoes(total), ANOS))
+    dados = relatorio[relatorio['regra'] == 'totais_planilha']
+    assert dados[['item', 'anos_violados', 'primeiro_ano', 'maior_diferenca']].values.tolist() == [
+        ['Total (Ambos)', 1, '2031', 7.0],
+    ]
+    # A linha Total entraria de novo nos agregados 939-941: acusado como estrutura.
+    assert 'estrutura_totais' in set(relatorio['regra'])
+
+
+def test_grupo_fora_das_faixas_e_estrutura():
+    assert _regras(_projecoes(extra='idade ignorada')) == {'estrutura_totais', 'estrutura_particoes'}
@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+
+from agregados import REGISTRO_AGREGADOS, agregados_cubo
+from cubo_populacao import FAIXAS_QUINQUENAIS
+
+# =============================================================================
+# VALIDAÇÃO DE CONSISTÊNCIA DAS PROJEÇÕES
+# =============================================================================
+# Confere, sobre o cubo (localidade × sexo × faixa × ano) e os agregados do
+# REGISTRO_AGREGADOS, para todas as localidades e anos de uma vez.
+#
+# Regras sobre os dados (comparam números da planilha entre si):
+#
+#   soma_sexos           Homens + Mulheres = Ambos, em cada faixa
+#   totais_planilha      faixas quinquenais somadas = linha "Total" da própria
+#                        planilha, em cada sexo (só se a planilha trouxer essa linha)
+#   nao_negativos        nenhuma contagem negativa
+#
+# Regras de estrutura (os "esperados" 939-941 e 980-983 são somas do mesmo cubo,
+# então não conferem os dados contra outra fonte; acusam grupos ou entradas do
+# registro que fariam os agregados exportados divergirem das faixas):
+#
+#   estrutura_totais     faixas quinquenais somadas = 939/940/941 como exportados
+#                        (acusa grupos da planilha fora das faixas, inclusive "Total")
+#   estrutura_particoes  980 + 981 + 982 + 983 = 939 e 940 + 941 = 939 no registro
+#
+# Uma diferença é violação quando |obtido - esperado| > tolerância absoluta +
+# tolerância relativa × |esperado|. O relatório tem uma linha por regra,
+# localidade e item (faixa ou código), com o número de anos violados.
+
+# (VAR_COD total, VAR_COD das partes) conferidos na regra "estrutura_particoes".
+PARTICOES = [
+    (939, [980, 981, 982, 983]),
+    (939, [940, 941]),
+]
+# Rótulo (sem diferenciar maiúsculas) das linhas de total por sexo na coluna GRUPO ETÁRIO.
+ROTULO_TOTAL = 'total'
+COLUNAS_RELATORIO = ['regra', 'SIGLA', 'item', 'anos_violados', 'primeiro_ano',
+                     'maior_diferenca', 'diferenca_relativa']
+
+
+def _violacoes(regra, obtido, esperado, siglas, itens, anos, tolerancia_absoluta, tolerancia_relativa):
+    """Linhas do relatório para obtido/esperado (localidade, item, ano)."""
+    obtido = np.asarray(obtido, dtype=np.float64)
+    esperado = np.asarray(esperado, dtype=np.float64)
+    diferenca = obtido - esperado
+    with np.errstate(invalid='ignore'):
+        falhas = ~(np.abs(diferenca) <= tolerancia_absoluta + tolerancia_relativa * np.abs(esperado))
+    localidades, posicoes = np.nonzero(falhas.any(axis=2))
+    if not len(localidades):
+        return pd.DataFrame(columns=COLUNAS_RELATORIO)
+
+    falhas = falhas[localidades, posicoes]
+    diferenca = np.where(falhas, np.abs(diferenca[localidades, posicoes]), -np.inf)
+    pior = np.argmax(np.nan_to_num(diferenca, nan=np.inf), axis=1)
+    maior = diferenca[np.arange(len(pior)), pior]
+    referencia = np.abs(esperado[localidades, posicoes, pior])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        relativa = np.where(referencia > 0, maior / referencia, np.nan)
+    return pd.DataFrame({
+        'regra': regra,
+        'SIGLA': np.asarray(siglas, dtype=object)[localidades],
+        'item': np.asarray(itens, dtype=object)[posicoes],
+        'anos_violados': falhas.sum(axis=1),
+        'primeiro_ano': np.asarray(anos, dtype=object)[np.argmax(falhas, axis=1)],
+        'maior_diferenca': maior,
+        'diferenca_relativa': relativa,
+    })
+
+
+def validar_cubo(cubo, tolerancia_absoluta=0.5, tolerancia_relativa=0.0, registro=REGISTRO_AGREGADOS):
+    """Confere as regras de dados e de estrutura e devolve o relatório de violações (vazio se fecha)."""
+    valores = np.asarray(cubo['valores'], dtype=np.float64)
+    siglas, sexos, faixas, anos = cubo['siglas'], cubo['sexos'], cubo['faixas'], cubo['anos']
+    tolerancias = (tolerancia_absoluta, tolerancia_relativa)
+    partes = []
+
+    if all(sexo in sexos for sexo in ('Ambos', 'Homens', 'Mulheres')):
+        ambos, homens, mulheres = (valores[:, sexos.index(sexo)] for sexo in ('Ambos', 'Homens', 'Mulheres'))
+        partes.append(_violacoes('soma_sexos', homens + mulheres, ambos, siglas, faixas, anos, *tolerancias))
+
+    quinquenais = [f for f, faixa in enumerate(faixas) if faixa in FAIXAS_QUINQUENAIS]
+    linhas_total = [f for f, faixa in enumerate(faixas) if str(faixa).strip().lower() == ROTULO_TOTAL]
+    if linhas_total:
+        f_total = linhas_total[0]
+        obtido = valores[:, :, quinquenais].sum(axis=2)
+        # Sem a linha Total na localidade/sexo, nada a conferir: esperado = obtido.
+        esperado = np.where(np.asarray(cubo['presentes'])[:, :, f_total, None], valores[:, :, f_total], obtido)
+        itens = [f"Total ({sexo})" for sexo in sexos]
+        partes.append(_violacoes('totais_planilha', obtido, esperado, siglas, itens, anos, *tolerancias))
+
+    somas, _ = agregados_cubo(cubo, registro)
+    posicao = {codigo: i for i, (codigo, _, _, _) in enumerate(registro)}
+    totais = [(codigo, sexo) for codigo, _, sexo, faixas_entrada in registro
+              if faixas_entrada is None and sexo in sexos]
+    if totais:
+        obtido = np.stack([valores[:, sexos.index(sexo)][:, quinquenais].sum(axis=1) for _, sexo in totais], axis=1)
+        esperado = somas[:, [posicao[codigo] for codigo, _ in totais]]
+        itens = [f"{codigo} ({sexo})" for codigo, sexo in totais]
+        partes.append(_violacoes('estrutura_totais', obtido, esperado, siglas, itens, anos, *tolerancias))
+
+    particoes = [(total, componentes) for total, componentes in PARTICOES
+                 if total in posicao and all(codigo in posicao for codigo in componentes)]
+    if particoes:
+        obtido = np.stack([somas[:, [posicao[c] for c in componentes]].sum(axis=1)
+                           for _, componentes in particoes], axis=1)
+        esperado = somas[:, [posicao[total] for total, _ in particoes]]
+        itens = [f"{total} = {' + '.join(map(str, componentes))}" for total, componentes in particoes]
+        partes.append(_violacoes('estrutura_particoes', obtido, esperado, siglas, itens, anos, *tolerancias))
+
+    negativos = np.minimum(valores, 0).reshape(len(siglas), len(sexos) * len(faixas), len(anos))
+    itens = [f"{faixa} ({sexo})" for sexo in sexos for faixa in faixas]
+    partes.append(_violacoes('nao_negativos', negativos, np.zeros_like(negativos), siglas, itens, anos, 0.0, 0.0))
+
+    partes = [parte for parte in partes if not parte.empty]
+    if not partes:
+        return pd.DataFrame(columns=COLUNAS_RELATORIO)
+    return pd.concat(partes, ignore_index=True)
+
+
+def resumo_violacoes(relatorio, max_linhas=20):
+    """Texto do relatório: contagem por regra e as primeiras violações."""
+    if relatorio.empty:
+        return "✓ Validação: todas as regras de consistência conferem."
+    contagem = relatorio.groupby('regra', sort=False)['anos_violados'].agg(['size', 'sum'])
+    linhas = [f"✗ Validação: {len(relatorio)} violações em {relatorio['SIGLA'].nunique()} localidades"]
+    for regra, (itens, anos) in contagem.iterrows():
+        linhas.append(f"  {regra:<14} {itens:>6} itens, {anos:>7} anos violados")
+    linhas.append(relatorio.head(max_linhas).to_string(index=False, float_format=lambda x: f"{x:,.4g}"))
+    if len(relatorio) > max_linhas:
+        linhas.append(f"  ... e mais {len(relatorio) - max_linhas} violações")
+    return '\n'.join(linhas)